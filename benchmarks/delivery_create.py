@@ -0,0 +1,120 @@
+"""
+Measures how the latency of creating a delivery scales with the number of
+meal orders in it.
+
+The single statement path of DeliverySqlFactory is compared against writing
+the delivery and then each meal order with its own INSERT, which is how
+deliveries used to be created. Every sample runs inside a unit of work that
+is rolled back at the end, so nothing is left behind in the database and
+commit latency is excluded from both paths.
+
+Run with `python benchmarks/delivery_create.py` against the database
+configured through the environment.
+"""
+
+import statistics
+import time
+from typing import Callable
+
+from sqlalchemy import insert
+
+from hello_food import (
+    UnitOfWork,
+    delivery_table,
+    meal_order_table,
+    metadata,
+    engine,
+    get_address_factory,
+    get_delivery_factory,
+    get_meal_factory,
+    get_meal_repository,
+    get_standard_user_factory,
+    Delivery,
+    MealOrder,
+)
+from hello_food.unit_of_work import sql_connection
+
+ORDER_SIZES = (1, 10, 100, 1_000)
+REPEATS = 20
+
+
+def create_delivery_row_by_row(
+    user_id: int, address_id: int, meal_order_tuples: list[tuple[int, int]]
+) -> None:
+    meal_orders = [
+        MealOrder(meal_id, quantity) for meal_id, quantity in meal_order_tuples
+    ]
+    meals = get_meal_repository().get_from_ids(
+        [meal_id for meal_id, _ in meal_order_tuples]
+    )
+    total = Delivery.compute_total(meal_orders, meals)
+
+    with sql_connection() as connection:
+        delivery_id = connection.execute(
+            insert(delivery_table)
+            .values(user_id=user_id, address_id=address_id, total=total)
+            .returning(delivery_table.c.id)
+        ).scalar_one()
+        for meal_id, quantity in meal_order_tuples:
+            connection.execute(
+                insert(meal_order_table).values(
+                    delivery_id=delivery_id, meal_id=meal_id, quantity=quantity
+                )
+            )
+
+
+def time_milliseconds(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1_000
+
+
+def main() -> None:
+    metadata.create_all(engine)
+    delivery_factory = get_delivery_factory()
+
+    print(f"{'meals':>6} {'single statement (ms)':>22} {'row by row (ms)':>16}")
+
+    for order_size in ORDER_SIZES:
+        with UnitOfWork() as unit_of_work:
+            address = get_address_factory().create_from_values(
+                "Unit 1", "Benchmark", "Cannon Hill", 4170
+            )
+            user = get_standard_user_factory().create_from_values(
+                f"benchmark-{order_size}@example.com",
+                "Benchmark",
+                order_size,
+                address.id,
+            )
+            meal_order_tuples = [
+                (get_meal_factory().create_from_values("Benchmark", "", 9.5)["id"], 1)
+                for _ in range(order_size)
+            ]
+
+            single_statement = [
+                time_milliseconds(
+                    lambda: delivery_factory.create_from_values(
+                        user.id, address.id, meal_order_tuples
+                    )
+                )
+                for _ in range(REPEATS)
+            ]
+            row_by_row = [
+                time_milliseconds(
+                    lambda: create_delivery_row_by_row(
+                        user.id, address.id, meal_order_tuples
+                    )
+                )
+                for _ in range(REPEATS)
+            ]
+
+            unit_of_work.rollback()
+
+        print(
+            f"{order_size:>6} {statistics.median(single_statement):>22.2f} "
+            f"{statistics.median(row_by_row):>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
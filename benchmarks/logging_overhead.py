@@ -0,0 +1,82 @@
+"""
+Measures the time a thread spends in a logging call, writing each record
+through a StreamHandler against putting it on the queue of the pipeline in
+hello_food/log.py, whose listener thread writes it.
+
+Records are written to two sinks:
+
+* "file": a temporary file on local disk, which is cheap to write to, so
+  the queue only adds the cost of handing the record over.
+* "slow sink": a stream whose writes take SINK_LATENCY seconds, as a pipe
+  read by a busy log collector does, which the queue hides.
+
+Run with `python benchmarks/logging_overhead.py`, no database is needed.
+"""
+
+import logging
+import statistics
+import tempfile
+import time
+from typing import TextIO
+
+from hello_food.log import (
+    JsonFormatter,
+    configure_logging,
+    rootlogger,
+    stop_logging,
+)
+
+CALLS = 2_000
+REPEATS = 5
+SINK_LATENCY = 0.0002
+
+
+class SlowSink:
+    def write(self, text: str) -> int:
+        time.sleep(SINK_LATENCY)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def microseconds_per_call() -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for index in range(CALLS):
+            rootlogger.warning("Delivery %d could not be priced", index)
+        samples.append((time.perf_counter() - start) / CALLS * 1_000_000)
+    return statistics.median(samples)
+
+
+def measure(stream: TextIO | SlowSink) -> tuple[float, float]:
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+
+    rootlogger.addHandler(stream_handler)
+    try:
+        stream_us = microseconds_per_call()
+    finally:
+        rootlogger.removeHandler(stream_handler)
+
+    configure_logging(handlers=[stream_handler], queue_size=CALLS * REPEATS)
+    try:
+        queue_us = microseconds_per_call()
+    finally:
+        # Waits for the listener to write out the queued records
+        stop_logging()
+
+    return stream_us, queue_us
+
+
+def main() -> None:
+    print(f"{'sink':<12} {'stream (us)':>12} {'queue (us)':>11}")
+    with tempfile.TemporaryFile("w") as log_file:
+        for name, stream in (("file", log_file), ("slow sink", SlowSink())):
+            stream_us, queue_us = measure(stream)
+            print(f"{name:<12} {stream_us:>12.1f} {queue_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures the memory held by deliveries and handling events in bulk.
+
+DELIVERIES deliveries of MEAL_ORDERS meal orders each are held as:
+
+* "Delivery": a list of slotted Delivery objects, as stream_all yields them.
+* "DeliveryBatch": a single DeliveryBatch, as stream_batches fills them.
+
+The same number of handling events is held as a list of HandlingEvents for
+comparison. Memory is measured with tracemalloc, so only allocations made
+by the Python objects themselves are counted.
+
+Run with `python benchmarks/model_memory.py`, no database is needed.
+"""
+
+import tracemalloc
+from typing import Any, Callable
+
+from hello_food import Delivery, DeliveryBatch, HandlingEvent, MealOrder
+
+DELIVERIES = 100_000
+MEAL_ORDERS = 3
+
+
+def build_deliveries() -> list[Delivery]:
+    return [
+        Delivery(
+            id_,
+            id_ % 1000,
+            id_ % 500,
+            8.9 * MEAL_ORDERS,
+            [MealOrder(meal_id, 1) for meal_id in range(MEAL_ORDERS)],
+        )
+        for id_ in range(DELIVERIES)
+    ]
+
+
+def build_delivery_batch() -> DeliveryBatch:
+    batch = DeliveryBatch()
+    for id_ in range(DELIVERIES):
+        batch.append_delivery(id_, id_ % 1000, id_ % 500, 8.9 * MEAL_ORDERS)
+        for meal_id in range(MEAL_ORDERS):
+            batch.append_meal_order(meal_id, 1)
+    return batch
+
+
+def build_handling_events() -> list[HandlingEvent]:
+    return [
+        HandlingEvent(id_, id_, id_ % 500, id_ % 500 + 1, 1_700_000_000 + id_)
+        for id_ in range(DELIVERIES)
+    ]
+
+
+def bytes_held(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        held = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del held
+    return size
+
+
+def main() -> None:
+    print(f"{'container':<20} {'total (MB)':>11} {'per entity (B)':>15}")
+    for name, build in (
+        ("Delivery", build_deliveries),
+        ("DeliveryBatch", build_delivery_batch),
+        ("HandlingEvent", build_handling_events),
+    ):
+        size = bytes_held(build)
+        print(f"{name:<20} {size / 1_000_000:>11.1f} {size / DELIVERIES:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measures repricing DELIVERIES deliveries with Delivery.compute_total, one
+delivery at a time, against pricing them as a DeliveryBatch with
+hello_food/pricing.py.
+
+Each delivery has MEAL_ORDERS meal orders from a menu of MEALS meals, and
+the batch is priced with and without the discounts of TRIAL_USERS trial
+users. Building the batch is not timed, as stream_batches fills it
+straight from the database.
+
+Run with `python benchmarks/pricing.py` with the pricing extra installed,
+no database is needed.
+"""
+
+import random
+import statistics
+import time
+from typing import Any, Callable
+
+from hello_food import Delivery, DeliveryBatch, Meal, MealOrder, TrialUser
+from hello_food.pricing import build_discount_vector, build_price_vector, price_batch
+
+DELIVERIES = 200_000
+MEAL_ORDERS = 3
+MEALS = 200
+TRIAL_USERS = 10_000
+REPEATS = 5
+
+
+def seconds_per_call(function: Callable[[], Any]) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    generator = random.Random(0)
+    meals = [
+        Meal(
+            id=meal_id,
+            cuisine="Italian",
+            recipe=f"Recipe {meal_id}",
+            price=round(generator.uniform(5, 20), 2),
+        )
+        for meal_id in range(1, MEALS + 1)
+    ]
+    users = [
+        TrialUser(user_id, "a@example.com", "A", 3, 1700000000, 0.1, 1)
+        for user_id in range(1, TRIAL_USERS + 1)
+    ]
+    deliveries = [
+        Delivery(
+            delivery_id,
+            generator.randint(1, 2 * TRIAL_USERS),
+            1,
+            0.0,
+            [
+                MealOrder(meal_id, 1)
+                for meal_id in generator.sample(range(1, MEALS + 1), MEAL_ORDERS)
+            ],
+        )
+        for delivery_id in range(DELIVERIES)
+    ]
+    batch = DeliveryBatch.from_deliveries(deliveries)
+    price_vector = build_price_vector(meals)
+    discount_vector = build_discount_vector(users)
+
+    print(f"{'pricing':<24} {'seconds':>8}")
+    for name, function in (
+        (
+            "compute_total",
+            lambda: [
+                Delivery.compute_total(delivery.meal_orders, meals)
+                for delivery in deliveries
+            ],
+        ),
+        ("price_batch", lambda: price_batch(batch, price_vector)),
+        (
+            "price_batch discounted",
+            lambda: price_batch(batch, price_vector, discount_vector),
+        ),
+    ):
+        print(f"{name:<24} {seconds_per_call(function):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures how long a fresh process takes to become ready to serve.
+
+Each sample runs in a new interpreter, as a cold container would, and
+records:
+
+* "import hello_food": importing the package, as scripts and workers do.
+* "import app": importing the Flask application module.
+* "first request": creating the application, which prepares the schema
+  and takes a first health snapshot, and serving a first request.
+
+Run with `python benchmarks/startup.py` against the database configured
+through the environment.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+SAMPLES = 10
+
+_MEASURE = """
+import json
+import time
+
+start = time.perf_counter()
+import hello_food
+import_package = time.perf_counter() - start
+
+start = time.perf_counter()
+from hello_food.app import create_app
+import_app = time.perf_counter() - start
+
+start = time.perf_counter()
+response = create_app().test_client().get("/healthcheck")
+assert response.status_code == 200
+first_request = time.perf_counter() - start
+
+print(json.dumps([import_package, import_app, first_request]))
+"""
+
+
+def main() -> None:
+    samples = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", _MEASURE],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(SAMPLES)
+    ]
+
+    print(f"{'phase':<20} {'median (ms)':>12}")
+    for index, name in enumerate(("import hello_food", "import app", "first request")):
+        milliseconds = statistics.median(sample[index] for sample in samples) * 1000
+        print(f"{name:<20} {milliseconds:>12.1f}")
+
+    total = statistics.median(sum(sample) for sample in samples) * 1000
+    print(f"{'total':<20} {total:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures the per call overhead of building statements on every call against
+executing the statements of the registry in hello_food/statements.py.
+
+Two costs are compared for the lookup of an address by id, a polymorphic
+user lookup by email and the insert of a handling event:
+
+* "build": constructing the statement and generating the cache key the
+  compiled statement is looked up with, which is all the Python side work
+  that differs between the two approaches.
+* "execute": a full round trip of the lookups on one connection, so the
+  saving can be put against the cost of a query.
+
+Run with `python benchmarks/statement_overhead.py` against the database
+configured through the environment.
+"""
+
+import statistics
+import time
+from typing import Any, Callable
+
+from sqlalchemy import Executable, insert, select
+
+from hello_food import (
+    address_table,
+    handling_event_table,
+    metadata,
+    engine,
+    user_table,
+)
+from hello_food.address.repository import _select_address_from_id
+from hello_food.handling_event.factory import _insert_handling_event
+from hello_food.user.repository import (
+    _select_user_from_email,
+    select_polymorphic_user,
+)
+
+CALLS = 5_000
+REPEATS = 5
+
+
+def build_address_lookup() -> Executable:
+    return select(address_table).where(address_table.c.id == 1)
+
+
+def build_user_lookup() -> Executable:
+    return select_polymorphic_user().where(user_table.c.email == "a@example.com")
+
+
+def build_handling_event_insert() -> Executable:
+    return (
+        insert(handling_event_table)
+        .values(delivery_id=1, to_address_id=1, from_address_id=1, completion_time=1)
+        .returning(handling_event_table.c.id)
+    )
+
+
+def microseconds_per_call(function: Callable[[], Any], calls: int) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        samples.append((time.perf_counter() - start) / calls * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    metadata.create_all(engine)
+
+    print(f"{'build':<24} {'rebuilt (us)':>13} {'registered (us)':>16}")
+    for name, rebuild, registered in (
+        ("address by id", build_address_lookup, _select_address_from_id),
+        ("user by email", build_user_lookup, _select_user_from_email),
+        ("handling event insert", build_handling_event_insert, _insert_handling_event),
+    ):
+        rebuilt_us = microseconds_per_call(
+            lambda: rebuild()._generate_cache_key(), CALLS  # type: ignore[attr-defined]
+        )
+        registered_us = microseconds_per_call(
+            lambda: registered()._generate_cache_key(), CALLS
+        )
+        print(f"{name:<24} {rebuilt_us:>13.1f} {registered_us:>16.1f}")
+
+    print()
+    print(f"{'execute':<24} {'rebuilt (us)':>13} {'registered (us)':>16}")
+    with engine.connect() as connection:
+        for name, rebuild_and_execute, execute_registered in (
+            (
+                "address by id",
+                lambda: connection.execute(build_address_lookup()).all(),
+                lambda: connection.execute(_select_address_from_id(), {"id": 1}).all(),
+            ),
+            (
+                "user by email",
+                lambda: connection.execute(build_user_lookup()).all(),
+                lambda: connection.execute(
+                    _select_user_from_email(), {"email": "a@example.com"}
+                ).all(),
+            ),
+        ):
+            rebuilt_us = microseconds_per_call(rebuild_and_execute, CALLS // 5)
+            registered_us = microseconds_per_call(execute_registered, CALLS // 5)
+            print(f"{name:<24} {rebuilt_us:>13.1f} {registered_us:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
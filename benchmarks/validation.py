@@ -0,0 +1,145 @@
+"""
+Measures parsing the JSON representations of entities field by field, as
+the factories did before their schemas were compiled, against the
+validators compiled from those schemas in hello_food/validation.py.
+
+Three payloads are parsed:
+
+* "address": a single address, as POST /address/create receives it.
+* "delivery": a delivery with MEAL_ORDERS meal orders.
+* "address array": an array of BULK_SIZE addresses, as a bulk create
+  receives it.
+
+Run with `python benchmarks/validation.py`, no database is needed.
+"""
+
+import statistics
+import time
+from typing import Any, Callable, Mapping, TypeVar
+
+from hello_food.address.factory import AddressSqlFactory
+from hello_food.delivery.factory import DeliverySqlFactory
+
+CALLS = 2_000
+REPEATS = 5
+MEAL_ORDERS = 50
+BULK_SIZE = 1_000
+
+_ADDRESS_JSON = {
+    "unit": "U 19",
+    "street_name": "Green",
+    "suburb": "Morningside",
+    "postcode": 4171,
+}
+
+_DELIVERY_JSON = {
+    "user_id": 1,
+    "address_id": 1,
+    "meal_orders": [
+        {"meal_id": meal_id, "quantity": 1} for meal_id in range(1, MEAL_ORDERS + 1)
+    ],
+}
+
+
+_T = TypeVar("_T", int, str)
+
+
+def parse_field(
+    json_as_dict: Mapping[str, Any], attribute_name: str, type_: type[_T]
+) -> _T:
+    """
+    Parses a field the way the factories did before their schemas were
+    compiled, wrapping errors in messages naming the field.
+    """
+
+    try:
+        value = json_as_dict[attribute_name]
+    except KeyError as e:
+        message = "Could not find attribute %s from provided JSON dict" % (
+            attribute_name,
+        )
+        raise KeyError(message) from e
+
+    try:
+        return type_(value)
+    except ValueError as e:
+        message = "Could not convert attribute %s as %s" % (
+            attribute_name,
+            type_.__name__,
+        )
+        raise ValueError(message) from e
+
+
+def parse_address_by_field(json_as_dict: Mapping[str, Any]) -> tuple[Any, ...]:
+    return (
+        parse_field(json_as_dict, "unit", str),
+        parse_field(json_as_dict, "street_name", str),
+        parse_field(json_as_dict, "suburb", str),
+        parse_field(json_as_dict, "postcode", int),
+    )
+
+
+def parse_delivery_by_field(json_as_dict: Mapping[str, Any]) -> tuple[Any, ...]:
+    meal_orders_as_json: Any = json_as_dict.get("meal_orders")
+    assert isinstance(meal_orders_as_json, list)
+
+    meal_order_tuples = []
+    for item in meal_orders_as_json:
+        assert isinstance(item, dict)
+        meal_id = parse_field(item, "meal_id", int)
+        quantity = parse_field(item, "quantity", int)
+        meal_order_tuples.append((meal_id, quantity))
+
+    return (
+        parse_field(json_as_dict, "user_id", int),
+        parse_field(json_as_dict, "address_id", int),
+        meal_order_tuples,
+    )
+
+
+def microseconds_per_call(function: Callable[[], Any], calls: int) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        samples.append((time.perf_counter() - start) / calls * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    address_validator = AddressSqlFactory._validator
+    delivery_validator = DeliverySqlFactory._validator
+    addresses = [_ADDRESS_JSON] * BULK_SIZE
+
+    print(f"{'payload':<16} {'by field (us)':>14} {'compiled (us)':>14} {'speedup':>8}")
+    for name, by_field, compiled, calls in (
+        (
+            "address",
+            lambda: parse_address_by_field(_ADDRESS_JSON),
+            lambda: address_validator.validate(_ADDRESS_JSON),
+            CALLS,
+        ),
+        (
+            "delivery",
+            lambda: parse_delivery_by_field(_DELIVERY_JSON),
+            lambda: delivery_validator.validate(_DELIVERY_JSON),
+            CALLS,
+        ),
+        (
+            "address array",
+            lambda: [parse_address_by_field(address) for address in addresses],
+            lambda: address_validator.validate_many(addresses),
+            CALLS // 100,
+        ),
+    ):
+        by_field_us = microseconds_per_call(by_field, calls)
+        compiled_us = microseconds_per_call(compiled, calls)
+        print(
+            f"{name:<16} {by_field_us:>14.1f} {compiled_us:>14.1f}"
+            f" {by_field_us / compiled_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
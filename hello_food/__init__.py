@@ -1,31 +1,142 @@
-from .address import Address, get_address_factory, get_address_repository, address_table
-from .handling_event import (
-    HandlingEvent,
-    get_handling_event_factory,
-    get_handling_event_repository,
-    handling_event_table,
-)
-from .delivery import (
-    Delivery,
-    MealOrder,
-    get_delivery_factory,
-    get_delivery_repository,
-    delivery_table,
-    meal_order_table,
-)
-from .user import (
-    user_table,
-    standard_user_table,
-    trial_user_table,
-    User,
-    TrialUser,
-    StandardUser,
-    get_standard_user_factory,
-    get_standard_user_repository,
-    get_trial_user_factory,
-    get_trial_user_repository,
-    get_user_repository,
-)
-from .meal import meal_table, Meal, get_meal_factory, get_meal_repository
-from .sql import metadata, engine
-from .util import *
+"""
+The entities, their factories and repositories, and the tables they are
+stored in.
+
+Subpackages are imported on first access of one of their names, so that
+processes which only need part of the package, such as the CLIs and the
+outbox dispatcher, do not pay for importing all of it at startup.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .address import (
+        Address,
+        get_address_factory,
+        get_address_repository,
+        address_table,
+    )
+    from .handling_event import (
+        HandlingEvent,
+        get_handling_event_factory,
+        get_handling_event_repository,
+        handling_event_table,
+    )
+    from .delivery import (
+        Delivery,
+        DeliveryBatch,
+        MealOrder,
+        get_delivery_factory,
+        get_delivery_repository,
+        delivery_table,
+        meal_order_table,
+    )
+    from .user import (
+        user_table,
+        standard_user_table,
+        trial_user_table,
+        User,
+        TrialUser,
+        StandardUser,
+        get_standard_user_factory,
+        get_standard_user_repository,
+        get_trial_user_factory,
+        get_trial_user_repository,
+        get_user_repository,
+    )
+    from .meal import (
+        meal_table,
+        Meal,
+        get_meal_factory,
+        get_meal_repository,
+        invalidate_meal_catalogue,
+    )
+    from .sql import metadata, engine
+    from .unit_of_work import UnitOfWork, get_unit_of_work
+    from .util import (
+        get_current_unix_epoch,
+        get_attribute_from_json,
+        parse_value_from_json,
+        parse_int_from_json,
+        parse_float_from_json,
+        parse_str_from_json,
+        parse_list_from_json,
+        parse_optional_value_from_json,
+    )
+
+_LAZY_EXPORTS: dict[str, tuple[str, ...]] = {
+    "address": (
+        "Address",
+        "get_address_factory",
+        "get_address_repository",
+        "address_table",
+    ),
+    "handling_event": (
+        "HandlingEvent",
+        "get_handling_event_factory",
+        "get_handling_event_repository",
+        "handling_event_table",
+    ),
+    "delivery": (
+        "Delivery",
+        "DeliveryBatch",
+        "MealOrder",
+        "get_delivery_factory",
+        "get_delivery_repository",
+        "delivery_table",
+        "meal_order_table",
+    ),
+    "user": (
+        "user_table",
+        "standard_user_table",
+        "trial_user_table",
+        "User",
+        "TrialUser",
+        "StandardUser",
+        "get_standard_user_factory",
+        "get_standard_user_repository",
+        "get_trial_user_factory",
+        "get_trial_user_repository",
+        "get_user_repository",
+    ),
+    "meal": (
+        "meal_table",
+        "Meal",
+        "get_meal_factory",
+        "get_meal_repository",
+        "invalidate_meal_catalogue",
+    ),
+    "sql": ("metadata", "engine"),
+    "unit_of_work": ("UnitOfWork", "get_unit_of_work"),
+    "util": (
+        "get_current_unix_epoch",
+        "get_attribute_from_json",
+        "parse_value_from_json",
+        "parse_int_from_json",
+        "parse_float_from_json",
+        "parse_str_from_json",
+        "parse_list_from_json",
+        "parse_optional_value_from_json",
+    ),
+}
+
+_MODULE_FROM_NAME: dict[str, str] = {
+    name: module for module, names in _LAZY_EXPORTS.items() for name in names
+}
+
+__all__ = list(_MODULE_FROM_NAME)
+
+
+def __getattr__(name: str) -> Any:
+    module = _MODULE_FROM_NAME.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
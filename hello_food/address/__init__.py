@@ -1,4 +1,4 @@
 from .orm import address_table
 from .model import Address
-from .factory import get_address_factory
-from .repository import get_address_repository
+from .factory import get_address_factory, get_async_address_factory
+from .repository import get_address_repository, get_async_address_repository
@@ -1,15 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import override, Any, Mapping
+from typing import override, Any, Iterable, Mapping, Sequence
 
-from sqlalchemy import insert
+from sqlalchemy import insert, Insert
 
 from .orm import address_table
 from .model import Address
-from ..mixins import JsonFactory
-from ..sql import engine
+from ..bulk_copy import CsvImportResult, import_csv
+from ..mixins import BulkJsonFactory
+from ..statements import registered_statement
+from ..validation import Field
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    sql_savepoint,
+    register_identity,
+)
 
+_AddressValues = tuple[str, str, str, int]
 
-class AddressFactory(JsonFactory[Address], ABC):
+
+class AddressFactory(BulkJsonFactory[Address], ABC):
 
     @classmethod
     @abstractmethod
@@ -25,9 +35,43 @@ class AddressFactory(JsonFactory[Address], ABC):
         """
         ...
 
+    @classmethod
+    @abstractmethod
+    def create_many_from_csv(cls, lines: Iterable[str]) -> CsvImportResult:
+        """
+        Imports addresses from the lines of a CSV file with unit,
+        street_name, suburb and postcode columns.
+        """
+        ...
+
+
+@registered_statement
+def _insert_address() -> Insert:
+    return insert(address_table).returning(
+        address_table.c.id, sort_by_parameter_order=True
+    )
+
+
+def _insert_address_parameters(
+    unit: str, street_name: str, suburb: str, postcode: int
+) -> dict[str, Any]:
+    return {
+        "unit": unit,
+        "street_name": street_name,
+        "suburb": suburb,
+        "postcode": postcode,
+    }
+
 
 class AddressSqlFactory(AddressFactory):
 
+    _schema = (
+        Field("unit", str),
+        Field("street_name", str),
+        Field("suburb", str),
+        Field("postcode", int),
+    )
+
     @override
     @classmethod
     def create_from_values(
@@ -41,35 +85,123 @@ class AddressSqlFactory(AddressFactory):
         Create a new address using the provided parameters.
         """
 
-        Address.assert_is_valid_postcode(postcode)
+        self._assert_valid_values(unit, street_name, suburb, postcode)
+
+        with sql_connection() as connection:
+            address_id = connection.execute(
+                _insert_address(),
+                _insert_address_parameters(unit, street_name, suburb, postcode),
+            ).scalar_one()
 
-        with engine.connect() as connection:
-            statement = (
-                insert(address_table)
-                .values(
-                    unit=unit,
-                    street_name=street_name,
-                    suburb=suburb,
-                    postcode=postcode,
+        address = Address(address_id, unit, street_name, suburb, postcode)
+        return register_identity(Address, address_id, address)
+
+    @override
+    @classmethod
+    def create_many_from_values(cls, values: Sequence[_AddressValues]) -> list[Address]:
+        """
+        Creates many addresses with multi-row inserts.
+        """
+
+        for address_values in values:
+            cls._assert_valid_values(*address_values)
+
+        with sql_savepoint() as connection:
+            address_ids = (
+                connection.execute(
+                    _insert_address(),
+                    [
+                        _insert_address_parameters(*address_values)
+                        for address_values in values
+                    ],
                 )
-                .returning(address_table.c.id)
+                .scalars()
+                .all()
             )
-            address_id = connection.execute(statement).scalar_one()
-            connection.commit()
 
-        return Address(address_id, unit, street_name, suburb, postcode)
+        return [
+            register_identity(Address, address_id, Address(address_id, *address_values))
+            for address_id, address_values in zip(address_ids, values)
+        ]
+
+    @override
+    @classmethod
+    def create_many_from_csv(cls, lines: Iterable[str]) -> CsvImportResult:
+
+        return import_csv(
+            cls, address_table, ("unit", "street_name", "suburb", "postcode"), lines
+        )
+
+    @override
+    @classmethod
+    def _assert_valid_values(
+        cls, unit: str, street_name: str, suburb: str, postcode: int
+    ) -> None:
+        Address.assert_is_valid_postcode(postcode)
 
     @override
     @classmethod
     def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Address:
 
-        unit = cls._parse_str_from_json(json_as_dict, "unit")
-        street_name = cls._parse_str_from_json(json_as_dict, "street_name")
-        suburb = cls._parse_str_from_json(json_as_dict, "suburb")
-        postcode = cls._parse_int_from_json(json_as_dict, "postcode")
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
+
+
+class AsyncAddressFactory(ABC):
+    """
+    The asyncio counterpart of AddressFactory.
+    """
 
-        return cls.create_from_values(unit, street_name, suburb, postcode)
+    @classmethod
+    @abstractmethod
+    async def create_from_values(
+        self,
+        unit: str,
+        street_name: str,
+        suburb: str,
+        postcode: int,
+    ) -> Address: ...
+
+    @classmethod
+    @abstractmethod
+    async def create_from_json(self, json_as_dict: Mapping[str, Any]) -> Address: ...
+
+
+class AsyncAddressSqlFactory(AsyncAddressFactory):
+
+    @override
+    @classmethod
+    async def create_from_values(
+        cls,
+        unit: str,
+        street_name: str,
+        suburb: str,
+        postcode: int,
+    ) -> Address:
+
+        AddressSqlFactory._assert_valid_values(unit, street_name, suburb, postcode)
+
+        async with async_sql_connection() as connection:
+            address_id = (
+                await connection.execute(
+                    _insert_address(),
+                    _insert_address_parameters(unit, street_name, suburb, postcode),
+                )
+            ).scalar_one()
+
+        return Address(address_id, unit, street_name, suburb, postcode)
+
+    @override
+    @classmethod
+    async def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Address:
+
+        return await cls.create_from_values(
+            *AddressSqlFactory._parse_values_from_json(json_as_dict)
+        )
 
 
 def get_address_factory() -> AddressFactory:
     return AddressSqlFactory()
+
+
+def get_async_address_factory() -> AsyncAddressFactory:
+    return AsyncAddressSqlFactory()
@@ -1,4 +1,9 @@
-class Address:
+from ..mixins import ChangeTracked
+
+
+class Address(ChangeTracked):
+
+    __slots__ = ("id", "unit", "street_name", "suburb", "postcode")
 
     def __init__(
         self, id_: int, unit: str, street_name: str, suburb: str, postcode: int
@@ -9,6 +14,7 @@ class Address:
         self.street_name: str = street_name
         self.suburb: str = suburb
         self.postcode: int = postcode
+        self.mark_clean()
 
     @classmethod
     def assert_is_valid_postcode(cls, postcode: int) -> None:
@@ -1,11 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import override, Any
+from typing import override, Any, Mapping
 
-from sqlalchemy import select, Select
+from sqlalchemy import bindparam, select, Row, Select
 
 from .model import Address
 from .orm import address_table
-from ..sql import engine
+from ..statements import registered_statement
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    get_identity,
+    register_identity,
+)
+
+
+def address_from_row(address_row: Row[Any]) -> Address:
+    return Address(
+        address_row.id,
+        address_row.unit,
+        address_row.street_name,
+        address_row.suburb,
+        address_row.postcode,
+    )
+
+
+@registered_statement
+def _select_address_from_id() -> Select[tuple[Any, ...]]:
+    return select(address_table).where(address_table.c.id == bindparam("id"))
 
 
 class AddressRepository(ABC):
@@ -27,22 +48,16 @@ class AddressSqlRepository(AddressRepository):
 
     @classmethod
     def _get_from_sqlalchemy_statement(
-        cls, statement: Select[tuple[Any]]
+        cls, statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
     ) -> Address | None:
 
-        with engine.connect() as conn:
-            address_orm = conn.execute(statement).one_or_none()
+        with sql_connection(read_only=True) as conn:
+            address_orm = conn.execute(statement, parameters).one_or_none()
             if address_orm is None:
                 return None
-            address = Address(
-                address_orm.id,
-                address_orm.unit,
-                address_orm.street_name,
-                address_orm.suburb,
-                address_orm.postcode,
-            )
+            address = address_from_row(address_orm)
 
-        return address
+        return register_identity(Address, address.id, address)
 
     @override
     @classmethod
@@ -51,10 +66,42 @@ class AddressSqlRepository(AddressRepository):
         Gets a address from the persistent layer from the address's id.
         """
 
-        statement = select(address_table).where(address_table.c.id == id_)
+        address = get_identity(Address, id_)
+        if address is not None:
+            return address
+
+        return cls._get_from_sqlalchemy_statement(
+            _select_address_from_id(), {"id": id_}
+        )
+
+
+class AsyncAddressRepository(ABC):
+    """
+    The asyncio counterpart of AddressRepository.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def get_from_id(self, id_: int) -> Address | None: ...
+
+
+class AsyncAddressSqlRepository(AsyncAddressRepository):
+
+    @override
+    @classmethod
+    async def get_from_id(cls, id_: int) -> Address | None:
+
+        async with async_sql_connection() as conn:
+            address_orm = (
+                await conn.execute(_select_address_from_id(), {"id": id_})
+            ).one_or_none()
 
-        return cls._get_from_sqlalchemy_statement(statement)
+        return None if address_orm is None else address_from_row(address_orm)
 
 
 def get_address_repository() -> AddressRepository:
     return AddressSqlRepository()
+
+
+def get_async_address_repository() -> AsyncAddressRepository:
+    return AsyncAddressSqlRepository()
@@ -1,30 +1,80 @@
-import logging
+import io
 
 from functools import wraps, singledispatch
 from http import HTTPStatus
 import sqlalchemy as sa
 from typing import cast, Mapping, Callable, Literal, Any
-from flask import request, Flask, Response, make_response
+from flask import current_app, g, request, Flask, Response, make_response
 
-from .sql import engine, metadata
-from .log import rootlogger
-from .controllers.address import create_new_address
-from .controllers.delivery import create_new_delivery, update_delivery_address
-from .controllers.handling_event import create_new_handling_event
-from .controllers.meal import create_new_meal
-from .controllers.user import create_new_standard_user, create_new_trial_user
+from .sql import (
+    engine_settings,
+    get_engine,
+    get_pool_statistics,
+    get_replica_router,
+    prewarm_pool,
+)
+from .health import HealthMonitor, health_to_json_dict
+from .migrations import prepare_schema
+from .serialization import OrjsonProvider
+from .log import (
+    REQUEST_ID_HEADER,
+    configure_logging,
+    get_request_id,
+    request_id_from_header,
+    reset_request_id,
+    rootlogger,
+    set_request_id,
+)
+from .meal import meal_catalogue_cache
+from .unit_of_work import UnitOfWork
+from .controllers.address import (
+    create_new_address,
+    create_new_addresses,
+    get_address,
+    import_addresses,
+)
+from .controllers.delivery import (
+    create_new_delivery,
+    export_deliveries,
+    get_deliveries,
+    get_delivery,
+    update_delivery_address,
+)
+from .controllers.handling_event import (
+    create_new_handling_event,
+    create_new_handling_events,
+    get_handling_event,
+    get_handling_events,
+)
+from .controllers.meal import (
+    create_new_meal,
+    create_new_meals,
+    get_meal,
+    get_meals_from_cuisine,
+    import_meals,
+)
+from .controllers.user import (
+    create_new_standard_user,
+    create_new_standard_users,
+    create_new_trial_user,
+    create_new_trial_users,
+    get_user,
+    get_users,
+)
 
 
 @singledispatch
 def transform_handler_response(
     response: Any, response_status: HTTPStatus = HTTPStatus.OK
 ) -> Response:
-    return make_response(response, response_status)
+    # Entities are serialized by the application's JSON provider, see
+    # serialization.py
+    return make_response(current_app.json.response(response), response_status)
 
 
 @transform_handler_response.register
 def _(response: None, response_status: HTTPStatus = HTTPStatus.OK) -> Response:
-    logging.info("Returned an empty response")
+    rootlogger.info("Returned an empty response")
     return Response(status=HTTPStatus.NO_CONTENT)
 
 
@@ -39,9 +89,14 @@ def _(response: Response, response_status: HTTPStatus = HTTPStatus.OK) -> Respon
 
 
 def create_app() -> Flask:
+    configure_logging()
     # create and configure the app
     flask_app = Flask(__name__, instance_relative_config=True)
-    metadata.create_all(engine)
+    flask_app.json = OrjsonProvider(flask_app)
+    prepare_schema()
+    prewarm_pool(get_engine(), engine_settings.pool_prewarm)
+    # Checks the lag of the replicas before serving, see ReplicaRouter
+    get_replica_router()
 
     # Default config
     flask_app.config.update(
@@ -52,17 +107,66 @@ def create_app() -> Flask:
         }
     )
 
-    # Healthcheck
+    health_monitor = HealthMonitor()
+    health_monitor.start()
+    flask_app.extensions["health_monitor"] = health_monitor
+
+    # Everything logged while serving a request carries its id, see log.py
+    @flask_app.before_request
+    def bind_request_id() -> None:
+        g.request_id_token = set_request_id(
+            request_id_from_header(request.headers.get(REQUEST_ID_HEADER))
+        )
+
+    @flask_app.after_request
+    def add_request_id_header(response: Response) -> Response:
+        request_id = get_request_id()
+        if request_id is not None:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @flask_app.teardown_request
+    def unbind_request_id(_: BaseException | None) -> None:
+        request_id_token = g.pop("request_id_token", None)
+        if request_id_token is not None:
+            reset_request_id(request_id_token)
+
+    # Probes are answered from the latest health snapshot, see health.py
+    @flask_app.route("/livez")
+    def livez() -> Response:
+        return make_response("OK", HTTPStatus.OK)
+
+    @flask_app.route("/readyz")
+    def readyz() -> Response:
+        return make_response(
+            health_to_json_dict(health_monitor),
+            (
+                HTTPStatus.OK
+                if health_monitor.is_ready()
+                else HTTPStatus.SERVICE_UNAVAILABLE
+            ),
+        )
+
     @flask_app.route("/healthcheck")
     def healthcheck() -> Response:
         rootlogger.debug("healthcheck")
 
-        # Test the db connection
-        with engine.connect() as db_connection:
-            db_connection.execute(sa.text("SELECT 1"))
-
+        if not health_monitor.is_ready():
+            return make_response("FAIL", HTTPStatus.SERVICE_UNAVAILABLE)
         return make_response("PASSTEST3", HTTPStatus.OK)
 
+    @flask_app.route("/pool_statistics")
+    def pool_statistics() -> Response:
+        statistics = get_pool_statistics()
+        return make_response(
+            {
+                **statistics._asdict(),
+                "capacity": statistics.capacity,
+                "saturation": statistics.saturation,
+            },
+            HTTPStatus.OK,
+        )
+
     def attach_api(
         methods: list[
             Literal["GET"]
@@ -72,15 +176,30 @@ def create_app() -> Flask:
             | Literal["OPTIONS"]
         ],
         resource: str,
-        api_handler: Callable[[Mapping[str, Any]], Response | dict[str, Any] | None],
+        api_handler: Callable[[Mapping[str, Any]], Any],
     ) -> None:
         @flask_app.route(resource, methods=methods)
         @wraps(api_handler)
         def decorator() -> Response:
 
             try:
-                request_data = cast(Mapping[str, Any], request.json)
-                handler_response = api_handler(request_data)
+                if request.method == "GET":
+                    request_data = cast(Mapping[str, Any], request.args)
+                elif request.mimetype == "text/csv":
+                    # CSV bodies are streamed to the handler rather than
+                    # read into memory
+                    request_data = {
+                        "csv": io.TextIOWrapper(
+                            request.stream, encoding="utf-8", newline=""
+                        )
+                    }
+                else:
+                    request_data = cast(Mapping[str, Any], request.json)
+                # Every repository and factory used by the handler shares the
+                # unit of work's connection, which is committed once the
+                # handler returns.
+                with UnitOfWork():
+                    handler_response = api_handler(request_data)
             except sa.exc.MultipleResultsFound as e:
                 return make_response(
                     {
@@ -105,17 +224,46 @@ def create_app() -> Flask:
 
             return transform_handler_response(handler_response)
 
+    @flask_app.route("/meal/cache_statistics")
+    def meal_cache_statistics() -> Response:
+        return make_response(
+            meal_catalogue_cache.get_statistics()._asdict(), HTTPStatus.OK
+        )
+
     # curl -i -X POST --header "Content-type: application/json" -d '{"unit":"U 19","street_name":"Green","suburb":"Morningside","postcode":"4171"}' http://127.0.0.1:5000/address/create
     attach_api(["POST"], "/address/create", create_new_address)
+    # curl -i -X POST --header "Content-type: application/json" -d '{"items":[{"unit":"U 19","street_name":"Green","suburb":"Morningside","postcode":"4171"}]}' http://127.0.0.1:5000/address/bulk_create
+    attach_api(["POST"], "/address/bulk_create", create_new_addresses)
+    # curl -i -X POST --header "Content-type: text/csv" --data-binary @addresses.csv http://127.0.0.1:5000/address/import
+    attach_api(["POST"], "/address/import", import_addresses)
+    # curl -i "http://127.0.0.1:5000/address/get?id=1"
+    attach_api(["GET"], "/address/get", get_address)
 
     attach_api(["POST"], "/delivery/create", create_new_delivery)
     attach_api(["POST"], "/delivery/update_address", update_delivery_address)
+    attach_api(["GET"], "/delivery/get", get_delivery)
+    # curl -i "http://127.0.0.1:5000/delivery/list?user_id=1&limit=20"
+    attach_api(["GET"], "/delivery/list", get_deliveries)
+    # curl -o deliveries.ndjson "http://127.0.0.1:5000/delivery/export"
+    attach_api(["GET"], "/delivery/export", export_deliveries)
 
     attach_api(["POST"], "/handling_event/create", create_new_handling_event)
+    attach_api(["POST"], "/handling_event/bulk_create", create_new_handling_events)
+    attach_api(["GET"], "/handling_event/get", get_handling_event)
+    attach_api(["GET"], "/handling_event/list", get_handling_events)
 
     attach_api(["POST"], "/meal/create", create_new_meal)
+    attach_api(["POST"], "/meal/bulk_create", create_new_meals)
+    attach_api(["POST"], "/meal/import", import_meals)
+    attach_api(["GET"], "/meal/get", get_meal)
+    # curl -i "http://127.0.0.1:5000/meal/cuisine?cuisine=Italian&limit=20&max_price=12"
+    attach_api(["GET"], "/meal/cuisine", get_meals_from_cuisine)
 
     attach_api(["POST"], "/standard_user/create", create_new_standard_user)
     attach_api(["POST"], "/trial_user/create", create_new_trial_user)
+    attach_api(["POST"], "/standard_user/bulk_create", create_new_standard_users)
+    attach_api(["POST"], "/trial_user/bulk_create", create_new_trial_users)
+    attach_api(["GET"], "/user/get", get_user)
+    attach_api(["GET"], "/user/list", get_users)
 
     return flask_app
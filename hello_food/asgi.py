@@ -0,0 +1,193 @@
+"""
+The asyncio application mode, an ASGI counterpart of create_app. Requests
+are served by the async repositories and factories on an asyncpg backed
+engine, so a single process keeps many requests in flight while they wait
+on the database or on SES. Serve it with an ASGI server, for instance
+
+    uvicorn --factory hello_food.asgi:create_asgi_app
+"""
+
+import asyncio
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Literal, Mapping, MutableMapping
+from urllib.parse import parse_qsl
+
+import sqlalchemy as sa
+
+from .health import HealthMonitor, HealthSnapshot, check_health, health_to_json_dict
+from .log import (
+    REQUEST_ID_HEADER,
+    configure_logging,
+    request_id_from_header,
+    reset_request_id,
+    rootlogger,
+    set_request_id,
+)
+from .serialization import dumps, loads
+from .migrations import prepare_schema
+from .sql import get_async_engine, dispose_async_engine
+from .controllers.address import create_new_address_async
+from .controllers.delivery import create_new_delivery_async
+from .controllers.handling_event import create_new_handling_event_async
+from .controllers.meal import get_meals_from_cuisine_async
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+AsyncApiHandler = Callable[[Mapping[str, Any]], Awaitable[Any]]
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+async def _send_response(
+    send: Send, response: Any, response_status: HTTPStatus, request_id: str
+) -> None:
+    request_id_header = (REQUEST_ID_HEADER.lower().encode(), request_id.encode())
+    if response is None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": HTTPStatus.NO_CONTENT,
+                "headers": [request_id_header],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    body = dumps(response)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response_status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                request_id_header,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _check_health() -> HealthSnapshot:
+    # Requests are served by the async engine, so its pool is the one
+    # reported, the check itself runs on the monitor's thread
+    return check_health(pool_engine=get_async_engine().sync_engine)
+
+
+async def _lifespan(
+    receive: Receive, send: Send, health_monitor: HealthMonitor
+) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await asyncio.to_thread(prepare_schema)
+            await asyncio.to_thread(health_monitor.start)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await asyncio.to_thread(health_monitor.stop)
+            await dispose_async_engine()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def create_asgi_app() -> ASGIApp:
+    configure_logging()
+    routes: dict[tuple[str, str], AsyncApiHandler] = {}
+    health_monitor = HealthMonitor(_check_health)
+
+    def attach_api(
+        methods: list[Literal["GET"] | Literal["POST"]],
+        resource: str,
+        api_handler: AsyncApiHandler,
+    ) -> None:
+        for method in methods:
+            routes[(method, resource)] = api_handler
+
+    # Probes are answered from the latest health snapshot, taken once the
+    # lifespan has started, see health.py
+    def probe(path: str) -> tuple[dict[str, Any], HTTPStatus] | None:
+        ready_status = (
+            HTTPStatus.OK
+            if health_monitor.is_ready()
+            else HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        if path == "/livez":
+            return {"status": "OK"}, HTTPStatus.OK
+        if path == "/readyz":
+            return health_to_json_dict(health_monitor), ready_status
+        if path == "/healthcheck":
+            rootlogger.debug("healthcheck")
+            return {
+                "status": "PASSTEST3" if ready_status == HTTPStatus.OK else "FAIL"
+            }, ready_status
+        return None
+
+    async def handle_request(scope: Scope, receive: Receive) -> tuple[
+        Any,
+        HTTPStatus,
+    ]:
+        method, path = scope["method"], scope["path"]
+
+        if method == "GET":
+            probe_response = probe(path)
+            if probe_response is not None:
+                return probe_response
+
+        api_handler = routes.get((method, path))
+        if api_handler is None:
+            if any(resource == path for _, resource in routes):
+                return {"error": "Method not allowed"}, HTTPStatus.METHOD_NOT_ALLOWED
+            return {"error": "Not found"}, HTTPStatus.NOT_FOUND
+
+        try:
+            if method == "GET":
+                request_data = dict(parse_qsl(scope["query_string"].decode()))
+            else:
+                request_data = loads(await _read_body(receive))
+            return await api_handler(request_data), HTTPStatus.OK
+        except sa.exc.MultipleResultsFound as e:
+            return {
+                "reason": "Multiple responses returned from query.",
+                "error": str(e),
+            }, HTTPStatus.INTERNAL_SERVER_ERROR
+        except sa.exc.NoResultFound as e:
+            return {"error": str(e)}, HTTPStatus.NOT_FOUND
+        except Exception as e:
+            rootlogger.error(e)
+            return {"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send, health_monitor)
+            return
+
+        assert scope["type"] == "http" and "Only HTTP requests are served"
+        # Everything logged while serving the request carries its id
+        headers = dict(scope.get("headers", ()))
+        request_id = request_id_from_header(
+            headers.get(REQUEST_ID_HEADER.lower().encode(), b"").decode("latin-1")
+        )
+        request_id_token = set_request_id(request_id)
+        try:
+            response, response_status = await handle_request(scope, receive)
+            await _send_response(send, response, response_status, request_id)
+        finally:
+            reset_request_id(request_id_token)
+
+    attach_api(["POST"], "/address/create", create_new_address_async)
+    attach_api(["POST"], "/delivery/create", create_new_delivery_async)
+    attach_api(["POST"], "/handling_event/create", create_new_handling_event_async)
+    attach_api(["GET"], "/meal/cuisine", get_meals_from_cuisine_async)
+
+    return app
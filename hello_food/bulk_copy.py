@@ -0,0 +1,244 @@
+"""
+Bulk import of entities from CSV with PostgreSQL COPY.
+
+Every row is parsed and validated by the entity's factory, with the same
+invariants as creating it from JSON, and the valid rows are streamed with
+COPY FROM STDIN into a temporary staging table. The staging table is then
+merged into the entity's table with a single INSERT ... SELECT ... EXCEPT,
+skipping rows identical to a row already present, so an import can be run
+again after a partial failure without duplicating what was loaded. EXCEPT
+compares NULLs as equal and is planned as a hashed set operation, rather
+than probing the table once per staged row. Neither the file, the valid
+rows nor more than MAX_REPORTED_REJECTED_ROWS rejected rows are held in
+memory.
+
+Strings are quoted in the CSV sent to COPY, so an empty string is loaded
+as an empty string like the JSON create does, only None is loaded as NULL.
+Values the columns would refuse, which would abort the whole COPY, are
+rejected with their row instead.
+
+The header of the file names the columns, in any order.
+"""
+
+import csv
+import io
+from typing import Any, Final, Iterable, Iterator, NamedTuple, Sequence
+
+from sqlalchemy import Column, Connection, Integer, Table, text
+
+from .mixins import INVALID_ITEM_ERRORS, BulkJsonFactory, describe_error
+from .unit_of_work import sql_connection
+
+# Rejected rows reported in full, the rest are only counted
+MAX_REPORTED_REJECTED_ROWS: Final[int] = 1000
+
+# The values of an integer column, a 4 byte integer in PostgreSQL
+_INTEGER_RANGE: Final[range] = range(-(2**31), 2**31)
+
+
+class RejectedCsvRow(NamedTuple):
+    line_number: int
+    error: str
+
+
+class CsvImportResult(NamedTuple):
+    """
+    The outcome of an import. duplicates counts the valid rows which were
+    not inserted as an identical row already exists.
+    """
+
+    imported: int
+    duplicates: int
+    rejected: int
+    rejected_rows: list[RejectedCsvRow]
+
+
+class _RejectedRows:
+    """
+    Keeps the first MAX_REPORTED_REJECTED_ROWS rejected rows and counts
+    them all.
+    """
+
+    def __init__(self) -> None:
+        self.rows: list[RejectedCsvRow] = []
+        self.count = 0
+
+    def add(self, rejected_row: RejectedCsvRow) -> None:
+        if self.count < MAX_REPORTED_REJECTED_ROWS:
+            self.rows.append(rejected_row)
+        self.count += 1
+
+
+class _CopyReader:
+    """
+    The file like object COPY FROM STDIN reads the valid rows from, encoding
+    them as CSV as they are read.
+    """
+
+    def __init__(self, rows: Iterator[Sequence[Any]]) -> None:
+        self._rows = rows
+        self._buffer = io.StringIO()
+        # An unquoted empty field is read as NULL by COPY, so strings are
+        # always quoted and only None is written unquoted
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_STRINGS)
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or self._buffer.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self.row_count += 1
+
+        data = self._buffer.getvalue()
+        if size >= 0:
+            data, remainder = data[:size], data[size:]
+        else:
+            remainder = ""
+
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(remainder)
+        return data
+
+
+def _assert_fits_columns(columns: Sequence[Column[Any]], values: Sequence[Any]) -> None:
+    """
+    Asserts the values of a row can be stored in their columns, raising a
+    ValueError naming the first column that would refuse its value.
+    """
+
+    for column, value in zip(columns, values):
+        if value is None:
+            if not column.nullable:
+                raise ValueError("Column %s cannot be null" % (column.name,))
+        elif isinstance(value, str):
+            if "\x00" in value:
+                raise ValueError(
+                    "Column %s cannot hold NUL characters" % (column.name,)
+                )
+        elif type(column.type) is Integer and value not in _INTEGER_RANGE:
+            raise ValueError("Column %s is out of range" % (column.name,))
+
+
+def _parse_csv_rows(
+    factory: type[BulkJsonFactory[Any]],
+    table: Table,
+    column_names: Sequence[str],
+    lines: Iterable[str],
+    rejected_rows: _RejectedRows,
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Checks the header of the file straight away, the rows are parsed as the
+    returned iterator is consumed.
+    """
+
+    reader = csv.DictReader(lines)
+    field_names = reader.fieldnames or []
+
+    missing_column_names = set(column_names) - set(field_names)
+    if field_names and missing_column_names:
+        raise ValueError(
+            "CSV header is missing columns %s"
+            % (", ".join(sorted(missing_column_names)),)
+        )
+
+    columns = [table.c[column_name] for column_name in column_names]
+
+    def parse_rows() -> Iterator[tuple[Any, ...]]:
+        for row in reader:
+            try:
+                # DictReader pads short rows with None and gathers the fields
+                # of long rows under None
+                if None in row or None in row.values():
+                    raise ValueError("Expected %d fields" % (len(field_names),))
+                values = factory.parse_valid_values_from_json(row)
+                _assert_fits_columns(columns, values)
+                yield values
+            except INVALID_ITEM_ERRORS as e:
+                rejected_rows.add(RejectedCsvRow(reader.line_num, describe_error(e)))
+
+    return parse_rows()
+
+
+def _create_staging_table(
+    connection: Connection, table: Table, column_names: Sequence[str]
+) -> str:
+    preparer = connection.dialect.identifier_preparer
+    staging_table_name = preparer.quote(f"import_{table.name.lower()}")
+    columns = ", ".join(preparer.quote(column_name) for column_name in column_names)
+
+    connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {staging_table_name} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {preparer.format_table(table)} WITH NO DATA"
+        )
+    )
+    return staging_table_name
+
+
+def _merge_staging_table(
+    connection: Connection,
+    table: Table,
+    column_names: Sequence[str],
+    staging_table_name: str,
+) -> int:
+    preparer = connection.dialect.identifier_preparer
+    quoted_column_names = [preparer.quote(column_name) for column_name in column_names]
+    columns = ", ".join(quoted_column_names)
+
+    # EXCEPT also drops the rows staged more than once
+    result = connection.execute(
+        text(
+            f"INSERT INTO {preparer.format_table(table)} ({columns}) "
+            f"SELECT {columns} FROM {staging_table_name} "
+            f"EXCEPT SELECT {columns} FROM {preparer.format_table(table)}"
+        )
+    )
+    connection.execute(text(f"DROP TABLE {staging_table_name}"))
+    return result.rowcount
+
+
+def import_csv(
+    factory: type[BulkJsonFactory[Any]],
+    table: Table,
+    column_names: Sequence[str],
+    lines: Iterable[str],
+) -> CsvImportResult:
+    """
+    Imports the rows of a CSV file into table. column_names are the columns
+    of table set from the arguments factory parses from a row, in order.
+    """
+
+    rejected_rows = _RejectedRows()
+    copy_reader = _CopyReader(
+        _parse_csv_rows(factory, table, column_names, lines, rejected_rows)
+    )
+
+    with sql_connection() as connection:
+        staging_table_name = _create_staging_table(connection, table, column_names)
+
+        preparer = connection.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(column_name) for column_name in column_names)
+        # COPY FROM STDIN goes through psycopg2's copy_expert on the driver
+        # connection, in the transaction of connection.
+        cursor: Any = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {staging_table_name} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                copy_reader,
+            )
+        finally:
+            cursor.close()
+
+        imported = _merge_staging_table(
+            connection, table, column_names, staging_table_name
+        )
+
+    return CsvImportResult(
+        imported,
+        copy_reader.row_count - imported,
+        rejected_rows.count,
+        rejected_rows.rows,
+    )
@@ -1,9 +1,54 @@
 from typing import Any, Mapping
 
-from ..address import get_address_factory
+from sqlalchemy.exc import NoResultFound
 
+from ..address import (
+    Address,
+    get_address_factory,
+    get_address_repository,
+    get_async_address_factory,
+)
+from ..util import get_attribute_from_json, parse_int_from_json
+from .bulk import create_many_from_json_request, csv_import_to_json_dict
 
-def create_new_address(address_as_json_dict: Mapping[str, Any]) -> None:
+
+def create_new_address(address_as_json_dict: Mapping[str, Any]) -> Address:
+
+    address_factory = get_address_factory()
+    return address_factory.create_from_json(address_as_json_dict)
+
+
+async def create_new_address_async(address_as_json_dict: Mapping[str, Any]) -> Address:
+
+    address_factory = get_async_address_factory()
+    return await address_factory.create_from_json(address_as_json_dict)
+
+
+def get_address(address_id_as_json_dict: Mapping[str, Any]) -> Address:
+
+    address_id = parse_int_from_json(address_id_as_json_dict, "id")
+    address = get_address_repository().get_from_id(address_id)
+    if address is None:
+        raise NoResultFound(f"No address found for id={address_id}")
+    return address
+
+
+def create_new_addresses(addresses_as_json_dict: Mapping[str, Any]) -> dict[str, Any]:
+
+    address_factory = get_address_factory()
+    return create_many_from_json_request(
+        address_factory, addresses_as_json_dict, _get_address_id
+    )
+
+
+def _get_address_id(address: Address) -> int:
+    return address.id
+
+
+def import_addresses(addresses_as_csv: Mapping[str, Any]) -> dict[str, Any]:
 
     address_factory = get_address_factory()
-    address_factory.create_from_json(address_as_json_dict)
+    result = address_factory.create_many_from_csv(
+        get_attribute_from_json(addresses_as_csv, "csv")
+    )
+    return csv_import_to_json_dict(result)
@@ -0,0 +1,49 @@
+from typing import Any, Callable, Mapping, TypeVar
+
+from ..bulk_copy import CsvImportResult
+from ..mixins import BulkJsonFactory
+from ..util import parse_list_from_json
+
+_S = TypeVar("_S")
+
+
+def create_many_from_json_request(
+    factory: BulkJsonFactory[_S],
+    bulk_request_as_json_dict: Mapping[str, Any],
+    get_id: Callable[[_S], int],
+) -> dict[str, Any]:
+    """
+    Creates every item listed under "items" of a bulk create request and
+    reports the id of each created item or the reason it was rejected.
+    """
+
+    items = parse_list_from_json(bulk_request_as_json_dict, "items")
+    results = factory.create_many_from_json(items)
+
+    response_results: list[dict[str, Any]] = []
+    for result in results:
+        if result.entity is not None:
+            response_results.append(
+                {"index": result.item_index, "id": get_id(result.entity)}
+            )
+        else:
+            response_results.append({"index": result.item_index, "error": result.error})
+
+    created = sum(1 for result in results if result.entity is not None)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": response_results,
+    }
+
+
+def csv_import_to_json_dict(result: CsvImportResult) -> dict[str, Any]:
+    return {
+        "imported": result.imported,
+        "duplicates": result.duplicates,
+        "rejected": result.rejected,
+        "rejected_rows": [
+            {"line": rejected_row.line_number, "error": rejected_row.error}
+            for rejected_row in result.rejected_rows
+        ],
+    }
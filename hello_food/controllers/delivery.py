@@ -1,14 +1,40 @@
-from typing import Any, Mapping
+from typing import Any, Iterator, Mapping
 
-from ..util import parse_int_from_json
+from flask import Response
+from sqlalchemy.exc import NoResultFound
+
+from ..serialization import dumps
+from ..util import parse_int_from_json, parse_optional_value_from_json
 from ..update_driver import update_sql_entities
-from ..delivery import get_delivery_factory, get_delivery_repository
+from ..delivery import (
+    Delivery,
+    get_delivery_factory,
+    get_delivery_repository,
+    get_async_delivery_factory,
+)
 
 
-def create_new_delivery(delivery_as_json_dict: Mapping[str, Any]) -> None:
+def create_new_delivery(delivery_as_json_dict: Mapping[str, Any]) -> Delivery:
 
     delivery_factory = get_delivery_factory()
-    delivery_factory.create_from_json(delivery_as_json_dict)
+    return delivery_factory.create_from_json(delivery_as_json_dict)
+
+
+async def create_new_delivery_async(
+    delivery_as_json_dict: Mapping[str, Any]
+) -> Delivery:
+
+    delivery_factory = get_async_delivery_factory()
+    return await delivery_factory.create_from_json(delivery_as_json_dict)
+
+
+def get_delivery(delivery_id_as_json_dict: Mapping[str, Any]) -> Delivery:
+
+    delivery_id = parse_int_from_json(delivery_id_as_json_dict, "id")
+    delivery = get_delivery_repository().get_from_id(delivery_id)
+    if delivery is None:
+        raise NoResultFound(f"No delivery found for id={delivery_id}")
+    return delivery
 
 
 def update_delivery_address(
@@ -34,3 +60,38 @@ def update_delivery_address(
     delivery_to_update.address_id = new_address_id
 
     update_sql_entities(delivery_to_update)
+
+
+def get_deliveries(deliveries_as_json_dict: Mapping[str, Any]) -> dict[str, Any]:
+
+    delivery_repository = get_delivery_repository()
+    deliveries_page = delivery_repository.get_page(
+        parse_optional_value_from_json(deliveries_as_json_dict, "cursor", str),
+        parse_optional_value_from_json(deliveries_as_json_dict, "limit", int),
+        parse_optional_value_from_json(deliveries_as_json_dict, "user_id", int),
+    )
+
+    return {
+        "deliveries": deliveries_page.items,
+        "next_cursor": deliveries_page.next_cursor,
+    }
+
+
+def _deliveries_to_ndjson(deliveries: Iterator[Delivery]) -> Iterator[bytes]:
+    for delivery in deliveries:
+        yield dumps(delivery) + b"\n"
+
+
+def export_deliveries(_: Mapping[str, Any]) -> Response:
+    """
+    Streams every delivery with its meal orders as newline delimited JSON.
+    The body is generated while it is sent, after the handler's unit of
+    work has closed, so the export reads on a connection of its own.
+    """
+
+    delivery_repository = get_delivery_repository()
+    return Response(
+        _deliveries_to_ndjson(delivery_repository.stream_all()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=deliveries.ndjson"},
+    )
@@ -1,13 +1,21 @@
+import asyncio
 from typing import Any, Mapping
 
-from ..delivery import get_delivery_repository
+from sqlalchemy.exc import NoResultFound
+
+from ..delivery import get_delivery_repository, get_async_delivery_repository
 from ..handling_event import (
     HandlingEvent,
     get_handling_event_factory,
     get_handling_event_repository,
+    get_async_handling_event_factory,
+    get_async_handling_event_repository,
 )
-from ..user import User, get_user_repository
-from ..services import send_customer_email
+from ..user import User, get_user_repository, get_async_user_repository
+from ..services.outbox import enqueue_customer_email, enqueue_customer_email_async
+from ..unit_of_work import async_transaction
+from ..util import parse_int_from_json, parse_optional_value_from_json
+from .bulk import create_many_from_json_request
 
 
 def is_first_handling_event_for_delivery(delivery_id: int) -> bool:
@@ -16,8 +24,6 @@ def is_first_handling_event_for_delivery(delivery_id: int) -> bool:
     delivery_handling_events = handling_event_repository.get_from_delivery_id(
         delivery_id
     )
-    print("Handling events")
-    print(delivery_handling_events)
 
     return len(delivery_handling_events) == 1
 
@@ -27,7 +33,21 @@ def is_to_address_customer_address(handling_event: HandlingEvent, user: User) ->
     return handling_event.to_address_id == user.address_id
 
 
-def create_new_handling_event(handling_event_as_json_dict: Mapping[str, Any]) -> None:
+ON_ITS_WAY_SUBJECT = "Your order is on it's way!"
+ALMOST_HERE_SUBJECT = "Your order is almost here!"
+
+
+def _get_dedup_key(delivery_id: int, subject: str) -> str:
+    """
+    Each notification is sent at most once per delivery.
+    """
+
+    return f"delivery/{delivery_id}/{subject}"
+
+
+def create_new_handling_event(
+    handling_event_as_json_dict: Mapping[str, Any]
+) -> HandlingEvent:
 
     handling_event_factory = get_handling_event_factory()
     created_handling_event = handling_event_factory.create_from_json(
@@ -41,11 +61,117 @@ def create_new_handling_event(handling_event_as_json_dict: Mapping[str, Any]) ->
     assert handing_event_delivery is not None and "No delivery found for handling event"
 
     user_repository = get_user_repository()
-    handling_event_user = user_repository.get_from_id(handing_event_delivery.id)
+    handling_event_user = user_repository.get_from_id(handing_event_delivery.user_id)
     assert handling_event_user is not None and "No user found for handling event"
 
+    # The emails are sent by the outbox dispatcher once the handling event is
+    # committed, see hello_food/services/outbox.py
+    subjects: list[str] = []
     if is_first_handling_event_for_delivery(created_handling_event.delivery_id):
-        send_customer_email(handling_event_user.email, "Your order is on it's way!", "")
-
+        subjects.append(ON_ITS_WAY_SUBJECT)
     if is_to_address_customer_address(created_handling_event, handling_event_user):
-        send_customer_email(handling_event_user.email, "Your order is almost here!", "")
+        subjects.append(ALMOST_HERE_SUBJECT)
+
+    for subject in subjects:
+        enqueue_customer_email(
+            handling_event_user.email,
+            subject,
+            "",
+            _get_dedup_key(handing_event_delivery.id, subject),
+        )
+
+    return created_handling_event
+
+
+async def create_new_handling_event_async(
+    handling_event_as_json_dict: Mapping[str, Any]
+) -> HandlingEvent:
+    """
+    The asyncio counterpart of create_new_handling_event. The delivery and
+    its earlier handling events are looked up concurrently, then the
+    handling event and its customer emails are written in one transaction.
+    """
+
+    delivery_id = parse_int_from_json(handling_event_as_json_dict, "delivery_id")
+    handing_event_delivery, delivery_handling_events = await asyncio.gather(
+        get_async_delivery_repository().get_from_id(delivery_id),
+        get_async_handling_event_repository().get_from_delivery_id(delivery_id),
+    )
+    assert handing_event_delivery is not None and "No delivery found for handling event"
+
+    user_repository = get_async_user_repository()
+    handling_event_user = await user_repository.get_from_id(
+        handing_event_delivery.user_id
+    )
+    assert handling_event_user is not None and "No user found for handling event"
+
+    handling_event_factory = get_async_handling_event_factory()
+    async with async_transaction():
+        created_handling_event = await handling_event_factory.create_from_json(
+            handling_event_as_json_dict
+        )
+
+        subjects: list[str] = []
+        if not delivery_handling_events:
+            subjects.append(ON_ITS_WAY_SUBJECT)
+        if is_to_address_customer_address(created_handling_event, handling_event_user):
+            subjects.append(ALMOST_HERE_SUBJECT)
+
+        for subject in subjects:
+            await enqueue_customer_email_async(
+                handling_event_user.email,
+                subject,
+                "",
+                _get_dedup_key(handing_event_delivery.id, subject),
+            )
+
+    return created_handling_event
+
+
+def create_new_handling_events(
+    handling_events_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
+    """
+    Records many handling events at once, for instance when importing the
+    handling history of existing deliveries. No customer emails are sent for
+    these events.
+    """
+
+    handling_event_factory = get_handling_event_factory()
+    return create_many_from_json_request(
+        handling_event_factory, handling_events_as_json_dict, _get_handling_event_id
+    )
+
+
+def _get_handling_event_id(handling_event: HandlingEvent) -> int:
+    return handling_event.id
+
+
+def get_handling_event(
+    handling_event_id_as_json_dict: Mapping[str, Any]
+) -> HandlingEvent:
+
+    handling_event_id = parse_int_from_json(handling_event_id_as_json_dict, "id")
+    handling_event = get_handling_event_repository().get_from_id(handling_event_id)
+    if handling_event is None:
+        raise NoResultFound(f"No handling event found for id={handling_event_id}")
+    return handling_event
+
+
+def get_handling_events(
+    handling_events_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
+
+    handling_event_repository = get_handling_event_repository()
+    handling_events_page = handling_event_repository.get_page(
+        parse_optional_value_from_json(handling_events_as_json_dict, "cursor", str),
+        parse_optional_value_from_json(handling_events_as_json_dict, "limit", int),
+        parse_optional_value_from_json(
+            handling_events_as_json_dict, "delivery_id", int
+        ),
+    )
+
+    return {
+        "handling_events": handling_events_page.items,
+        "next_cursor": handling_events_page.next_cursor,
+    }
@@ -1,20 +1,99 @@
 from typing import Any, Mapping
 
-from ..meal import Meal, get_meal_factory, get_meal_repository
-from ..util import parse_str_from_json
+from sqlalchemy.exc import NoResultFound
 
+from ..meal import (
+    Meal,
+    get_meal_factory,
+    get_meal_repository,
+    get_async_meal_repository,
+)
+from ..util import (
+    get_attribute_from_json,
+    parse_int_from_json,
+    parse_str_from_json,
+    parse_optional_value_from_json,
+)
+from .bulk import create_many_from_json_request, csv_import_to_json_dict
 
-def create_new_meal(meal_as_json_dict: Mapping[str, Any]) -> None:
+
+def create_new_meal(meal_as_json_dict: Mapping[str, Any]) -> Meal:
 
     meal_factory = get_meal_factory()
-    meal_factory.create_from_json(meal_as_json_dict)
+    return meal_factory.create_from_json(meal_as_json_dict)
 
 
-def get_meals_from_cuisine(
+def get_meal(meal_id_as_json_dict: Mapping[str, Any]) -> Meal:
+
+    meal_id = parse_int_from_json(meal_id_as_json_dict, "id")
+    meal = get_meal_repository().get_from_id(meal_id)
+    if meal is None:
+        raise NoResultFound(f"No meal found for id={meal_id}")
+    return meal
+
+
+def create_new_meals(meals_as_json_dict: Mapping[str, Any]) -> dict[str, Any]:
+
+    meal_factory = get_meal_factory()
+    return create_many_from_json_request(meal_factory, meals_as_json_dict, _get_meal_id)
+
+
+def import_meals(meals_as_csv: Mapping[str, Any]) -> dict[str, Any]:
+
+    meal_factory = get_meal_factory()
+    result = meal_factory.create_many_from_csv(
+        get_attribute_from_json(meals_as_csv, "csv")
+    )
+    return csv_import_to_json_dict(result)
+
+
+def _get_meal_id(meal: Meal) -> int:
+    return meal["id"]
+
+
+_MealsFromCuisineValues = tuple[str, str | None, int | None, float | None, float | None]
+
+
+def _parse_meals_from_cuisine_request(
     meals_from_cuisine_as_json_dict: Mapping[str, Any]
-) -> list[Meal]:
+) -> _MealsFromCuisineValues:
 
     cuisine = parse_str_from_json(meals_from_cuisine_as_json_dict, "cuisine")
+    cursor = parse_optional_value_from_json(
+        meals_from_cuisine_as_json_dict, "cursor", str
+    )
+    limit = parse_optional_value_from_json(
+        meals_from_cuisine_as_json_dict, "limit", int
+    )
+    min_price = parse_optional_value_from_json(
+        meals_from_cuisine_as_json_dict, "min_price", float
+    )
+    max_price = parse_optional_value_from_json(
+        meals_from_cuisine_as_json_dict, "max_price", float
+    )
+
+    return cuisine, cursor, limit, min_price, max_price
+
+
+def get_meals_from_cuisine(
+    meals_from_cuisine_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
 
     meal_repository = get_meal_repository()
-    return meal_repository.get_from_cuisine(cuisine)
+    meals_page = meal_repository.get_page_from_cuisine(
+        *_parse_meals_from_cuisine_request(meals_from_cuisine_as_json_dict)
+    )
+
+    return {"meals": meals_page.items, "next_cursor": meals_page.next_cursor}
+
+
+async def get_meals_from_cuisine_async(
+    meals_from_cuisine_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
+
+    meal_repository = get_async_meal_repository()
+    meals_page = await meal_repository.get_page_from_cuisine(
+        *_parse_meals_from_cuisine_request(meals_from_cuisine_as_json_dict)
+    )
+
+    return {"meals": meals_page.items, "next_cursor": meals_page.next_cursor}
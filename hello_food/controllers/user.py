@@ -1,15 +1,75 @@
 from typing import Any, Mapping
 
-from ..user import get_standard_user_factory, get_trial_user_factory
+from sqlalchemy.exc import NoResultFound
 
+from ..user import (
+    User,
+    StandardUser,
+    TrialUser,
+    get_standard_user_factory,
+    get_trial_user_factory,
+    get_user_repository,
+)
+from ..util import parse_int_from_json, parse_optional_value_from_json
+from .bulk import create_many_from_json_request
 
-def create_new_trial_user(trial_user_as_json_dict: Mapping[str, Any]) -> None:
+
+def create_new_trial_user(trial_user_as_json_dict: Mapping[str, Any]) -> TrialUser:
+
+    trial_user_factory = get_trial_user_factory()
+    return trial_user_factory.create_from_json(trial_user_as_json_dict)
+
+
+def create_new_standard_user(
+    standard_user_as_json_dict: Mapping[str, Any]
+) -> StandardUser:
+
+    standard_user_factory = get_standard_user_factory()
+    return standard_user_factory.create_from_json(standard_user_as_json_dict)
+
+
+def create_new_trial_users(
+    trial_users_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
 
     trial_user_factory = get_trial_user_factory()
-    trial_user_factory.create_from_json(trial_user_as_json_dict)
+    return create_many_from_json_request(
+        trial_user_factory, trial_users_as_json_dict, _get_user_id
+    )
 
 
-def create_new_standard_user(standard_user_as_json_dict: Mapping[str, Any]) -> None:
+def create_new_standard_users(
+    standard_users_as_json_dict: Mapping[str, Any]
+) -> dict[str, Any]:
 
     standard_user_factory = get_standard_user_factory()
-    standard_user_factory.create_from_json(standard_user_as_json_dict)
+    return create_many_from_json_request(
+        standard_user_factory, standard_users_as_json_dict, _get_user_id
+    )
+
+
+def _get_user_id(user: User) -> int:
+    return user.id
+
+
+def get_user(user_id_as_json_dict: Mapping[str, Any]) -> User:
+
+    user_id = parse_int_from_json(user_id_as_json_dict, "id")
+    user = get_user_repository().get_from_id(user_id)
+    if user is None:
+        raise NoResultFound(f"No user found for id={user_id}")
+    return user
+
+
+def get_users(users_as_json_dict: Mapping[str, Any]) -> dict[str, Any]:
+
+    user_repository = get_user_repository()
+    users_page = user_repository.get_page(
+        parse_optional_value_from_json(users_as_json_dict, "cursor", str),
+        parse_optional_value_from_json(users_as_json_dict, "limit", int),
+    )
+
+    return {
+        "users": users_page.items,
+        "next_cursor": users_page.next_cursor,
+    }
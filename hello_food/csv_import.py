@@ -0,0 +1,33 @@
+"""
+Imports meals or addresses from a CSV file, see hello_food/bulk_copy.py.
+
+    python -m hello_food.csv_import meals menu.csv
+"""
+
+import argparse
+
+from .address import get_address_factory
+from .log import configure_logging
+from .meal import get_meal_factory
+from .unit_of_work import UnitOfWork
+
+
+if __name__ == "__main__":
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("entity", choices=("meals", "addresses"))
+    parser.add_argument("path", help="path of the CSV file to import")
+    arguments = parser.parse_args()
+
+    factory = (
+        get_meal_factory() if arguments.entity == "meals" else get_address_factory()
+    )
+    with open(arguments.path, newline="") as csv_file, UnitOfWork():
+        result = factory.create_many_from_csv(csv_file)
+
+    print(
+        f"Imported {result.imported} {arguments.entity}, skipped "
+        f"{result.duplicates} duplicates and rejected {result.rejected} rows"
+    )
+    for line_number, error in result.rejected_rows:
+        print(f"line {line_number}: {error}")
@@ -1,4 +1,4 @@
 from .orm import delivery_table, meal_order_table
-from .model import Delivery, MealOrder
-from .factory import get_delivery_factory
-from .repository import get_delivery_repository
+from .model import Delivery, DeliveryBatch, MealOrder
+from .factory import get_delivery_factory, get_async_delivery_factory
+from .repository import get_delivery_repository, get_async_delivery_repository
@@ -1,14 +1,83 @@
 from abc import ABC, abstractmethod
+import asyncio
 from typing import override, Any, Mapping
 
-from sqlalchemy import insert
+from sqlalchemy import insert, select, bindparam, column, func, true, Integer, Insert
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from .orm import delivery_table, meal_order_table
 from .model import Delivery, MealOrder
-from ..meal import get_meal_repository
-from ..user import get_user_repository
+from ..meal import get_meal_repository, get_async_meal_repository
+from ..user import get_user_repository, get_async_user_repository
 from ..mixins import JsonFactory
-from ..sql import engine
+from ..validation import Field, ListField
+from ..statements import registered_statement
+from ..unit_of_work import async_sql_connection, sql_connection, register_identity
+
+
+@registered_statement
+def _insert_delivery() -> Insert:
+    """
+    Builds a single statement inserting a delivery and all of its meal orders.
+    The delivery is inserted by a data modifying CTE whose id is joined
+    against the meal orders, which are passed as two arrays:
+
+        WITH new_delivery AS (INSERT INTO "Delivery" ... RETURNING id)
+        INSERT INTO "MealOrder" (delivery_id, meal_id, quantity)
+        SELECT new_delivery.id, v.meal_id, v.quantity
+        FROM new_delivery JOIN unnest(:meal_ids, :quantities) AS v ON true
+        RETURNING delivery_id
+
+    Passing the meal orders as arrays keeps the statement the same for every
+    order size, so it is compiled once and reused.
+    """
+
+    new_delivery = (
+        insert(delivery_table)
+        .values(
+            user_id=bindparam("user_id"),
+            address_id=bindparam("address_id"),
+            total=bindparam("total"),
+        )
+        .returning(delivery_table.c.id)
+        .cte("new_delivery")
+    )
+    meal_order_values = (
+        func.unnest(
+            bindparam("meal_ids", type_=ARRAY(Integer)),
+            bindparam("quantities", type_=ARRAY(Integer)),
+        )
+        .table_valued(
+            column("meal_id", Integer),
+            column("quantity", Integer),
+        )
+        .render_derived(name="meal_order_values")
+    )
+
+    return (
+        insert(meal_order_table)
+        .from_select(
+            ["delivery_id", "meal_id", "quantity"],
+            select(
+                new_delivery.c.id,
+                meal_order_values.c.meal_id,
+                meal_order_values.c.quantity,
+            ).select_from(new_delivery.join(meal_order_values, true())),
+        )
+        .returning(meal_order_table.c.delivery_id)
+    )
+
+
+def _insert_delivery_parameters(
+    user_id: int, address_id: int, total: float, meal_orders: list[MealOrder]
+) -> dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "address_id": address_id,
+        "total": total,
+        "meal_ids": [meal_order.meal_id for meal_order in meal_orders],
+        "quantities": [meal_order.quantity for meal_order in meal_orders],
+    }
 
 
 class DeliveryFactory(JsonFactory[Delivery], ABC):
@@ -25,6 +94,12 @@ class DeliveryFactory(JsonFactory[Delivery], ABC):
 
 class DeliverySqlFactory(DeliveryFactory):
 
+    _schema = (
+        Field("user_id", int),
+        Field("address_id", int),
+        ListField("meal_orders", (Field("meal_id", int), Field("quantity", int))),
+    )
+
     @override
     @classmethod
     def create_from_values(
@@ -52,53 +127,126 @@ class DeliverySqlFactory(DeliveryFactory):
             MealOrder.assert_quantity_is_positive_integer(quantity)
 
         meal_ids = [meal_id for (meal_id, _) in meal_order_tuples]
+        MealOrder.assert_meal_ids_are_unique(meal_ids)
         meal_repository = get_meal_repository()
         meals = meal_repository.get_from_ids(meal_ids)
 
         delivery_total = Delivery.compute_total(meal_orders, meals)
 
-        with engine.connect() as connection:
-            delivery_statement = (
-                insert(delivery_table)
-                .values(
-                    user_id=user_id,
-                    address_id=address_id,
-                    total=delivery_total,
+        with sql_connection() as connection:
+            delivery_id = (
+                connection.execute(
+                    _insert_delivery(),
+                    _insert_delivery_parameters(
+                        user_id, address_id, delivery_total, meal_orders
+                    ),
                 )
-                .returning(delivery_table.c.id)
+                .scalars()
+                .first()
             )
-            delivery_id = connection.execute(delivery_statement).scalar_one()
-            connection.commit()
 
-            for meal_id, quantity in meal_order_tuples:
-                meal_order_statement = insert(meal_order_table).values(
-                    delivery_id=delivery_id, meal_id=meal_id, quantity=quantity
-                )
-                connection.execute(meal_order_statement)
-            connection.commit()
+        assert delivery_id is not None and "Delivery was not created"
 
-        return Delivery(delivery_id, user_id, address_id, delivery_total, meal_orders)
+        delivery = Delivery(
+            delivery_id, user_id, address_id, delivery_total, meal_orders
+        )
+        return register_identity(Delivery, delivery_id, delivery)
 
     @override
     @classmethod
     def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Delivery:
 
-        meal_orders_as_json: Any = json_as_dict.get("meal_orders")
-        assert meal_orders_as_json is not None
-        assert isinstance(meal_orders_as_json, list)
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
+
+
+class AsyncDeliveryFactory(ABC):
+    """
+    The asyncio counterpart of DeliveryFactory.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def create_from_values(
+        self,
+        user_id: int,
+        address_id: int,
+        meal_orders: list[tuple[int, int]],
+    ) -> Delivery: ...
+
+    @classmethod
+    @abstractmethod
+    async def create_from_json(self, json_as_dict: Mapping[str, Any]) -> Delivery: ...
+
+
+class AsyncDeliverySqlFactory(AsyncDeliveryFactory):
+
+    @override
+    @classmethod
+    async def create_from_values(
+        cls,
+        user_id: int,
+        address_id: int,
+        meal_order_tuples: list[tuple[int, int]],
+    ) -> Delivery:
+        """
+        Enforces the same invariants as DeliverySqlFactory. The user and the
+        meals are looked up concurrently.
+        """
+
+        meal_orders: list[MealOrder] = [
+            MealOrder(meal_id, quantity) for (meal_id, quantity) in meal_order_tuples
+        ]
 
-        meal_order_tuples: list[tuple[int, int]] = []
-        for item in meal_orders_as_json:
-            assert isinstance(item, dict)
-            meal_id = cls._parse_int_from_json(item, "meal_id")
-            quantity = cls._parse_int_from_json(item, "quantity")
-            meal_order_tuples.append((meal_id, quantity))
+        for _, quantity in meal_order_tuples:
+            MealOrder.assert_quantity_is_positive_integer(quantity)
 
-        user_id = cls._parse_int_from_json(json_as_dict, "user_id")
-        address_id = cls._parse_int_from_json(json_as_dict, "address_id")
+        meal_ids = [meal_id for (meal_id, _) in meal_order_tuples]
+        MealOrder.assert_meal_ids_are_unique(meal_ids)
 
-        return cls.create_from_values(user_id, address_id, meal_order_tuples)
+        delivery_user, meals = await asyncio.gather(
+            get_async_user_repository().get_from_id(user_id),
+            get_async_meal_repository().get_from_ids(meal_ids),
+        )
+        assert delivery_user is not None and "Invalid user id given for delivery"
+
+        assert (
+            delivery_user.meals_per_week
+            == sum(meal_tuple[1] for meal_tuple in meal_order_tuples)
+            and "Number of meals in delivery does not match user meal constraint"
+        )
+
+        delivery_total = Delivery.compute_total(meal_orders, meals)
+
+        async with async_sql_connection() as connection:
+            delivery_id = (
+                (
+                    await connection.execute(
+                        _insert_delivery(),
+                        _insert_delivery_parameters(
+                            user_id, address_id, delivery_total, meal_orders
+                        ),
+                    )
+                )
+                .scalars()
+                .first()
+            )
+
+        assert delivery_id is not None and "Delivery was not created"
+
+        return Delivery(delivery_id, user_id, address_id, delivery_total, meal_orders)
+
+    @override
+    @classmethod
+    async def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Delivery:
+
+        return await cls.create_from_values(
+            *DeliverySqlFactory._parse_values_from_json(json_as_dict)
+        )
 
 
 def get_delivery_factory() -> DeliveryFactory:
     return DeliverySqlFactory()
+
+
+def get_async_delivery_factory() -> AsyncDeliveryFactory:
+    return AsyncDeliverySqlFactory()
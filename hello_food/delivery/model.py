@@ -1,6 +1,8 @@
-from typing import NamedTuple
+from array import array
+from typing import Iterable, Iterator, NamedTuple
 
 from ..meal import Meal
+from ..mixins import ChangeTracked
 
 
 class MealOrder(NamedTuple):
@@ -11,8 +13,17 @@ class MealOrder(NamedTuple):
     def assert_quantity_is_positive_integer(cls, quantity: int) -> None:
         assert quantity > 0 and "Quantity must be greater than 0"
 
+    @classmethod
+    def assert_meal_ids_are_unique(cls, meal_ids: list[int]) -> None:
+        assert (
+            len(set(meal_ids)) == len(meal_ids)
+            and "Each meal may only be ordered once per delivery"
+        )
 
-class Delivery:
+
+class Delivery(ChangeTracked):
+
+    __slots__ = ("id", "user_id", "address_id", "total", "meal_orders")
 
     def __init__(
         self,
@@ -28,6 +39,7 @@ class Delivery:
         self.address_id: int = address_id
         self.total: float = total
         self.meal_orders: list[MealOrder] = meal_orders
+        self.mark_clean()
 
     @classmethod
     def compute_total(cls, meal_orders: list[MealOrder], meals: list[Meal]) -> float:
@@ -50,3 +62,92 @@ class Delivery:
             total == cls.compute_total(meal_orders, meals)
             and "total does not match sum of meal orders"
         )
+
+
+class DeliveryBatch:
+    """
+    Holds many deliveries column by column in typed arrays rather than as a
+    Delivery each, for jobs that read deliveries in bulk. The meal orders of
+    all deliveries are stored one after the other, the meal orders of the
+    delivery at index i starting at meal_order_starts[i].
+
+    Deliveries are appended in order along with their meal orders, after
+    which indexing the batch builds the Delivery at that index.
+    """
+
+    __slots__ = (
+        "ids",
+        "user_ids",
+        "address_ids",
+        "totals",
+        "meal_order_starts",
+        "meal_ids",
+        "quantities",
+    )
+
+    def __init__(self) -> None:
+        self.ids: array[int] = array("q")
+        self.user_ids: array[int] = array("q")
+        self.address_ids: array[int] = array("q")
+        self.totals: array[float] = array("d")
+        self.meal_order_starts: array[int] = array("q")
+        self.meal_ids: array[int] = array("q")
+        self.quantities: array[int] = array("q")
+
+    @classmethod
+    def from_deliveries(cls, deliveries: Iterable[Delivery]) -> "DeliveryBatch":
+        batch = cls()
+        for delivery in deliveries:
+            batch.append_delivery(
+                delivery.id, delivery.user_id, delivery.address_id, delivery.total
+            )
+            for meal_id, quantity in delivery.meal_orders:
+                batch.append_meal_order(meal_id, quantity)
+        return batch
+
+    def append_delivery(
+        self, id_: int, user_id: int, address_id: int, total: float
+    ) -> None:
+        """
+        Appends a delivery, whose meal orders are the meal orders appended
+        until the next delivery.
+        """
+
+        self.ids.append(id_)
+        self.user_ids.append(user_id)
+        self.address_ids.append(address_id)
+        self.totals.append(total)
+        self.meal_order_starts.append(len(self.meal_ids))
+
+    def append_meal_order(self, meal_id: int, quantity: int) -> None:
+        assert self.ids and "Append a delivery before its meal orders"
+        self.meal_ids.append(meal_id)
+        self.quantities.append(quantity)
+
+    def get_meal_orders(self, index: int) -> list[MealOrder]:
+        # Also resolves negative indexes, for the bounds below
+        index = range(len(self.ids))[index]
+        start = self.meal_order_starts[index]
+        end = (
+            self.meal_order_starts[index + 1]
+            if index + 1 < len(self.meal_order_starts)
+            else len(self.meal_ids)
+        )
+        return list(
+            map(MealOrder, self.meal_ids[start:end], self.quantities[start:end])
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Delivery:
+        return Delivery(
+            self.ids[index],
+            self.user_ids[index],
+            self.address_ids[index],
+            self.totals[index],
+            self.get_meal_orders(index),
+        )
+
+    def __iter__(self) -> Iterator[Delivery]:
+        return map(self.__getitem__, range(len(self.ids)))
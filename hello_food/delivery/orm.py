@@ -1,6 +1,6 @@
-from sqlalchemy import Table, Column, Integer, Float, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, Float, ForeignKey
 
-from ..sql import metadata
+from ..sql import metadata, created_column
 
 meal_order_table = Table(
     "MealOrder",
@@ -27,4 +27,17 @@ delivery_table = Table(
     Column("user_id", Integer, ForeignKey("User.id"), nullable=False),
     Column("address_id", Integer, ForeignKey("Address.id"), nullable=False),
     Column("total", Float, nullable=False),
+    created_column(),
+)
+
+# delivery_id is not the leading column of the MealOrder primary key, so it
+# needs an index of its own to look up the meal orders of a delivery.
+Index("ix_meal_order_delivery_id", meal_order_table.c.delivery_id)
+# Deliveries are listed newest first, overall or for a user.
+Index("ix_delivery_created_id", delivery_table.c.created, delivery_table.c.id)
+Index(
+    "ix_delivery_user_id_created_id",
+    delivery_table.c.user_id,
+    delivery_table.c.created,
+    delivery_table.c.id,
 )
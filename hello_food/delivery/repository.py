@@ -1,11 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import override
+from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter
+from typing import override, Any, Final, Iterable, Iterator
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, Row, Select
 
 from .orm import delivery_table, meal_order_table
-from .model import Delivery, MealOrder
-from ..sql import engine
+from .model import Delivery, DeliveryBatch, MealOrder
+from ..pagination import (
+    Page,
+    clamp_page_size,
+    newest_first_parameters,
+    order_newest_first,
+    split_newest_first_rows,
+)
+from ..statements import registered_statement
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    get_identity,
+    register_identity,
+)
+
+
+@registered_statement
+def _select_delivery_from_id() -> Select[tuple[Any, ...]]:
+    return select(delivery_table).where(delivery_table.c.id == bindparam("id"))
+
+
+@registered_statement
+def _select_meal_orders_from_delivery_id() -> Select[tuple[Any, ...]]:
+    return select(meal_order_table).where(
+        meal_order_table.c.delivery_id == bindparam("delivery_id")
+    )
+
+
+@registered_statement
+def _select_meal_orders_from_delivery_ids() -> Select[tuple[Any, ...]]:
+    return select(meal_order_table).where(
+        meal_order_table.c.delivery_id.in_(bindparam("delivery_ids", expanding=True))
+    )
+
+
+@registered_statement
+def _select_delivery_page(
+    has_cursor: bool, has_user_id: bool
+) -> Select[tuple[Any, ...]]:
+
+    statement = select(delivery_table)
+    if has_user_id:
+        statement = statement.where(delivery_table.c.user_id == bindparam("user_id"))
+
+    return order_newest_first(statement, delivery_table, has_cursor)
+
+
+# Rows fetched per round trip when streaming deliveries
+STREAM_BATCH_SIZE: Final[int] = 1000
+
+
+@registered_statement
+def _select_deliveries_with_meal_orders() -> Select[tuple[Any, ...]]:
+    return (
+        select(
+            delivery_table.c.id,
+            delivery_table.c.user_id,
+            delivery_table.c.address_id,
+            delivery_table.c.total,
+            meal_order_table.c.meal_id,
+            meal_order_table.c.quantity,
+        )
+        .select_from(
+            delivery_table.outerjoin(
+                meal_order_table, meal_order_table.c.delivery_id == delivery_table.c.id
+            )
+        )
+        .order_by(delivery_table.c.id)
+    )
+
+
+def delivery_from_rows(
+    delivery_row: Row[Any], meal_order_rows: Iterable[Row[Any]]
+) -> Delivery:
+    meal_orders = [
+        MealOrder(meal_order_row.meal_id, meal_order_row.quantity)
+        for meal_order_row in meal_order_rows
+    ]
+    return Delivery(
+        delivery_row.id,
+        delivery_row.user_id,
+        delivery_row.address_id,
+        delivery_row.total,
+        meal_orders,
+    )
 
 
 class DeliveryRepository(ABC):
@@ -14,6 +101,40 @@ class DeliveryRepository(ABC):
     @abstractmethod
     def get_from_id(self, id_: int) -> Delivery | None: ...
 
+    @classmethod
+    @abstractmethod
+    def get_page(
+        cls,
+        cursor: str | None = None,
+        limit: int | None = None,
+        user_id: int | None = None,
+    ) -> Page[Delivery]:
+        """
+        Gets a page of deliveries newest first, optionally only those of a
+        user. Pass the next_cursor of a page to get the page after it.
+        """
+        ...
+
+    @classmethod
+    @abstractmethod
+    def stream_all(cls) -> Iterator[Delivery]:
+        """
+        Iterates over every delivery in id order, without holding more than
+        a batch of them in memory.
+        """
+        ...
+
+    @classmethod
+    @abstractmethod
+    def stream_batches(
+        cls, batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[DeliveryBatch]:
+        """
+        Iterates over every delivery in id order as DeliveryBatches of up to
+        batch_size deliveries.
+        """
+        ...
+
 
 class DeliverySqlRepository(DeliveryRepository):
 
@@ -21,31 +142,165 @@ class DeliverySqlRepository(DeliveryRepository):
     @override
     def get_from_id(self, id_: int) -> Delivery | None:
 
-        with engine.connect() as connection:
-            delivery_statement = select(delivery_table).where(
-                delivery_table.c.id == id_
-            )
-            delivery_orm = connection.execute(delivery_statement).one_or_none()
+        delivery = get_identity(Delivery, id_)
+        if delivery is not None:
+            return delivery
+
+        with sql_connection(read_only=True) as connection:
+            delivery_orm = connection.execute(
+                _select_delivery_from_id(), {"id": id_}
+            ).one_or_none()
             if delivery_orm is None:
                 return None
 
-            meal_orders_statement = select(meal_order_table).where(
-                meal_order_table.c.delivery_id == id_
+            meal_orders_orm = connection.execute(
+                _select_meal_orders_from_delivery_id(), {"delivery_id": id_}
+            ).all()
+
+        delivery = delivery_from_rows(delivery_orm, meal_orders_orm)
+        return register_identity(Delivery, id_, delivery)
+
+    @classmethod
+    @override
+    def get_page(
+        cls,
+        cursor: str | None = None,
+        limit: int | None = None,
+        user_id: int | None = None,
+    ) -> Page[Delivery]:
+
+        limit = clamp_page_size(limit)
+        parameters = newest_first_parameters(cursor, limit)
+        if user_id is not None:
+            parameters["user_id"] = user_id
+
+        with sql_connection(read_only=True) as connection:
+            delivery_rows, next_cursor = split_newest_first_rows(
+                connection.execute(
+                    _select_delivery_page(cursor is not None, user_id is not None),
+                    parameters,
+                ).all(),
+                limit,
             )
-            meal_orders_orm = connection.execute(meal_orders_statement).all()
 
-        meal_orders = [
-            MealOrder(meal_order_orm.meal_id, meal_order_orm.quantity)
-            for meal_order_orm in meal_orders_orm
+            # The meal orders of the whole page are loaded with one query
+            # rather than one per delivery.
+            meal_order_rows = defaultdict(list)
+            if delivery_rows:
+                for meal_order_row in connection.execute(
+                    _select_meal_orders_from_delivery_ids(),
+                    {"delivery_ids": [row.id for row in delivery_rows]},
+                ):
+                    meal_order_rows[meal_order_row.delivery_id].append(meal_order_row)
+
+        deliveries = [
+            get_identity(Delivery, row.id)
+            or register_identity(
+                Delivery, row.id, delivery_from_rows(row, meal_order_rows[row.id])
+            )
+            for row in delivery_rows
         ]
-        return Delivery(
-            id_,
-            delivery_orm.user_id,
-            delivery_orm.address_id,
-            delivery_orm.total,
-            meal_orders,
-        )
+        return Page(deliveries, next_cursor)
+
+    @classmethod
+    @override
+    def stream_all(cls) -> Iterator[Delivery]:
+        """
+        Reads the deliveries joined to their meal orders in one scan ordered
+        by delivery id, through a server side cursor fetching
+        STREAM_BATCH_SIZE rows at a time, and groups the rows of each
+        delivery as they arrive. The connection is checked out when the
+        iteration starts, so the iterator can outlive the unit of work it was
+        created in. The deliveries are not added to the identity map.
+        """
+
+        with sql_connection(read_only=True) as connection:
+            rows = connection.execute(
+                _select_deliveries_with_meal_orders(),
+                execution_options={"yield_per": STREAM_BATCH_SIZE},
+            )
+            for _, grouped_rows in groupby(rows, key=attrgetter("id")):
+                delivery_rows = list(grouped_rows)
+                # A delivery without meal orders is joined to a row of nulls
+                yield delivery_from_rows(
+                    delivery_rows[0],
+                    (row for row in delivery_rows if row.meal_id is not None),
+                )
+
+    @classmethod
+    @override
+    def stream_batches(
+        cls, batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[DeliveryBatch]:
+        """
+        Reads the same scan as stream_all, appending the columns of each row
+        straight to the batch without building a Delivery or a MealOrder.
+        The deliveries of a batch are not added to the identity map.
+        """
+
+        assert batch_size > 0 and "Batch size must be greater than 0"
+
+        with sql_connection(read_only=True) as connection:
+            rows = connection.execute(
+                _select_deliveries_with_meal_orders(),
+                execution_options={"yield_per": STREAM_BATCH_SIZE},
+            )
+
+            batch = DeliveryBatch()
+            previous_id = None
+            for id_, user_id, address_id, total, meal_id, quantity in rows:
+                # The rows of a delivery are adjacent, so a batch is only
+                # ever full between two deliveries
+                if id_ != previous_id:
+                    if len(batch) == batch_size:
+                        yield batch
+                        batch = DeliveryBatch()
+                    batch.append_delivery(id_, user_id, address_id, total)
+                    previous_id = id_
+
+                # A delivery without meal orders is joined to a row of nulls
+                if meal_id is not None:
+                    batch.append_meal_order(meal_id, quantity)
+
+            if batch:
+                yield batch
+
+
+class AsyncDeliveryRepository(ABC):
+    """
+    The asyncio counterpart of DeliveryRepository.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def get_from_id(self, id_: int) -> Delivery | None: ...
+
+
+class AsyncDeliverySqlRepository(AsyncDeliveryRepository):
+
+    @classmethod
+    @override
+    async def get_from_id(cls, id_: int) -> Delivery | None:
+
+        async with async_sql_connection() as connection:
+            delivery_orm = (
+                await connection.execute(_select_delivery_from_id(), {"id": id_})
+            ).one_or_none()
+            if delivery_orm is None:
+                return None
+
+            meal_orders_orm = (
+                await connection.execute(
+                    _select_meal_orders_from_delivery_id(), {"delivery_id": id_}
+                )
+            ).all()
+
+        return delivery_from_rows(delivery_orm, meal_orders_orm)
 
 
 def get_delivery_repository() -> DeliveryRepository:
     return DeliverySqlRepository()
+
+
+def get_async_delivery_repository() -> AsyncDeliveryRepository:
+    return AsyncDeliverySqlRepository()
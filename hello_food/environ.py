@@ -23,3 +23,161 @@ Indicates that the application is running in a production environment when
 set.
 """
 PROD: Final[str | None] = os.getenv("PROD")
+
+
+def _getenv_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return default if value is None else int(value)
+
+
+def _getenv_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return default if value is None else float(value)
+
+
+def _getenv_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+"""
+The PG database port, user, password and database name.
+"""
+POSTGRES_PORT: Final[int] = _getenv_int("POSTGRES_PORT", 5432)
+POSTGRES_USER: Final[str] = os.getenv("POSTGRES_USER") or "webapp"
+POSTGRES_PASSWORD: Final[str] = os.getenv("POSTGRES_PASSWORD") or "webapp"
+POSTGRES_DB: Final[str] = os.getenv("POSTGRES_DB") or "webapp"
+
+"""
+Log every SQL statement issued by the engines when set, through the logging
+pipeline of log.py rather than on the thread issuing the statement.
+"""
+SQL_ECHO: Final[bool] = _getenv_bool("SQL_ECHO", False)
+
+"""
+The share of debug records and SQL statements that are logged, between 0
+and 1, and the number of records queued for the logging thread past which
+new records are dropped.
+"""
+LOG_DEBUG_SAMPLE_RATE: Final[float] = _getenv_float("LOG_DEBUG_SAMPLE_RATE", 1.0)
+LOG_QUEUE_SIZE: Final[int] = _getenv_int("LOG_QUEUE_SIZE", 10_000)
+
+"""
+How connections are pooled. Either "queue" to keep a pool of connections in
+process, or "pgbouncer" to hand every checkout straight to a PgBouncer running
+in transaction pooling mode.
+"""
+SQL_POOL_MODE: Final[str] = os.getenv("SQL_POOL_MODE") or "queue"
+
+"""
+The number of connections kept open in the pool and the number of extra
+connections that may be opened when the pool is exhausted.
+"""
+SQL_POOL_SIZE: Final[int] = _getenv_int("SQL_POOL_SIZE", 10)
+SQL_MAX_OVERFLOW: Final[int] = _getenv_int("SQL_MAX_OVERFLOW", 20)
+
+"""
+Test connections for liveness before handing them out of the pool.
+"""
+SQL_POOL_PRE_PING: Final[bool] = _getenv_bool("SQL_POOL_PRE_PING", True)
+
+"""
+The number of seconds after which a pooled connection is replaced.
+"""
+SQL_POOL_RECYCLE: Final[int] = _getenv_int("SQL_POOL_RECYCLE", 1800)
+
+"""
+The number of seconds to wait for a connection before giving up on checkout.
+"""
+SQL_POOL_TIMEOUT: Final[int] = _getenv_int("SQL_POOL_TIMEOUT", 30)
+
+"""
+The number of connections opened on application start so the first requests
+do not pay for connection setup.
+"""
+SQL_POOL_PREWARM: Final[int] = _getenv_int("SQL_POOL_PREWARM", 0)
+
+"""
+Comma separated hostnames of PG read replicas. Repository reads are spread
+over the replicas while writes always go to POSTGRES_HOSTNAME. Reads use the
+primary when no replicas are configured.
+"""
+POSTGRES_REPLICA_HOSTNAMES: Final[tuple[str, ...]] = tuple(
+    hostname.strip()
+    for hostname in (os.getenv("POSTGRES_REPLICA_HOSTNAMES") or "").split(",")
+    if hostname.strip()
+)
+
+"""
+Replicas lagging the primary by more than this many seconds are not read
+from. Replication lag is checked on a background thread every
+SQL_REPLICA_LAG_CHECK_INTERVAL seconds.
+"""
+SQL_REPLICA_MAX_LAG_SECONDS: Final[int] = _getenv_int("SQL_REPLICA_MAX_LAG_SECONDS", 5)
+SQL_REPLICA_LAG_CHECK_INTERVAL: Final[int] = _getenv_int(
+    "SQL_REPLICA_LAG_CHECK_INTERVAL", 5
+)
+
+"""
+How the application prepares the schema when it starts. "migrate" applies
+pending migrations, "verify" only checks that the database is at the schema
+version the application expects and leaves migrating to
+`python -m hello_food.schema migrate`. Defaults to "verify" in production.
+"""
+SCHEMA_STARTUP_MODE: Final[str] = os.getenv("SCHEMA_STARTUP_MODE") or (
+    "verify" if PROD else "migrate"
+)
+
+"""
+The maximum number of meals kept in the in process meal catalogue cache and
+the number of seconds a cached meal may be served before it is reloaded.
+"""
+MEAL_CACHE_MAX_SIZE: Final[int] = _getenv_int("MEAL_CACHE_MAX_SIZE", 10_000)
+MEAL_CACHE_TTL_SECONDS: Final[int] = _getenv_int("MEAL_CACHE_TTL_SECONDS", 300)
+
+"""
+The number of outbox emails the dispatcher claims per batch, the number of
+attempts made at sending an email before giving up on it, and the delay
+before the first retry, doubled after every further failure up to
+OUTBOX_MAX_BACKOFF_SECONDS. The dispatcher polls an empty outbox every
+OUTBOX_POLL_INTERVAL seconds.
+"""
+OUTBOX_BATCH_SIZE: Final[int] = _getenv_int("OUTBOX_BATCH_SIZE", 100)
+OUTBOX_MAX_ATTEMPTS: Final[int] = _getenv_int("OUTBOX_MAX_ATTEMPTS", 8)
+OUTBOX_BACKOFF_SECONDS: Final[int] = _getenv_int("OUTBOX_BACKOFF_SECONDS", 30)
+OUTBOX_MAX_BACKOFF_SECONDS: Final[int] = _getenv_int("OUTBOX_MAX_BACKOFF_SECONDS", 3600)
+OUTBOX_POLL_INTERVAL: Final[int] = _getenv_int("OUTBOX_POLL_INTERVAL", 5)
+
+"""
+The number of seconds a dispatcher has to send the emails it claimed, after
+which another dispatcher may claim those it has not sent, for instance
+because it died. Keep it well above the time a batch takes to send.
+"""
+OUTBOX_CLAIM_SECONDS: Final[int] = _getenv_int("OUTBOX_CLAIM_SECONDS", 300)
+
+"""
+The address customer emails are sent from, and the endpoint of the SES API,
+which can point at a local stub of SES. The default endpoint of the region
+is used when SES_ENDPOINT_URL is not set.
+"""
+SES_SOURCE_EMAIL: Final[str] = os.getenv("SES_SOURCE_EMAIL") or "TODO"
+SES_ENDPOINT_URL: Final[str | None] = os.getenv("SES_ENDPOINT_URL") or None
+
+"""
+The number of emails per second bulk sends are limited to, read from the
+account's SES send quota when not set, and the number of bulk send requests
+made concurrently.
+"""
+SES_MAX_SEND_RATE: Final[float | None] = (
+    float(os.environ["SES_MAX_SEND_RATE"]) if os.getenv("SES_MAX_SEND_RATE") else None
+)
+SES_BULK_MAX_WORKERS: Final[int] = _getenv_int("SES_BULK_MAX_WORKERS", 4)
+
+"""
+The number of seconds between two checks of the database health reported at
+/readyz, and the age past which a health snapshot is too old to report the
+process ready, for instance because the check is stuck on an unreachable
+database.
+"""
+HEALTH_CHECK_INTERVAL: Final[int] = _getenv_int("HEALTH_CHECK_INTERVAL", 5)
+HEALTH_MAX_SNAPSHOT_AGE: Final[int] = _getenv_int("HEALTH_MAX_SNAPSHOT_AGE", 30)
@@ -1,4 +1,7 @@
-from .factory import get_handling_event_factory
+from .factory import get_handling_event_factory, get_async_handling_event_factory
 from .model import HandlingEvent
 from .orm import handling_event_table
-from .repository import get_handling_event_repository
+from .repository import (
+    get_handling_event_repository,
+    get_async_handling_event_repository,
+)
@@ -1,15 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import override, Any, Mapping
+from typing import override, Any, Mapping, Sequence
 
-from sqlalchemy import insert
+from sqlalchemy import insert, Insert
 
 from .orm import handling_event_table
 from .model import HandlingEvent
-from ..mixins import JsonFactory
-from ..sql import engine
+from ..mixins import BulkJsonFactory
+from ..statements import registered_statement
+from ..validation import Field
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    sql_savepoint,
+    register_identity,
+)
 
+_HandlingEventValues = tuple[int, int, int, int]
 
-class HandlingEventFactory(JsonFactory[HandlingEvent], ABC):
+
+class HandlingEventFactory(BulkJsonFactory[HandlingEvent], ABC):
 
     @classmethod
     @abstractmethod
@@ -22,8 +31,33 @@ class HandlingEventFactory(JsonFactory[HandlingEvent], ABC):
     ) -> HandlingEvent: ...
 
 
+@registered_statement
+def _insert_handling_event() -> Insert:
+    return insert(handling_event_table).returning(
+        handling_event_table.c.id, sort_by_parameter_order=True
+    )
+
+
+def _insert_handling_event_parameters(
+    delivery_id: int, to_address_id: int, from_address_id: int, completion_time: int
+) -> dict[str, Any]:
+    return {
+        "delivery_id": delivery_id,
+        "to_address_id": to_address_id,
+        "from_address_id": from_address_id,
+        "completion_time": completion_time,
+    }
+
+
 class HandlingEventSqlFactory(HandlingEventFactory):
 
+    _schema = (
+        Field("delivery_id", int),
+        Field("to_address_id", int),
+        Field("from_address_id", int),
+        Field("completion_time", int),
+    )
+
     @classmethod
     @override
     def create_from_values(
@@ -34,44 +68,128 @@ class HandlingEventSqlFactory(HandlingEventFactory):
         completion_time: int,
     ) -> HandlingEvent:
 
-        with engine.connect() as connection:
-            statement = (
-                insert(handling_event_table)
-                .values(
-                    delivery_id=delivery_id,
-                    to_address_id=to_address_id,
-                    from_address_id=from_address_id,
-                    completion_time=completion_time,
-                )
-                .returning(handling_event_table.c.id)
-            )
-            handling_event_id = connection.execute(statement).scalar_one()
-            connection.commit()
+        with sql_connection() as connection:
+            handling_event_id = connection.execute(
+                _insert_handling_event(),
+                _insert_handling_event_parameters(
+                    delivery_id, to_address_id, from_address_id, completion_time
+                ),
+            ).scalar_one()
 
-        return HandlingEvent(
+        handling_event = HandlingEvent(
             handling_event_id,
             delivery_id,
             to_address_id,
             from_address_id,
             completion_time,
         )
+        return register_identity(HandlingEvent, handling_event_id, handling_event)
+
+    @override
+    @classmethod
+    def create_many_from_values(
+        cls, values: Sequence[_HandlingEventValues]
+    ) -> list[HandlingEvent]:
+        """
+        Creates many handling events with multi-row inserts. Unlike the
+        handling event API, no customer emails are sent for these events.
+        """
+
+        with sql_savepoint() as connection:
+            handling_event_ids = (
+                connection.execute(
+                    _insert_handling_event(),
+                    [
+                        _insert_handling_event_parameters(*handling_event_values)
+                        for handling_event_values in values
+                    ],
+                )
+                .scalars()
+                .all()
+            )
+
+        return [
+            register_identity(
+                HandlingEvent,
+                handling_event_id,
+                HandlingEvent(handling_event_id, *handling_event_values),
+            )
+            for handling_event_id, handling_event_values in zip(
+                handling_event_ids, values
+            )
+        ]
 
     @override
     @classmethod
     def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> HandlingEvent:
 
-        delivery_id = cls._parse_int_from_json(json_as_dict, "delivery_id")
-        to_address_id = cls._parse_int_from_json(json_as_dict, "to_address_id")
-        from_address_id = cls._parse_int_from_json(json_as_dict, "from_address_id")
-        completion_time = cls._parse_int_from_json(json_as_dict, "completion_time")
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
 
-        return cls.create_from_values(
+
+class AsyncHandlingEventFactory(ABC):
+    """
+    The asyncio counterpart of HandlingEventFactory.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def create_from_values(
+        self,
+        delivery_id: int,
+        to_address_id: int,
+        from_address_id: int,
+        completion_time: int,
+    ) -> HandlingEvent: ...
+
+    @classmethod
+    @abstractmethod
+    async def create_from_json(
+        self, json_as_dict: Mapping[str, Any]
+    ) -> HandlingEvent: ...
+
+
+class AsyncHandlingEventSqlFactory(AsyncHandlingEventFactory):
+
+    @classmethod
+    @override
+    async def create_from_values(
+        cls,
+        delivery_id: int,
+        to_address_id: int,
+        from_address_id: int,
+        completion_time: int,
+    ) -> HandlingEvent:
+
+        async with async_sql_connection() as connection:
+            handling_event_id = (
+                await connection.execute(
+                    _insert_handling_event(),
+                    _insert_handling_event_parameters(
+                        delivery_id, to_address_id, from_address_id, completion_time
+                    ),
+                )
+            ).scalar_one()
+
+        return HandlingEvent(
+            handling_event_id,
             delivery_id,
             to_address_id,
             from_address_id,
             completion_time,
         )
 
+    @override
+    @classmethod
+    async def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> HandlingEvent:
+
+        return await cls.create_from_values(
+            *HandlingEventSqlFactory._parse_values_from_json(json_as_dict)
+        )
+
 
 def get_handling_event_factory() -> HandlingEventFactory:
     return HandlingEventSqlFactory()
+
+
+def get_async_handling_event_factory() -> AsyncHandlingEventFactory:
+    return AsyncHandlingEventSqlFactory()
@@ -1,5 +1,13 @@
 class HandlingEvent:
 
+    __slots__ = (
+        "id",
+        "delivery_id",
+        "to_address_id",
+        "from_address_id",
+        "completion_time",
+    )
+
     def __init__(
         self,
         id_: int,
@@ -1,6 +1,6 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, ForeignKey
 
-from ..sql import metadata
+from ..sql import metadata, created_column
 
 handling_event_table = Table(
     "HandlingTable",
@@ -10,4 +10,12 @@ handling_event_table = Table(
     Column("to_address_id", Integer, ForeignKey("Address.id")),
     Column("from_address_id", Integer, ForeignKey("Address.id")),
     Column("completion_time", Integer, nullable=False),
+    created_column(),
+)
+
+Index("ix_handling_event_delivery_id", handling_event_table.c.delivery_id)
+Index(
+    "ix_handling_event_created_id",
+    handling_event_table.c.created,
+    handling_event_table.c.id,
 )
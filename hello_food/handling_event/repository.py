@@ -1,11 +1,62 @@
 from abc import ABC, abstractmethod
 from typing import override, Any
 
-from sqlalchemy import select, Select
+from sqlalchemy import bindparam, select, Row, Select
 
 from .orm import handling_event_table
 from .model import HandlingEvent
-from ..sql import engine
+from ..pagination import (
+    Page,
+    clamp_page_size,
+    newest_first_parameters,
+    order_newest_first,
+    split_newest_first_rows,
+)
+from ..statements import registered_statement
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    get_identity,
+    register_identity,
+)
+
+
+def handling_event_from_row(handling_event_row: Row[Any]) -> HandlingEvent:
+    return HandlingEvent(
+        handling_event_row.id,
+        handling_event_row.delivery_id,
+        handling_event_row.to_address_id,
+        handling_event_row.from_address_id,
+        handling_event_row.completion_time,
+    )
+
+
+@registered_statement
+def _select_handling_event_from_id() -> Select[tuple[Any, ...]]:
+    return select(handling_event_table).where(
+        handling_event_table.c.id == bindparam("id")
+    )
+
+
+@registered_statement
+def _select_handling_events_from_delivery_id() -> Select[tuple[Any, ...]]:
+    return select(handling_event_table).where(
+        handling_event_table.c.delivery_id == bindparam("delivery_id")
+    )
+
+
+@registered_statement
+def _select_handling_event_page(
+    has_cursor: bool, has_delivery_id: bool
+) -> Select[tuple[Any, ...]]:
+
+    statement = select(handling_event_table)
+    if has_delivery_id:
+        statement = statement.where(
+            handling_event_table.c.delivery_id == bindparam("delivery_id")
+        )
+
+    return order_newest_first(statement, handling_event_table, has_cursor)
 
 
 class HandlingEventRepository(ABC):
@@ -18,6 +69,20 @@ class HandlingEventRepository(ABC):
     @abstractmethod
     def get_from_delivery_id(self, delivery_id_: int) -> list[HandlingEvent]: ...
 
+    @classmethod
+    @abstractmethod
+    def get_page(
+        cls,
+        cursor: str | None = None,
+        limit: int | None = None,
+        delivery_id: int | None = None,
+    ) -> Page[HandlingEvent]:
+        """
+        Gets a page of handling events newest first, optionally only those of
+        a delivery. Pass the next_cursor of a page to get the page after it.
+        """
+        ...
+
 
 class HandlingEventSqlRepository(HandlingEventRepository):
 
@@ -25,43 +90,125 @@ class HandlingEventSqlRepository(HandlingEventRepository):
     @override
     def get_from_id(self, id_: int) -> HandlingEvent | None:
 
-        statement = select(handling_event_table).where(handling_event_table.c.id == id_)
+        handling_event = get_identity(HandlingEvent, id_)
+        if handling_event is not None:
+            return handling_event
 
-        with engine.connect() as conn:
-            handling_event_orm = conn.execute(statement).one_or_none()
+        with sql_connection(read_only=True) as conn:
+            handling_event_orm = conn.execute(
+                _select_handling_event_from_id(), {"id": id_}
+            ).one_or_none()
             if handling_event_orm is None:
                 return None
 
-        return HandlingEvent(
-            handling_event_orm.id,
-            handling_event_orm.delivery_id,
-            handling_event_orm.to_address_id,
-            handling_event_orm.from_address_id,
-            handling_event_orm.completion_time,
-        )
+        handling_event = handling_event_from_row(handling_event_orm)
+        return register_identity(HandlingEvent, handling_event.id, handling_event)
 
     @classmethod
     @override
     def get_from_delivery_id(self, delivery_id: int) -> list[HandlingEvent]:
 
-        statement = select(handling_event_table).where(
-            handling_event_table.c.delivery_id == delivery_id
-        )
-
-        with engine.connect() as conn:
-            handling_event_orms = conn.execute(statement).all()
+        with sql_connection(read_only=True) as conn:
+            handling_event_orms = conn.execute(
+                _select_handling_events_from_delivery_id(), {"delivery_id": delivery_id}
+            ).all()
 
         return [
-            HandlingEvent(
+            register_identity(
+                HandlingEvent,
                 handling_event_orm.id,
-                handling_event_orm.delivery_id,
-                handling_event_orm.to_address_id,
-                handling_event_orm.from_address_id,
-                handling_event_orm.completion_time,
+                handling_event_from_row(handling_event_orm),
             )
             for handling_event_orm in handling_event_orms
         ]
 
+    @classmethod
+    @override
+    def get_page(
+        cls,
+        cursor: str | None = None,
+        limit: int | None = None,
+        delivery_id: int | None = None,
+    ) -> Page[HandlingEvent]:
+
+        limit = clamp_page_size(limit)
+        parameters = newest_first_parameters(cursor, limit)
+        if delivery_id is not None:
+            parameters["delivery_id"] = delivery_id
+
+        with sql_connection(read_only=True) as conn:
+            handling_event_orms, next_cursor = split_newest_first_rows(
+                conn.execute(
+                    _select_handling_event_page(
+                        cursor is not None, delivery_id is not None
+                    ),
+                    parameters,
+                ).all(),
+                limit,
+            )
+
+        handling_events = [
+            get_identity(HandlingEvent, handling_event_orm.id)
+            or register_identity(
+                HandlingEvent,
+                handling_event_orm.id,
+                handling_event_from_row(handling_event_orm),
+            )
+            for handling_event_orm in handling_event_orms
+        ]
+        return Page(handling_events, next_cursor)
+
+
+class AsyncHandlingEventRepository(ABC):
+    """
+    The asyncio counterpart of HandlingEventRepository.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def get_from_id(self, id_: int) -> HandlingEvent | None: ...
+
+    @classmethod
+    @abstractmethod
+    async def get_from_delivery_id(self, delivery_id: int) -> list[HandlingEvent]: ...
+
+
+class AsyncHandlingEventSqlRepository(AsyncHandlingEventRepository):
+
+    @classmethod
+    @override
+    async def get_from_id(cls, id_: int) -> HandlingEvent | None:
+
+        async with async_sql_connection() as conn:
+            handling_event_orm = (
+                await conn.execute(_select_handling_event_from_id(), {"id": id_})
+            ).one_or_none()
+
+        if handling_event_orm is None:
+            return None
+        return handling_event_from_row(handling_event_orm)
+
+    @classmethod
+    @override
+    async def get_from_delivery_id(cls, delivery_id: int) -> list[HandlingEvent]:
+
+        async with async_sql_connection() as conn:
+            handling_event_orms = (
+                await conn.execute(
+                    _select_handling_events_from_delivery_id(),
+                    {"delivery_id": delivery_id},
+                )
+            ).all()
+
+        return [
+            handling_event_from_row(handling_event_orm)
+            for handling_event_orm in handling_event_orms
+        ]
+
 
 def get_handling_event_repository() -> HandlingEventRepository:
     return HandlingEventSqlRepository()
+
+
+def get_async_handling_event_repository() -> AsyncHandlingEventRepository:
+    return AsyncHandlingEventSqlRepository()
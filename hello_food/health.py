@@ -0,0 +1,153 @@
+"""
+Liveness and readiness of the application process.
+
+Liveness only reports that the process serves requests. Readiness reports
+the health of the database as last checked by a HealthMonitor, which checks
+it on a background thread every HEALTH_CHECK_INTERVAL seconds. Probes read
+the latest snapshot, so however often they come they neither wait on the
+database nor check connections out of the pool.
+"""
+
+import threading
+import time
+from typing import Any, Callable, NamedTuple
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from .environ import HEALTH_CHECK_INTERVAL, HEALTH_MAX_SNAPSHOT_AGE
+from .log import rootlogger
+from .services.outbox import get_outbox_backlog
+from .sql import PoolStatistics, get_engine, get_pool_statistics
+
+
+class HealthSnapshot(NamedTuple):
+    """
+    The outcome of a health check. outbox_backlog is None when the database
+    was not reachable.
+    """
+
+    database_reachable: bool
+    pool: PoolStatistics
+    outbox_backlog: int | None
+    error: str | None = None
+
+
+def check_health(
+    engine_: Engine | None = None, pool_engine: Engine | None = None
+) -> HealthSnapshot:
+    """
+    Checks the database behind engine_ with a single query, which counts the
+    outbox backlog. The pool reported is the pool of pool_engine, engine_ by
+    default, read before the check takes a connection of its own.
+    """
+
+    engine_ = engine_ or get_engine()
+    pool = get_pool_statistics(pool_engine or engine_)
+
+    try:
+        with engine_.connect() as connection:
+            outbox_backlog = get_outbox_backlog(connection)
+    except SQLAlchemyError as e:
+        rootlogger.warning("Health check could not reach the database: %s", e)
+        return HealthSnapshot(False, pool, None, str(e))
+
+    return HealthSnapshot(True, pool, outbox_backlog)
+
+
+class HealthMonitor:
+    """
+    Keeps the latest HealthSnapshot, refreshed every interval seconds on a
+    daemon thread once started. A snapshot older than max_age is not
+    trusted, so a check stuck on the database makes the process unready.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[], HealthSnapshot] = check_health,
+        interval: float = HEALTH_CHECK_INTERVAL,
+        max_age: float = HEALTH_MAX_SNAPSHOT_AGE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._check = check
+        self._interval = interval
+        self._max_age = max_age
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # When the latest snapshot was taken and the snapshot, replaced at
+        # once so readers never see the time of another snapshot
+        self._latest: tuple[float, HealthSnapshot] | None = None
+
+    @property
+    def snapshot(self) -> HealthSnapshot | None:
+        latest = self._latest
+        return None if latest is None else latest[1]
+
+    def get_age(self) -> float | None:
+        """
+        Gets the number of seconds since the latest snapshot was taken.
+        """
+
+        latest = self._latest
+        return None if latest is None else self._clock() - latest[0]
+
+    def refresh(self) -> HealthSnapshot:
+        checked_at = self._clock()
+        snapshot = self._check()
+        self._latest = (checked_at, snapshot)
+        return snapshot
+
+    def start(self) -> None:
+        """
+        Takes a first snapshot, so the process can report ready as soon as
+        it serves, and refreshes it in the background from then on.
+        """
+
+        if self._thread is not None:
+            return
+
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="hello_food-health", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # The snapshot goes stale until a check succeeds again
+                rootlogger.error("Health check failed: %s", e)
+
+    def is_ready(self) -> bool:
+        latest = self._latest
+        return (
+            latest is not None
+            and latest[1].database_reachable
+            and self._clock() - latest[0] <= self._max_age
+        )
+
+
+def health_to_json_dict(monitor: HealthMonitor) -> dict[str, Any]:
+    snapshot, age = monitor.snapshot, monitor.get_age()
+    if snapshot is None or age is None:
+        return {"ready": False}
+
+    return {
+        "ready": monitor.is_ready(),
+        "age_seconds": round(age, 3),
+        "database_reachable": snapshot.database_reachable,
+        "pool_saturation": snapshot.pool.saturation,
+        "pool_checked_out": snapshot.pool.checked_out,
+        "outbox_backlog": snapshot.outbox_backlog,
+        "error": snapshot.error,
+    }
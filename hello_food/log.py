@@ -1,11 +1,35 @@
+"""
+Logging of the application.
+
+Records of the hello_food loggers, and the SQL statements of the engines
+when SQL_ECHO is set, are put on a queue by the thread that logs them and
+written out as JSON lines by a listener thread, so requests never wait on
+log I/O. A record carries the id of the request it was logged in. Debug
+records and SQL statements can be sampled with LOG_DEBUG_SAMPLE_RATE, and
+records are dropped rather than waited on when the queue is full.
+
+The pipeline is installed by configure_logging, which the applications and
+the command line tools call on start.
+"""
+
 from __future__ import annotations
 
+import atexit
+import copy
 import logging
-import logging.config
+import queue
+import random
 import sys
-from typing import Optional
-from typing import TypeVar
-from typing import Literal
+import threading
+import uuid
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Final, Literal, NamedTuple, Optional, Sequence, TypeVar
+
+import orjson
+
+from .environ import LOG_DEBUG_SAMPLE_RATE, LOG_QUEUE_SIZE, SQL_ECHO
 
 LOGGING_LEVELS = (
     Literal[50] | Literal[40] | Literal[30] | Literal[20] | Literal[10] | Literal[0]
@@ -13,27 +37,6 @@ LOGGING_LEVELS = (
 
 _IT = TypeVar("_IT", bound="Identified")
 
-logging.config.dictConfig(
-    {
-        "version": 1,
-        "formatters": {
-            "default": {
-                "format": "[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
-            }
-        },
-        "handlers": {
-            "wsgi": {
-                "class": "logging.StreamHandler",
-                "stream": "ext://flask.logging.wsgi_errors_stream",
-                "formatter": "default",
-            }
-        },
-        "loggers": {
-            "app": {"level": "INFO", "handlers": ["wsgi"], "propagate": True},
-        },
-    }
-)
-
 # set initial level to WARN.  This so that
 # log statements don't occur in the absence of explicit
 # logging
@@ -41,19 +44,204 @@ rootlogger = logging.getLogger("hello_food")
 if rootlogger.level == logging.NOTSET:
     rootlogger.setLevel(logging.WARN)
 
+"""
+The logger SQLAlchemy engines log their statements under.
+"""
+SQL_LOGGER_NAME: Final[str] = "sqlalchemy.engine"
+
+"""
+The header a request id is read from and returned in.
+"""
+REQUEST_ID_HEADER: Final[str] = "X-Request-ID"
+
+_MAX_REQUEST_ID_LENGTH: Final[int] = 128
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> str | None:
+    return _request_id.get()
+
+
+def set_request_id(request_id: str | None) -> Token[str | None]:
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: Token[str | None]) -> None:
+    _request_id.reset(token)
+
 
-def _add_default_handler(logger: logging.Logger) -> None:
+def request_id_from_header(header: str | None) -> str:
     """
-    Sets a default logger handler to log to stdout. Also sets
-    the logger format.
+    Gets the id of a request from its REQUEST_ID_HEADER, set by a load
+    balancer or the caller, generating one when it is missing or invalid.
     """
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(
-        # add json formatting here
-        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
-    )
-    logger.addHandler(handler)
+    if (
+        header
+        and len(header) <= _MAX_REQUEST_ID_LENGTH
+        and header.isascii()
+        and header.isprintable()
+    ):
+        return header
+    return uuid.uuid4().hex
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a JSON object on a single line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log["exception"] = record.exc_text
+
+        return orjson.dumps(log).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a sample_rate share of the debug records and of the SQL
+    statements, and every other record.
+    """
+
+    def __init__(
+        self, sample_rate: float, random_: Callable[[], float] = random.random
+    ) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._random = random_
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO and not record.name.startswith(
+            SQL_LOGGER_NAME
+        ):
+            return True
+        return self._random() < self.sample_rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue without waiting, counting the records
+    dropped when it is full.
+    """
+
+    def __init__(self, queue_: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what the formatter cannot do on the listener thread is done
+        # here: merging the arguments, which may be mutated once logged,
+        # and reading the request id and the exception of this thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        setattr(record, "request_id", _request_id.get())
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXCEPTION_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+
+    def enqueue_sentinel(self) -> None:
+        # Waits for room on a full queue rather than failing to stop
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+_EXCEPTION_FORMATTER: Final = logging.Formatter()
+
+
+class _Pipeline(NamedTuple):
+    handler: NonBlockingQueueHandler
+    listener: QueueListener
+    loggers: tuple[logging.Logger, ...]
+
+
+_pipeline: _Pipeline | None = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging(
+    handlers: Sequence[logging.Handler] | None = None,
+    sample_rate: float = LOG_DEBUG_SAMPLE_RATE,
+    queue_size: int = LOG_QUEUE_SIZE,
+    sql_echo: bool = SQL_ECHO,
+) -> NonBlockingQueueHandler:
+    """
+    Installs the logging pipeline, which writes JSON lines to stdout unless
+    other handlers are given. Only the first call installs it, later calls
+    return the queue handler of the installed pipeline.
+    """
+
+    global _pipeline
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            records: queue.Queue[logging.LogRecord] = queue.Queue(queue_size)
+            handler = NonBlockingQueueHandler(records)
+            handler.addFilter(SamplingFilter(sample_rate))
+
+            if handlers is None:
+                stream_handler = logging.StreamHandler(sys.stdout)
+                stream_handler.setFormatter(JsonFormatter())
+                handlers = (stream_handler,)
+            listener = _Listener(records, *handlers, respect_handler_level=True)
+            listener.start()
+
+            loggers: tuple[logging.Logger, ...] = (rootlogger,)
+            if sql_echo:
+                sql_logger = logging.getLogger(SQL_LOGGER_NAME)
+                sql_logger.setLevel(logging.INFO)
+                loggers += (sql_logger,)
+            for logger in loggers:
+                logger.addHandler(handler)
+
+            _pipeline = _Pipeline(handler, listener, loggers)
+
+        return _pipeline.handler
+
+
+def stop_logging() -> None:
+    """
+    Writes out the queued records and removes the logging pipeline, after
+    which configure_logging installs a new one.
+    """
+
+    global _pipeline
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            return
+
+        for logger in _pipeline.loggers:
+            logger.removeHandler(_pipeline.handler)
+        _pipeline.listener.stop()
+        _pipeline = None
+
+
+atexit.register(stop_logging)
 
 
 def _qual_logger_name_for_cls(cls: type[Identified]) -> str:
@@ -106,7 +294,9 @@ def instance_logger(instance: Identified, level: LOGGING_LEVELS) -> None:
 
     instance.logger = logging.getLogger(name)
     instance.logger.setLevel(level)
-    _add_default_handler(instance.logger)
+    # The records propagate to the pipeline's handler on rootlogger, so
+    # setting the level again adds no handler
+    configure_logging()
 
 
 class logger_level_property:
@@ -1,4 +1,5 @@
 from .orm import meal_table
 from .model import Meal
 from .factory import get_meal_factory
-from .repository import get_meal_repository
+from .repository import get_meal_repository, get_async_meal_repository
+from .cache import invalidate_meal_catalogue, meal_catalogue_cache
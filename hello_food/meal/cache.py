@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, NamedTuple
+
+from .model import Meal
+from ..environ import MEAL_CACHE_MAX_SIZE, MEAL_CACHE_TTL_SECONDS
+
+
+class MealCacheStatistics(NamedTuple):
+    hits: int
+    misses: int
+    meals: int
+    cuisines: int
+
+
+class MealCatalogueCache:
+    """
+    A bounded, thread safe cache of the meal catalogue. Meals are kept by id
+    and the meals of a cuisine are kept by cuisine. Entries expire after
+    ttl_seconds and the least recently used entries are evicted once more
+    than max_size meals or cuisines are cached.
+
+    Meals are cached as read from the primary, never from a replica, which
+    could put rows older than a change back in the cache right after the
+    change dropped it. The process that changes the menu drops its cache
+    when the change commits, other processes serve the meals they cached
+    for at most ttl_seconds after a change.
+
+    Cached meals are shared between callers and must not be modified.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MEAL_CACHE_MAX_SIZE,
+        ttl_seconds: float = MEAL_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._meals: OrderedDict[int, tuple[float, Meal]] = OrderedDict()
+        self._cuisines: OrderedDict[str, tuple[float, list[Meal]]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, meal_id: int) -> Meal | None:
+        meals, _ = self.get_many([meal_id])
+        return meals[0] if meals else None
+
+    def get_many(self, meal_ids: Iterable[int]) -> tuple[list[Meal], list[int]]:
+        """
+        Gets the cached meals of the provided ids. Returns the cached meals
+        and the ids of the meals that are not cached.
+        """
+
+        meals: list[Meal] = []
+        missing_ids: list[int] = []
+        now = self._clock()
+
+        with self._lock:
+            for meal_id in meal_ids:
+                entry = self._meals.get(meal_id)
+                if entry is None or entry[0] <= now:
+                    missing_ids.append(meal_id)
+                    continue
+                self._meals.move_to_end(meal_id)
+                meals.append(entry[1])
+
+            self._hits += len(meals)
+            self._misses += len(missing_ids)
+
+        return meals, missing_ids
+
+    def put_many(self, meals: Iterable[Meal]) -> None:
+        expires_at = self._clock() + self._ttl_seconds
+
+        with self._lock:
+            for meal in meals:
+                self._meals[meal["id"]] = (expires_at, meal)
+                self._meals.move_to_end(meal["id"])
+            while len(self._meals) > self._max_size:
+                self._meals.popitem(last=False)
+
+    def get_cuisine(self, cuisine: str) -> list[Meal] | None:
+        now = self._clock()
+
+        with self._lock:
+            entry = self._cuisines.get(cuisine)
+            if entry is None or entry[0] <= now:
+                self._misses += 1
+                return None
+            self._cuisines.move_to_end(cuisine)
+            self._hits += 1
+            return list(entry[1])
+
+    def put_cuisine(self, cuisine: str, meals: list[Meal]) -> None:
+        expires_at = self._clock() + self._ttl_seconds
+
+        with self._lock:
+            self._cuisines[cuisine] = (expires_at, list(meals))
+            self._cuisines.move_to_end(cuisine)
+            while len(self._cuisines) > self._max_size:
+                self._cuisines.popitem(last=False)
+
+        self.put_many(meals)
+
+    def invalidate(self) -> None:
+        """
+        Drops every cached meal and cuisine.
+        """
+
+        with self._lock:
+            self._meals.clear()
+            self._cuisines.clear()
+
+    def get_statistics(self) -> MealCacheStatistics:
+        with self._lock:
+            return MealCacheStatistics(
+                self._hits, self._misses, len(self._meals), len(self._cuisines)
+            )
+
+
+meal_catalogue_cache: MealCatalogueCache = MealCatalogueCache()
+
+
+def invalidate_meal_catalogue() -> None:
+    """
+    Drops the cached meal catalogue, for instance after the menu has changed.
+    """
+
+    meal_catalogue_cache.invalidate()
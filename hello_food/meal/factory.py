@@ -1,15 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import override, Any, Mapping
+from typing import override, Any, Iterable, Mapping, Sequence
 
-from sqlalchemy import insert
+from sqlalchemy import insert, Insert
 
 from .orm import meal_table
 from .model import Meal
-from ..mixins import JsonFactory
-from ..sql import engine
+from ..bulk_copy import CsvImportResult, import_csv
+from ..mixins import BulkJsonFactory
+from .cache import invalidate_meal_catalogue
+from ..statements import registered_statement
+from ..validation import Field
+from ..unit_of_work import sql_connection, sql_savepoint, register_identity, on_commit
 
+_MealValues = tuple[str, str, float]
 
-class MealFactory(JsonFactory[Meal], ABC):
+
+@registered_statement
+def _insert_meal() -> Insert:
+    return insert(meal_table).returning(meal_table.c.id, sort_by_parameter_order=True)
+
+
+class MealFactory(BulkJsonFactory[Meal], ABC):
 
     @classmethod
     @abstractmethod
@@ -24,9 +35,20 @@ class MealFactory(JsonFactory[Meal], ABC):
         """
         ...
 
+    @classmethod
+    @abstractmethod
+    def create_many_from_csv(cls, lines: Iterable[str]) -> CsvImportResult:
+        """
+        Imports meals from the lines of a CSV file with cuisine, recipe and
+        price columns.
+        """
+        ...
+
 
 class MealSqlFactory(MealFactory):
 
+    _schema = (Field("cuisine", str), Field("recipe", str), Field("price", float))
+
     @override
     @classmethod
     def create_from_values(
@@ -36,30 +58,70 @@ class MealSqlFactory(MealFactory):
         price: float,
     ) -> Meal:
 
-        with engine.connect() as connection:
-            statement = (
-                insert(meal_table)
-                .values(
-                    cuisine=cuisine,
-                    recipe=recipe,
-                    price=price,
+        with sql_connection() as connection:
+            meal_id = connection.execute(
+                _insert_meal(), {"cuisine": cuisine, "recipe": recipe, "price": price}
+            ).scalar_one()
+
+        self._invalidate_meal_catalogue()
+
+        meal = Meal(id=meal_id, cuisine=cuisine, recipe=recipe, price=price)
+        return register_identity(Meal, meal_id, meal)
+
+    @override
+    @classmethod
+    def create_many_from_values(cls, values: Sequence[_MealValues]) -> list[Meal]:
+        """
+        Creates many meals with multi-row inserts.
+        """
+
+        with sql_savepoint() as connection:
+            meal_ids = (
+                connection.execute(
+                    _insert_meal(),
+                    [
+                        {"cuisine": cuisine, "recipe": recipe, "price": price}
+                        for cuisine, recipe, price in values
+                    ],
                 )
-                .returning(meal_table.c.id)
+                .scalars()
+                .all()
             )
-            meal_id = connection.execute(statement).scalar_one()
-            connection.commit()
 
-        return Meal(id=meal_id, cuisine=cuisine, recipe=recipe, price=price)
+        cls._invalidate_meal_catalogue()
+
+        return [
+            register_identity(
+                Meal,
+                meal_id,
+                Meal(id=meal_id, cuisine=cuisine, recipe=recipe, price=price),
+            )
+            for meal_id, (cuisine, recipe, price) in zip(meal_ids, values)
+        ]
 
     @override
     @classmethod
-    def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Meal:
+    def create_many_from_csv(cls, lines: Iterable[str]) -> CsvImportResult:
 
-        cuisine = cls._parse_str_from_json(json_as_dict, "cuisine")
-        recipe = cls._parse_str_from_json(json_as_dict, "recipe")
-        price = cls._parse_int_from_json(json_as_dict, "price")
+        result = import_csv(cls, meal_table, ("cuisine", "recipe", "price"), lines)
+        cls._invalidate_meal_catalogue()
+        return result
+
+    @classmethod
+    def _invalidate_meal_catalogue(cls) -> None:
+        """
+        The catalogue is dropped straight away and again once the new meals
+        are committed, so lists of meals read in between are not kept.
+        """
+
+        invalidate_meal_catalogue()
+        on_commit(invalidate_meal_catalogue)
+
+    @override
+    @classmethod
+    def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> Meal:
 
-        return cls.create_from_values(cuisine, recipe, price)
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
 
 
 def get_meal_factory() -> MealFactory:
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, String, Float, ForeignKey
 
 from ..sql import metadata
 
@@ -10,3 +10,7 @@ meal_table = Table(
     Column("recipe", String, nullable=True),
     Column("price", Float, nullable=True),
 )
+
+# Serves browsing the menu by cuisine in id order, see
+# MealSqlRepository.get_page_from_cuisine
+Index("ix_meal_cuisine_id", meal_table.c.cuisine, meal_table.c.id)
@@ -1,11 +1,105 @@
 from abc import ABC, abstractmethod
-from typing import override, Any
+from typing import override, Any, Mapping
 
-from sqlalchemy import select, Select
+from sqlalchemy import bindparam, select, Row, Select
 
+from .cache import meal_catalogue_cache
 from .orm import meal_table
 from .model import Meal
-from ..sql import engine
+from ..pagination import Page, clamp_page_size, decode_cursor, encode_cursor
+from ..statements import registered_statement
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    get_identity,
+    has_uncommitted_writes,
+    register_identity,
+)
+
+
+def meal_from_row(meal_row: Row[Any]) -> Meal:
+    return Meal(
+        id=meal_row.id,
+        cuisine=meal_row.cuisine,
+        recipe=meal_row.recipe,
+        price=meal_row.price,
+    )
+
+
+@registered_statement
+def _select_meal_from_id() -> Select[tuple[Any, ...]]:
+    return select(meal_table).where(meal_table.c.id == bindparam("id"))
+
+
+@registered_statement
+def _select_meals_from_ids() -> Select[tuple[Any, ...]]:
+    return select(meal_table).where(
+        meal_table.c.id.in_(bindparam("ids", expanding=True))
+    )
+
+
+@registered_statement
+def _select_meals_from_cuisine() -> Select[tuple[Any, ...]]:
+    return (
+        select(meal_table)
+        .where(meal_table.c.cuisine == bindparam("cuisine"))
+        .order_by(meal_table.c.id)
+    )
+
+
+@registered_statement
+def _select_page_from_cuisine(
+    has_cursor: bool, has_min_price: bool, has_max_price: bool
+) -> Select[tuple[Any, ...]]:
+
+    statement = select(meal_table).where(meal_table.c.cuisine == bindparam("cuisine"))
+
+    if has_cursor:
+        statement = statement.where(meal_table.c.id > bindparam("after_id"))
+    if has_min_price:
+        statement = statement.where(meal_table.c.price >= bindparam("min_price"))
+    if has_max_price:
+        statement = statement.where(meal_table.c.price <= bindparam("max_price"))
+
+    return statement.order_by(meal_table.c.id).limit(bindparam("limit"))
+
+
+def select_page_from_cuisine(
+    cuisine: str,
+    cursor: str | None,
+    limit: int,
+    min_price: float | None,
+    max_price: float | None,
+) -> tuple[Select[tuple[Any, ...]], dict[str, Any]]:
+    """
+    Pages with a keyset on (cuisine, id) rather than an offset, so every
+    page is a range scan of ix_meal_cuisine_id however deep it is. One meal
+    more than limit is selected to find out whether there is a next page.
+    Returns the statement and the parameters to execute it with.
+    """
+
+    parameters: dict[str, Any] = {"cuisine": cuisine, "limit": limit + 1}
+
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, 1)
+        parameters["after_id"] = int(after_id)
+    if min_price is not None:
+        parameters["min_price"] = min_price
+    if max_price is not None:
+        parameters["max_price"] = max_price
+
+    statement = _select_page_from_cuisine(
+        cursor is not None, min_price is not None, max_price is not None
+    )
+    return statement, parameters
+
+
+def page_from_meals(meals: list[Meal], limit: int) -> Page[Meal]:
+    if len(meals) <= limit:
+        return Page(meals, None)
+
+    meals = meals[:limit]
+    return Page(meals, encode_cursor(meals[-1]["id"]))
 
 
 class MealRepository(ABC):
@@ -30,26 +124,45 @@ class MealRepository(ABC):
     @abstractmethod
     def get_from_cuisine(cls, cuisine: str) -> list[Meal]: ...
 
+    @classmethod
+    @abstractmethod
+    def get_page_from_cuisine(
+        cls,
+        cuisine: str,
+        cursor: str | None = None,
+        limit: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Page[Meal]:
+        """
+        Gets a page of the meals of a cuisine in id order, optionally limited
+        to a price range. Pass the next_cursor of a page to get the page
+        after it.
+        """
+        ...
+
 
 class MealSqlRepository(MealRepository):
+    """
+    Reads meals through the meal catalogue cache. The catalogue is small and
+    rarely changes, so in the steady state meals are served without a query.
+    The reads that fill the cache go to the primary, see MealCatalogueCache.
+    """
 
     @classmethod
     def _get_from_sqlalchemy_statement(
-        cls, statement: Select[tuple[Any]]
+        cls, statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
     ) -> Meal | None:
 
-        with engine.connect() as conn:
-            meal_orm = conn.execute(statement).one_or_none()
+        with sql_connection(read_only=True, from_primary=True) as conn:
+            meal_orm = conn.execute(statement, parameters).one_or_none()
             if meal_orm is None:
                 return None
-            meal = Meal(
-                id=meal_orm.id,
-                cuisine=meal_orm.cuisine,
-                recipe=meal_orm.recipe,
-                price=meal_orm.price,
-            )
+            meal = meal_from_row(meal_orm)
 
-        return meal
+        if not has_uncommitted_writes():
+            meal_catalogue_cache.put_many([meal])
+        return register_identity(Meal, meal["id"], meal)
 
     @override
     @classmethod
@@ -58,9 +171,11 @@ class MealSqlRepository(MealRepository):
         Gets a meal from the persistent layer from the user's email.
         """
 
-        statement = select(meal_table).where(meal_table.c.id == id_)
+        meal = get_identity(Meal, id_) or meal_catalogue_cache.get(id_)
+        if meal is not None:
+            return meal
 
-        return cls._get_from_sqlalchemy_statement(statement)
+        return cls._get_from_sqlalchemy_statement(_select_meal_from_id(), {"id": id_})
 
     @override
     @classmethod
@@ -70,41 +185,167 @@ class MealSqlRepository(MealRepository):
         """
 
         meals: list[Meal] = []
-        statement = select(meal_table).where(meal_table.c.id.in_(ids))
-
-        with engine.connect() as conn:
-            meals_orm = conn.execute(statement).all()
-            for meal_orm in meals_orm:
-                meal = Meal(
-                    id=meal_orm.id,
-                    cuisine=meal_orm.cuisine,
-                    recipe=meal_orm.recipe,
-                    price=meal_orm.price,
-                )
+        missing_ids: list[int] = []
+        for id_ in ids:
+            meal = get_identity(Meal, id_)
+            if meal is None:
+                missing_ids.append(id_)
+            else:
                 meals.append(meal)
 
+        if not missing_ids:
+            return meals
+
+        cached_meals, missing_ids = meal_catalogue_cache.get_many(missing_ids)
+        meals.extend(cached_meals)
+        if not missing_ids:
+            return meals
+
+        with sql_connection(read_only=True, from_primary=True) as conn:
+            loaded_meals = [
+                meal_from_row(meal_orm)
+                for meal_orm in conn.execute(
+                    _select_meals_from_ids(), {"ids": missing_ids}
+                )
+            ]
+
+        # Meals read after writing may be rolled back with the unit of work
+        if not has_uncommitted_writes():
+            meal_catalogue_cache.put_many(loaded_meals)
+        meals.extend(register_identity(Meal, meal["id"], meal) for meal in loaded_meals)
+
         return meals
 
     @classmethod
     @override
     def get_from_cuisine(cls, cuisine: str) -> list[Meal]:
 
-        meals: list[Meal] = []
-        statement = select(meal_table).where(meal_table.c.cuisine.in_(cuisine))
-
-        with engine.connect() as conn:
-            meals_orm = conn.execute(statement).all()
-            for meal_orm in meals_orm:
-                meal = Meal(
-                    id=meal_orm.id,
-                    cuisine=meal_orm.cuisine,
-                    recipe=meal_orm.recipe,
-                    price=meal_orm.price,
+        cached_meals = meal_catalogue_cache.get_cuisine(cuisine)
+        if cached_meals is not None:
+            return cached_meals
+
+        with sql_connection(read_only=True, from_primary=True) as conn:
+            meals = [
+                meal_from_row(meal_orm)
+                for meal_orm in conn.execute(
+                    _select_meals_from_cuisine(), {"cuisine": cuisine}
                 )
-                meals.append(meal)
+            ]
+
+        if not has_uncommitted_writes():
+            meal_catalogue_cache.put_cuisine(cuisine, meals)
 
         return meals
 
+    @classmethod
+    @override
+    def get_page_from_cuisine(
+        cls,
+        cuisine: str,
+        cursor: str | None = None,
+        limit: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Page[Meal]:
+        limit = clamp_page_size(limit)
+        statement, parameters = select_page_from_cuisine(
+            cuisine, cursor, limit, min_price, max_price
+        )
+
+        with sql_connection(read_only=True) as conn:
+            meals = [
+                meal_from_row(meal_orm)
+                for meal_orm in conn.execute(statement, parameters)
+            ]
+
+        return page_from_meals(meals, limit)
+
+
+class AsyncMealRepository(ABC):
+    """
+    The asyncio counterpart of MealRepository.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def get_from_id(self, id_: int) -> Meal | None: ...
+
+    @classmethod
+    @abstractmethod
+    async def get_from_ids(cls, ids: list[int]) -> list[Meal]: ...
+
+    @classmethod
+    @abstractmethod
+    async def get_page_from_cuisine(
+        cls,
+        cuisine: str,
+        cursor: str | None = None,
+        limit: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Page[Meal]: ...
+
+
+class AsyncMealSqlRepository(AsyncMealRepository):
+    """
+    Reads meals through the same meal catalogue cache as MealSqlRepository.
+    """
+
+    @override
+    @classmethod
+    async def get_from_id(cls, id_: int) -> Meal | None:
+
+        meals = await cls.get_from_ids([id_])
+        return meals[0] if meals else None
+
+    @override
+    @classmethod
+    async def get_from_ids(cls, ids: list[int]) -> list[Meal]:
+
+        meals, missing_ids = meal_catalogue_cache.get_many(ids)
+        if not missing_ids:
+            return meals
+
+        async with async_sql_connection() as conn:
+            loaded_meals = [
+                meal_from_row(meal_orm)
+                for meal_orm in await conn.execute(
+                    _select_meals_from_ids(), {"ids": missing_ids}
+                )
+            ]
+
+        if not has_uncommitted_writes():
+            meal_catalogue_cache.put_many(loaded_meals)
+        return meals + loaded_meals
+
+    @classmethod
+    @override
+    async def get_page_from_cuisine(
+        cls,
+        cuisine: str,
+        cursor: str | None = None,
+        limit: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Page[Meal]:
+
+        limit = clamp_page_size(limit)
+        statement, parameters = select_page_from_cuisine(
+            cuisine, cursor, limit, min_price, max_price
+        )
+
+        async with async_sql_connection() as conn:
+            meals = [
+                meal_from_row(meal_orm)
+                for meal_orm in await conn.execute(statement, parameters)
+            ]
+
+        return page_from_meals(meals, limit)
+
 
 def get_meal_repository() -> MealRepository:
     return MealSqlRepository()
+
+
+def get_async_meal_repository() -> AsyncMealRepository:
+    return AsyncMealSqlRepository()
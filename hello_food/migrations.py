@@ -0,0 +1,496 @@
+"""
+Versioned schema migrations.
+
+Every migration has a version and the versions applied to a database are
+recorded in the SchemaVersion table. Running the migrations applies, in
+order, those that have not been applied yet, so they can be run against a
+live database as part of a deploy.
+
+An empty database can instead be created at the latest version in one
+transaction, see create_schema. The application checks the schema version
+or applies pending migrations when it starts, see prepare_schema, and
+`python -m hello_food.schema` creates, verifies or migrates the schema.
+
+Migrations that build indexes are not transactional. CREATE INDEX
+CONCURRENTLY does not lock the table against writes but cannot run inside a
+transaction block, so those migrations run on an autocommit connection.
+"""
+
+import time
+from typing import Callable, Final, NamedTuple, Sequence
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Engine,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.exc import ProgrammingError
+
+from .delivery.orm import delivery_table, meal_order_table
+from .handling_event.orm import handling_event_table
+from .meal.orm import meal_table
+from .services.outbox import email_outbox_table
+from .user.orm import user_table
+from .environ import SCHEMA_STARTUP_MODE
+from .log import rootlogger
+from .sql import get_engine, metadata, created_column, CREATED_DEFAULT
+
+schema_version_table = Table(
+    "SchemaVersion",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", Integer, nullable=False),
+)
+
+MIGRATE_STARTUP_MODE = "migrate"
+VERIFY_STARTUP_MODE = "verify"
+
+# Held for the duration of a migration run so that two processes starting
+# at the same time do not apply the same migration twice.
+_MIGRATION_LOCK_ID: Final[int] = 0x68656C6C6F
+
+
+class SchemaVersionError(Exception):
+    """
+    Raised when the database is not at the schema version expected.
+    """
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+    transactional: bool = True
+
+
+def _qualified_index_name(connection: Connection, table: Table, name: str) -> str:
+    preparer = connection.dialect.identifier_preparer
+
+    if table.schema is not None:
+        return f"{preparer.quote_schema(table.schema)}.{preparer.quote(name)}"
+    return preparer.quote(name)
+
+
+def _is_invalid_index(connection: Connection, table: Table, name: str) -> bool:
+    """
+    Checks if a previous attempt to build the index concurrently failed and
+    left an invalid index behind, which IF NOT EXISTS would not replace.
+    """
+
+    statement = text(
+        "SELECT NOT pg_index.indisvalid FROM pg_index "
+        "JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+        "JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace "
+        "WHERE pg_class.relname = :name "
+        "AND pg_namespace.nspname = coalesce(:schema, current_schema())"
+    )
+    is_invalid = connection.execute(
+        statement, {"name": name, "schema": table.schema}
+    ).scalar_one_or_none()
+
+    return bool(is_invalid)
+
+
+def create_index_concurrently(
+    connection: Connection, table: Table, name: str, column_names: Sequence[str]
+) -> None:
+    """
+    Builds an index without blocking writes to its table. The connection
+    must be in autocommit mode.
+
+    Indexes are passed by name and columns rather than as the Index declared
+    on the table, so a migration keeps building the same index after the
+    declaration changes.
+    """
+
+    preparer = connection.dialect.identifier_preparer
+
+    if _is_invalid_index(connection, table, name):
+        drop_index_concurrently(connection, table, name)
+
+    columns = ", ".join(preparer.quote(column_name) for column_name in column_names)
+    connection.execute(
+        text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {preparer.quote(name)} "
+            f"ON {preparer.format_table(table)} ({columns})"
+        )
+    )
+
+
+def drop_index_concurrently(connection: Connection, table: Table, name: str) -> None:
+    """
+    Drops an index without blocking access to its table. The connection
+    must be in autocommit mode.
+    """
+
+    qualified_name = _qualified_index_name(connection, table, name)
+    connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified_name}"))
+
+
+# The schema as it was before migrations were introduced, which migration 1
+# creates. It is declared apart from the tables of the application so that
+# changing them does not change what migration 1 creates, later migrations
+# take the schema from there.
+_initial_metadata = MetaData(schema=metadata.schema)
+
+Table(
+    "Address",
+    _initial_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("unit", String, nullable=True),
+    Column("street_name", String, nullable=False),
+    Column("suburb", String, nullable=False),
+    Column("postcode", Integer, nullable=False),
+)
+
+_initial_meal_table = Table(
+    "Meal",
+    _initial_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("cuisine", String),
+    Column("recipe", String),
+    Column("price", Float),
+)
+Index("ix_meal_cuisine_id", _initial_meal_table.c.cuisine, _initial_meal_table.c.id)
+
+Table(
+    "User",
+    _initial_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("email", String, unique=True),
+    Column("name", String),
+    Column("meals_per_week", Integer),
+    Column("address_id", Integer, ForeignKey("Address.id"), nullable=True),
+    Column("type", String),
+)
+
+Table(
+    "StandardUser",
+    _initial_metadata,
+    Column("id", Integer, ForeignKey("User.id"), primary_key=True, nullable=True),
+)
+
+Table(
+    "TrialUser",
+    _initial_metadata,
+    Column("id", Integer, ForeignKey("User.id"), primary_key=True, nullable=True),
+    Column("trial_end_date", Integer),
+    Column("discount_value", Float),
+)
+
+Table(
+    "Delivery",
+    _initial_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("User.id"), nullable=False),
+    Column("address_id", Integer, ForeignKey("Address.id"), nullable=False),
+    Column("total", Float, nullable=False),
+)
+
+Table(
+    "MealOrder",
+    _initial_metadata,
+    Column("meal_id", Integer, ForeignKey("Meal.id"), primary_key=True),
+    Column("delivery_id", Integer, ForeignKey("Delivery.id"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+)
+
+Table(
+    "HandlingTable",
+    _initial_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("delivery_id", Integer, ForeignKey("Delivery.id")),
+    Column("to_address_id", Integer, ForeignKey("Address.id")),
+    Column("from_address_id", Integer, ForeignKey("Address.id")),
+    Column("completion_time", Integer, nullable=False),
+)
+
+
+def _create_initial_schema(connection: Connection) -> None:
+    # Databases created before migrations were introduced already have the
+    # tables, which are left as they are
+    _initial_metadata.create_all(connection)
+
+
+def _create_lookup_indexes(connection: Connection) -> None:
+    for table, name, column_names in (
+        (handling_event_table, "ix_handling_event_delivery_id", ["delivery_id"]),
+        (meal_order_table, "ix_meal_order_delivery_id", ["delivery_id"]),
+        (delivery_table, "ix_delivery_user_id", ["user_id"]),
+        (meal_table, "ix_meal_cuisine_id", ["cuisine", "id"]),
+    ):
+        create_index_concurrently(connection, table, name, column_names)
+
+
+def _add_created_columns(connection: Connection) -> None:
+    # PostgreSQL stores a non volatile default of an added column without
+    # rewriting the table, existing rows read the time of the migration.
+    preparer = connection.dialect.identifier_preparer
+    for table in (delivery_table, handling_event_table, user_table):
+        connection.execute(
+            text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN IF NOT EXISTS created integer NOT NULL "
+                f"DEFAULT {CREATED_DEFAULT}"
+            )
+        )
+
+
+def _create_list_indexes(connection: Connection) -> None:
+    for table, name, column_names in (
+        (delivery_table, "ix_delivery_created_id", ["created", "id"]),
+        (
+            delivery_table,
+            "ix_delivery_user_id_created_id",
+            ["user_id", "created", "id"],
+        ),
+        (handling_event_table, "ix_handling_event_created_id", ["created", "id"]),
+        (user_table, "ix_user_created_id", ["created", "id"]),
+    ):
+        create_index_concurrently(connection, table, name, column_names)
+
+    # Superseded by ix_delivery_user_id_created_id
+    drop_index_concurrently(connection, delivery_table, "ix_delivery_user_id")
+
+
+# The email outbox as migration 5 creates it, declared apart from
+# email_outbox_table for the same reason as the initial schema
+_email_outbox_metadata = MetaData(schema=metadata.schema)
+
+_initial_email_outbox_table = Table(
+    "EmailOutbox",
+    _email_outbox_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("dedup_key", String, nullable=False, unique=True),
+    Column("recipient", String, nullable=False),
+    Column("subject", String, nullable=False),
+    Column("body", String, nullable=False),
+    created_column(),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("next_attempt_at", Integer, nullable=False),
+    Column("sent_at", Integer, nullable=True),
+    Column("last_error", String, nullable=True),
+)
+Index(
+    "ix_email_outbox_pending",
+    _initial_email_outbox_table.c.next_attempt_at,
+    postgresql_where=_initial_email_outbox_table.c.sent_at.is_(None),
+)
+
+
+def _create_email_outbox(connection: Connection) -> None:
+    # The outbox is empty when it is created, so its indexes are built with it
+    _initial_email_outbox_table.create(connection, checkfirst=True)
+
+
+def _add_outbox_claims(connection: Connection) -> None:
+    preparer = connection.dialect.identifier_preparer
+    connection.execute(
+        text(
+            f"ALTER TABLE {preparer.format_table(email_outbox_table)} "
+            f"ADD COLUMN IF NOT EXISTS claimed_until integer"
+        )
+    )
+
+
+MIGRATIONS: Final[tuple[Migration, ...]] = (
+    Migration(1, "Create the initial schema", _create_initial_schema),
+    Migration(
+        2,
+        "Index foreign key and cuisine lookups",
+        _create_lookup_indexes,
+        transactional=False,
+    ),
+    Migration(3, "Record when rows are created", _add_created_columns),
+    Migration(
+        4,
+        "Index listings by creation time",
+        _create_list_indexes,
+        transactional=False,
+    ),
+    Migration(5, "Add the email outbox", _create_email_outbox),
+    Migration(6, "Lease outbox emails to their dispatcher", _add_outbox_claims),
+)
+
+LATEST_SCHEMA_VERSION: Final[int] = MIGRATIONS[-1].version
+
+
+def get_schema_version(connection: Connection) -> int:
+    """
+    Gets the version of the latest migration applied to the database, 0 if
+    no migration has been applied.
+    """
+
+    if not inspect(connection).has_table(
+        schema_version_table.name, schema=schema_version_table.schema
+    ):
+        return 0
+
+    version = connection.execute(
+        select(func.max(schema_version_table.c.version))
+    ).scalar_one()
+    return version or 0
+
+
+def _apply_migration(engine_: Engine, migration: Migration) -> None:
+    record = insert(schema_version_table).values(
+        version=migration.version,
+        description=migration.description,
+        applied_at=int(time.time()),
+    )
+
+    if migration.transactional:
+        with engine_.begin() as connection:
+            migration.apply(connection)
+            connection.execute(record)
+        return
+
+    with engine_.connect() as connection:
+        migration.apply(connection.execution_options(isolation_level="AUTOCOMMIT"))
+    with engine_.begin() as connection:
+        connection.execute(record)
+
+
+def run_migrations(
+    engine_: Engine | None = None, target_version: int = LATEST_SCHEMA_VERSION
+) -> list[int]:
+    """
+    Applies the migrations that have not been applied yet, up to
+    target_version. Returns the versions applied.
+    """
+
+    engine_ = engine_ or get_engine()
+    applied: list[int] = []
+
+    with engine_.connect() as lock_connection:
+        lock_connection.execute(
+            select(func.pg_advisory_lock(_MIGRATION_LOCK_ID))
+        ).scalar()
+        lock_connection.commit()
+
+        try:
+            with engine_.begin() as connection:
+                schema_version_table.create(connection, checkfirst=True)
+                current_version = get_schema_version(connection)
+
+            for migration in MIGRATIONS:
+                if current_version < migration.version <= target_version:
+                    rootlogger.info(
+                        "Applying migration %s: %s",
+                        migration.version,
+                        migration.description,
+                    )
+                    _apply_migration(engine_, migration)
+                    applied.append(migration.version)
+        finally:
+            lock_connection.execute(
+                select(func.pg_advisory_unlock(_MIGRATION_LOCK_ID))
+            ).scalar()
+            lock_connection.commit()
+
+    return applied
+
+
+def create_schema(engine_: Engine | None = None) -> int:
+    """
+    Creates every table and index of an empty database as currently
+    declared, and records every migration as applied, in one transaction.
+    Returns the version of the created schema.
+
+    Raises SchemaVersionError if the database already has tables, which
+    have to be migrated instead.
+    """
+
+    engine_ = engine_ or get_engine()
+
+    with engine_.begin() as connection:
+        connection.execute(select(func.pg_advisory_xact_lock(_MIGRATION_LOCK_ID)))
+
+        existing_tables = set(
+            inspect(connection).get_table_names(schema=metadata.schema)
+        )
+        if existing_tables & {table.name for table in metadata.sorted_tables}:
+            raise SchemaVersionError(
+                "The database is not empty, migrate its schema instead"
+            )
+
+        metadata.create_all(connection)
+        applied_at = int(time.time())
+        connection.execute(
+            insert(schema_version_table),
+            [
+                {
+                    "version": migration.version,
+                    "description": migration.description,
+                    "applied_at": applied_at,
+                }
+                for migration in MIGRATIONS
+            ],
+        )
+
+    return LATEST_SCHEMA_VERSION
+
+
+def verify_schema(
+    engine_: Engine | None = None, expected_version: int = LATEST_SCHEMA_VERSION
+) -> int:
+    """
+    Checks that the database is at least at expected_version with a single
+    lookup of the SchemaVersion table, and returns its version. A newer
+    schema is accepted, so processes of the previous release keep starting
+    while a deploy migrates the database.
+
+    Raises SchemaVersionError if the database is behind.
+    """
+
+    engine_ = engine_ or get_engine()
+
+    try:
+        with engine_.connect() as connection:
+            version = (
+                connection.execute(
+                    select(func.max(schema_version_table.c.version))
+                ).scalar_one()
+                or 0
+            )
+    except ProgrammingError:
+        # The SchemaVersion table does not exist yet
+        version = 0
+
+    if version < expected_version:
+        raise SchemaVersionError(
+            f"The database schema is at version {version}, "
+            f"version {expected_version} is required"
+        )
+    return version
+
+
+def prepare_schema(
+    engine_: Engine | None = None, mode: str = SCHEMA_STARTUP_MODE
+) -> None:
+    """
+    Prepares the schema when the application starts, see
+    SCHEMA_STARTUP_MODE. Verifying costs one query, where migrating takes
+    the migration lock and inspects the catalog, which adds up when many
+    processes start at once.
+    """
+
+    if mode == MIGRATE_STARTUP_MODE:
+        run_migrations(engine_)
+    elif mode == VERIFY_STARTUP_MODE:
+        verify_schema(engine_)
+    else:
+        raise ValueError(f"Unknown schema startup mode {mode}")
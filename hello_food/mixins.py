@@ -1,59 +1,198 @@
 from abc import abstractmethod, ABC
-from typing import Any, Mapping, TypeVar, Generic, cast
+from typing import (
+    Any,
+    ClassVar,
+    Final,
+    Generic,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from .validation import Schema, Validator, compile_schema, describe_error
 
-_T = TypeVar("_T", bound=int | float | str)
 _S = TypeVar("_S")
 
 
 class JsonFactory(Generic[_S], ABC):
-    _CONVERT_FAILURE = "Could not convert attribute %s as %s for class %s"
+    """
+    Creates entities from their JSON representation. A concrete factory
+    declares the fields of that representation as its _schema, which is
+    compiled into the factory's _validator when the class is created, see
+    validation.py.
+    """
 
-    @classmethod
-    def _get_attribute_from_json(
-        cls, json_as_dict: Mapping[str, Any], attribute_name: str
-    ) -> Any:
-        try:
-            return json_as_dict[attribute_name]
-        except KeyError as e:
-            message = "Could not find attribute %s from provided JSON dict" % (
-                attribute_name,
-            )
-            raise KeyError(message) from e
+    _schema: ClassVar[Schema | None] = None
+    _validator: ClassVar[Validator]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls._schema is not None:
+            cls._validator = compile_schema(cls._schema, cls.__name__)
 
     @classmethod
-    def _parse_value_from_json(
-        cls, json_as_dict: Mapping[str, Any], attribute_name: str, type_: type[_T]
-    ) -> _T:
-        try:
-            return cast(
-                _T, type_(cls._get_attribute_from_json(json_as_dict, attribute_name))
-            )
-        except ValueError as e:
-            message = cls._CONVERT_FAILURE % (
-                attribute_name,
-                type_.__name__,
-                cls.__name__,
-            )
-            raise ValueError(message) from e
+    def _parse_values_from_json(
+        cls, json_as_dict: Mapping[str, Any]
+    ) -> tuple[Any, ...]:
+        """
+        Parses the positional arguments of create_from_values from the json
+        representation of an entity.
+        """
+
+        return cls._validator.validate(json_as_dict)
 
     @classmethod
-    def _parse_int_from_json(
-        cls, json_as_dict: Mapping[str, Any], attribute_name: str
-    ) -> int:
-        return cls._parse_value_from_json(json_as_dict, attribute_name, int)
+    @abstractmethod
+    def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> _S: ...
+
+
+class BulkCreateResult(NamedTuple, Generic[_S]):
+    """
+    The outcome of creating a single item of a bulk create request. Exactly
+    one of entity and error is set.
+    """
+
+    item_index: int
+    entity: _S | None
+    error: str | None
+
+
+BULK_CREATE_CHUNK_SIZE: Final[int] = 1000
+
+"""
+The errors raised for an item that cannot be parsed or breaks an invariant.
+"""
+INVALID_ITEM_ERRORS: Final = (KeyError, ValueError, TypeError, AssertionError)
+
+
+class BulkJsonFactory(JsonFactory[_S], ABC):
+    """
+    Adds creation of many entities at once to a JsonFactory. Every item is
+    parsed and validated on its own, valid items are then written in chunks
+    and the outcome of each item is reported.
+    """
 
     @classmethod
-    def _parse_float_from_json(
-        cls, json_as_dict: Mapping[str, Any], attribute_name: str
-    ) -> float:
-        return cls._parse_value_from_json(json_as_dict, attribute_name, float)
+    def _assert_valid_values(cls, *values: Any) -> None:
+        """
+        Asserts the invariants of the entity created from the provided
+        arguments of create_from_values.
+        """
+        ...
 
     @classmethod
-    def _parse_str_from_json(
-        cls, json_as_dict: Mapping[str, Any], attribute_name: str
-    ) -> str:
-        return cls._parse_value_from_json(json_as_dict, attribute_name, str)
+    def parse_valid_values_from_json(
+        cls, json_as_dict: Mapping[str, Any]
+    ) -> tuple[Any, ...]:
+        """
+        Parses the create_from_values arguments of an item and asserts their
+        invariants, raising one of INVALID_ITEM_ERRORS for an invalid item.
+        """
+
+        values = cls._parse_values_from_json(json_as_dict)
+        cls._assert_valid_values(*values)
+        return values
 
     @classmethod
     @abstractmethod
-    def create_from_json(cls, json_as_dict: Mapping[str, Any]) -> _S: ...
+    def create_many_from_values(cls, values: Sequence[tuple[Any, ...]]) -> list[_S]:
+        """
+        Creates an entity for each of the provided create_from_values
+        arguments. Either every entity is created or none are, the entities
+        are written under sql_savepoint.
+        """
+        ...
+
+    @classmethod
+    def _create_one_by_one(
+        cls, items: Sequence[tuple[int, tuple[Any, ...]]]
+    ) -> list[BulkCreateResult[_S]]:
+        """
+        Creates the items of a chunk that failed one at a time, so only the
+        items the database rejects are reported as failed.
+        """
+
+        results: list[BulkCreateResult[_S]] = []
+        for index, values in items:
+            try:
+                (entity,) = cls.create_many_from_values([values])
+            except SQLAlchemyError as e:
+                results.append(BulkCreateResult(index, None, describe_error(e)))
+            else:
+                results.append(BulkCreateResult(index, entity, None))
+        return results
+
+    @classmethod
+    def create_many_from_json(
+        cls,
+        json_as_dicts: Sequence[Any],
+        chunk_size: int = BULK_CREATE_CHUNK_SIZE,
+    ) -> list[BulkCreateResult[_S]]:
+        results: list[BulkCreateResult[_S] | None] = [None] * len(json_as_dicts)
+        valid_items: list[tuple[int, tuple[Any, ...]]] = []
+
+        # Every item is parsed in one pass of the compiled validator
+        for index, (values, error) in enumerate(
+            cls._validator.validate_many(json_as_dicts)
+        ):
+            if values is not None:
+                try:
+                    cls._assert_valid_values(*values)
+                except INVALID_ITEM_ERRORS as e:
+                    error = e
+                else:
+                    valid_items.append((index, values))
+                    continue
+
+            assert error is not None
+            results[index] = BulkCreateResult(index, None, describe_error(error))
+
+        for chunk_start in range(0, len(valid_items), chunk_size):
+            chunk = valid_items[chunk_start : chunk_start + chunk_size]
+            try:
+                entities = cls.create_many_from_values([values for _, values in chunk])
+            except SQLAlchemyError:
+                for result in cls._create_one_by_one(chunk):
+                    results[result.item_index] = result
+            else:
+                for (index, _), entity in zip(chunk, entities):
+                    results[index] = BulkCreateResult(index, entity, None)
+
+        return cast(list[BulkCreateResult[_S]], results)
+
+
+_UNSET: Final[object] = object()
+
+
+class ChangeTracked:
+    """
+    Records which public attributes of an entity were assigned a different
+    value since it was last marked clean, so only the modified columns have
+    to be written back. Entities call mark_clean at the end of __init__.
+    """
+
+    __slots__ = ("_changed_attributes",)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        changed_attributes: set[str] | None = getattr(self, "_changed_attributes", None)
+        if (
+            changed_attributes is not None
+            and not name.startswith("_")
+            and name not in changed_attributes
+            and getattr(self, name, _UNSET) != value
+        ):
+            changed_attributes.add(name)
+        super().__setattr__(name, value)
+
+    def mark_clean(self) -> None:
+        self._changed_attributes: set[str] = set()
+
+    def get_changed_attributes(self) -> frozenset[str]:
+        return frozenset(getattr(self, "_changed_attributes", ()))
+
+    def is_dirty(self) -> bool:
+        return bool(getattr(self, "_changed_attributes", None))
@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+from typing import Any, Final, Generic, NamedTuple, Sequence, TypeVar
+
+from sqlalchemy import bindparam, tuple_, Row, Select, Table
+
+_S = TypeVar("_S")
+
+DEFAULT_PAGE_SIZE: Final[int] = 50
+MAX_PAGE_SIZE: Final[int] = 500
+
+
+class Page(NamedTuple, Generic[_S]):
+    """
+    A page of a keyset paginated listing. next_cursor is None on the last page
+    and otherwise passed back to fetch the following page.
+    """
+
+    items: list[_S]
+    next_cursor: str | None
+
+
+def encode_cursor(*key: int | str) -> str:
+    """
+    Encodes the sort key of the last item of a page as an opaque cursor.
+    """
+
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str, key_length: int) -> tuple[Any, ...]:
+    """
+    Decodes a cursor created by encode_cursor back into the sort key.
+    """
+
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor %s" % (cursor,)) from e
+
+    if not isinstance(key, list) or len(key) != key_length:
+        raise ValueError("Invalid cursor %s" % (cursor,))
+
+    return tuple(key)
+
+
+def clamp_page_size(limit: int | None) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def order_newest_first(
+    statement: Select[tuple[Any, ...]], table: Table, has_cursor: bool
+) -> Select[tuple[Any, ...]]:
+    """
+    Orders a statement over a table with a created column newest first,
+    keyed on (created, id). With a cursor, only rows before the key bound to
+    after_created and after_id are selected, which is a range scan of an
+    index on (created, id) however deep the page is. The number of rows is
+    bound to limit.
+    """
+
+    if has_cursor:
+        statement = statement.where(
+            tuple_(table.c.created, table.c.id)
+            < tuple_(bindparam("after_created"), bindparam("after_id"))
+        )
+
+    return statement.order_by(table.c.created.desc(), table.c.id.desc()).limit(
+        bindparam("limit")
+    )
+
+
+def newest_first_parameters(cursor: str | None, limit: int) -> dict[str, Any]:
+    """
+    Gets the parameters of a statement ordered by order_newest_first. One row
+    more than limit is selected to find out whether there is a next page.
+    """
+
+    parameters: dict[str, Any] = {"limit": limit + 1}
+
+    if cursor is not None:
+        after_created, after_id = decode_cursor(cursor, 2)
+        parameters["after_created"] = int(after_created)
+        parameters["after_id"] = int(after_id)
+
+    return parameters
+
+
+def split_newest_first_rows(
+    rows: Sequence[Row[Any]], limit: int
+) -> tuple[Sequence[Row[Any]], str | None]:
+    """
+    Splits the rows selected with newest_first_parameters into the rows of
+    the page and the cursor of the next page.
+    """
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created, rows[-1].id)
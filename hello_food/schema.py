@@ -0,0 +1,48 @@
+"""
+Creates, verifies or migrates the database schema, see
+hello_food/migrations.py. Run it once per deploy rather than from every
+process, and start the application with SCHEMA_STARTUP_MODE=verify.
+
+    python -m hello_food.schema create
+    python -m hello_food.schema verify
+    python -m hello_food.schema migrate
+"""
+
+import argparse
+
+from .log import configure_logging
+from .migrations import (
+    SchemaVersionError,
+    create_schema,
+    run_migrations,
+    verify_schema,
+)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "create", help="create the schema of an empty database at the latest version"
+    )
+    subparsers.add_parser(
+        "verify", help="exit with an error if the schema is not at the latest version"
+    )
+    subparsers.add_parser("migrate", help="apply the pending migrations")
+    arguments = parser.parse_args()
+
+    try:
+        if arguments.command == "create":
+            print(f"Created the schema at version {create_schema()}")
+        elif arguments.command == "verify":
+            print(f"The schema is at version {verify_schema()}")
+        else:
+            versions = run_migrations()
+            print(
+                f"Applied migrations {versions}" if versions else "Schema is up to date"
+            )
+    except SchemaVersionError as e:
+        parser.exit(1, f"{e}\n")
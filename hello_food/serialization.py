@@ -0,0 +1,99 @@
+"""
+Serializes the entities to JSON with orjson.
+
+Each entity type has a serializer that reads its attributes with a single
+operator.attrgetter and zips them with the field names, so building the
+JSON object of an entity runs no per field Python code. orjson calls the
+serializer of each entity it meets, including entities nested in the
+responses of handlers, so handlers return entities as they are.
+
+Meals are TypedDicts and are serialized by orjson as they are.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Final
+
+import orjson
+from flask import Response
+from flask.json.provider import JSONProvider
+
+from .address import Address
+from .delivery import Delivery, MealOrder
+from .handling_event import HandlingEvent
+from .user import StandardUser, TrialUser
+from .user.orm import STANDARD_USER_TYPE, TRIAL_USER_TYPE
+
+Serializer = Callable[[Any], dict[str, Any]]
+
+
+def attribute_serializer(*attribute_names: str, **constants: Any) -> Serializer:
+    """
+    Creates a serializer reading attribute_names into the fields of the
+    same name, alongside the constant fields.
+    """
+
+    # attrgetter returns a tuple of the attributes when given several names
+    assert len(attribute_names) > 1 and "Serialize at least two attributes"
+    get_attributes = attrgetter(*attribute_names)
+
+    return lambda entity: dict(
+        zip(attribute_names, get_attributes(entity)), **constants
+    )
+
+
+def _meal_order_serializer(meal_order: MealOrder) -> dict[str, Any]:
+    # A MealOrder is a tuple of its fields already
+    return dict(zip(MealOrder._fields, meal_order))
+
+
+_USER_ATTRIBUTE_NAMES: Final = ("id", "email", "name", "meals_per_week", "address_id")
+
+SERIALIZERS: Final[dict[type, Serializer]] = {
+    Address: attribute_serializer("id", "unit", "street_name", "suburb", "postcode"),
+    Delivery: attribute_serializer(
+        "id", "user_id", "address_id", "total", "meal_orders"
+    ),
+    MealOrder: _meal_order_serializer,
+    HandlingEvent: attribute_serializer(
+        "id", "delivery_id", "to_address_id", "from_address_id", "completion_time"
+    ),
+    StandardUser: attribute_serializer(*_USER_ATTRIBUTE_NAMES, type=STANDARD_USER_TYPE),
+    TrialUser: attribute_serializer(
+        *_USER_ATTRIBUTE_NAMES,
+        "trial_end_date",
+        "discount_value",
+        type=TRIAL_USER_TYPE,
+    ),
+}
+
+
+def _serialize_entity(entity: Any) -> dict[str, Any]:
+    serializer = SERIALIZERS.get(type(entity))
+    if serializer is None:
+        raise TypeError(f"Object of type {type(entity).__name__} is not serializable")
+    return serializer(entity)
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_serialize_entity)
+
+
+def loads(s: str | bytes) -> Any:
+    return orjson.loads(s)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    The JSON provider of the Flask application. Responses are encoded
+    straight to bytes.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return Response(dumps(obj), mimetype="application/json")
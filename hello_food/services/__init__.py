@@ -1,3 +1,15 @@
 from .send_email import send_customer_email
+from .send_bulk_email import (
+    BulkEmailRecipient,
+    BulkEmailResult,
+    TokenBucket,
+    send_bulk_templated_email,
+)
 
-__all__ = ["send_customer_email"]
+__all__ = [
+    "send_customer_email",
+    "BulkEmailRecipient",
+    "BulkEmailResult",
+    "TokenBucket",
+    "send_bulk_templated_email",
+]
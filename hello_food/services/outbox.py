@@ -0,0 +1,328 @@
+"""
+A transactional outbox for customer emails.
+
+Emails are not sent while handling a request. They are written to the
+EmailOutbox table on the connection of the active unit of work, so an email
+is recorded if and only if the change it notifies about is committed, and a
+slow or failing SES does not hold up or fail the request.
+
+A dispatcher drains the outbox in batches. Each batch is claimed in a
+short transaction of its own, which picks due emails with SELECT ... FOR
+UPDATE SKIP LOCKED and leases them for OUTBOX_CLAIM_SECONDS, so several
+dispatchers can run side by side without sending an email twice. The
+emails are then sent outside of any transaction, and the outcome of each
+send is committed as soon as it is known, so a slow SES holds neither row
+locks nor a pooled connection. Only the email being sent when a dispatcher
+dies can be sent again, once its lease has expired. Failed sends are
+retried with exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+
+Every email has a deduplication key and an email whose key is already in
+the outbox is not enqueued again. Run the dispatcher with
+`python -m hello_food.services.outbox`.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Final, NamedTuple
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Engine,
+    Index,
+    Integer,
+    String,
+    Table,
+    bindparam,
+    func,
+    or_,
+    select,
+    update,
+    Insert,
+    Select,
+    Update,
+)
+from sqlalchemy.dialects.postgresql import insert
+
+from ..environ import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_CLAIM_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_BACKOFF_SECONDS,
+    OUTBOX_MAX_BACKOFF_SECONDS,
+    OUTBOX_POLL_INTERVAL,
+)
+from ..log import configure_logging, rootlogger
+from ..sql import get_engine, metadata, created_column
+from ..statements import registered_statement
+from ..unit_of_work import async_sql_connection, sql_connection
+from .send_email import send_customer_email
+
+email_outbox_table = Table(
+    "EmailOutbox",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("dedup_key", String, nullable=False, unique=True),
+    Column("recipient", String, nullable=False),
+    Column("subject", String, nullable=False),
+    Column("body", String, nullable=False),
+    created_column(),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("next_attempt_at", Integer, nullable=False),
+    Column("sent_at", Integer, nullable=True),
+    # Until when the email is leased to the dispatcher sending it
+    Column("claimed_until", Integer, nullable=True),
+    Column("last_error", String, nullable=True),
+)
+
+# Only the unsent emails are looked up by the dispatcher
+Index(
+    "ix_email_outbox_pending",
+    email_outbox_table.c.next_attempt_at,
+    postgresql_where=email_outbox_table.c.sent_at.is_(None),
+)
+
+# Truncates the error recorded for a failed send
+_MAX_ERROR_LENGTH: Final[int] = 1000
+
+SendEmail = Callable[[str, str, str], None]
+
+
+class OutboxDispatchResult(NamedTuple):
+    sent: int
+    failed: int
+
+    @property
+    def claimed(self) -> int:
+        return self.sent + self.failed
+
+
+@registered_statement
+def _insert_email() -> Insert:
+    return insert(email_outbox_table).on_conflict_do_nothing(
+        index_elements=[email_outbox_table.c.dedup_key]
+    )
+
+
+@registered_statement
+def _claim_pending_emails() -> Update:
+    # The attempt is counted when the email is claimed, so an email whose
+    # dispatcher keeps dying while sending it is eventually given up on
+    pending_email_ids = (
+        select(email_outbox_table.c.id)
+        .where(
+            email_outbox_table.c.sent_at.is_(None),
+            email_outbox_table.c.next_attempt_at <= bindparam("now"),
+            email_outbox_table.c.attempts < bindparam("max_attempts"),
+            or_(
+                email_outbox_table.c.claimed_until.is_(None),
+                email_outbox_table.c.claimed_until <= bindparam("now"),
+            ),
+        )
+        .order_by(email_outbox_table.c.next_attempt_at, email_outbox_table.c.id)
+        .limit(bindparam("limit"))
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(email_outbox_table)
+        .where(email_outbox_table.c.id.in_(pending_email_ids.scalar_subquery()))
+        .values(
+            attempts=email_outbox_table.c.attempts + 1,
+            claimed_until=bindparam("new_claimed_until"),
+        )
+        .returning(email_outbox_table)
+    )
+
+
+@registered_statement
+def _update_sent_email() -> Update:
+    return (
+        update(email_outbox_table)
+        .where(email_outbox_table.c.id == bindparam("outbox_id"))
+        .values(sent_at=bindparam("new_sent_at"), claimed_until=None)
+    )
+
+
+@registered_statement
+def _update_failed_email() -> Update:
+    return (
+        update(email_outbox_table)
+        .where(email_outbox_table.c.id == bindparam("outbox_id"))
+        .values(
+            next_attempt_at=bindparam("new_next_attempt_at"),
+            last_error=bindparam("new_last_error"),
+            claimed_until=None,
+        )
+    )
+
+
+@registered_statement
+def _count_pending_emails() -> Select[tuple[int]]:
+    return select(func.count()).where(
+        email_outbox_table.c.sent_at.is_(None),
+        email_outbox_table.c.attempts < bindparam("max_attempts"),
+    )
+
+
+def _insert_email_parameters(
+    customer_email: str, subject: str, body: str, dedup_key: str
+) -> dict[str, Any]:
+    return {
+        "dedup_key": dedup_key,
+        "recipient": customer_email,
+        "subject": subject,
+        "body": body,
+        "next_attempt_at": int(time.time()),
+    }
+
+
+def enqueue_customer_email(
+    customer_email: str, subject: str, body: str, dedup_key: str
+) -> bool:
+    """
+    Adds an email to the outbox in the transaction of the active unit of
+    work. Returns False if an email with the same dedup_key was already
+    enqueued, in which case nothing is added.
+    """
+
+    with sql_connection() as connection:
+        result = connection.execute(
+            _insert_email(),
+            _insert_email_parameters(customer_email, subject, body, dedup_key),
+        )
+
+    return bool(result.rowcount)
+
+
+async def enqueue_customer_email_async(
+    customer_email: str, subject: str, body: str, dedup_key: str
+) -> bool:
+    """
+    The asyncio counterpart of enqueue_customer_email. The email is added in
+    the active async_transaction, or committed on a connection of its own
+    outside of one.
+    """
+
+    async with async_sql_connection() as connection:
+        result = await connection.execute(
+            _insert_email(),
+            _insert_email_parameters(customer_email, subject, body, dedup_key),
+        )
+
+    return bool(result.rowcount)
+
+
+def get_outbox_backlog(
+    connection: Connection, max_attempts: int = OUTBOX_MAX_ATTEMPTS
+) -> int:
+    """
+    Counts the emails waiting to be sent, leaving out those given up on.
+    """
+
+    return int(
+        connection.execute(
+            _count_pending_emails(), {"max_attempts": max_attempts}
+        ).scalar_one()
+    )
+
+
+def get_backoff_seconds(attempts: int) -> int:
+    """
+    Gets the delay before retrying an email which failed attempts times.
+    """
+
+    return min(
+        OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_MAX_BACKOFF_SECONDS
+    )
+
+
+def dispatch_outbox(
+    engine_: Engine | None = None,
+    send: SendEmail | None = None,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+    clock: Callable[[], float] = time.time,
+    claim_seconds: int = OUTBOX_CLAIM_SECONDS,
+) -> OutboxDispatchResult:
+    """
+    Claims a batch of due emails for claim_seconds and sends them one by
+    one, committing the outcome of each send before the next.
+    """
+
+    engine_ = engine_ or get_engine()
+    send = send or send_customer_email
+    now = int(clock())
+
+    with engine_.begin() as connection:
+        emails = sorted(
+            connection.execute(
+                _claim_pending_emails(),
+                {
+                    "now": now,
+                    "max_attempts": max_attempts,
+                    "limit": batch_size,
+                    "new_claimed_until": now + claim_seconds,
+                },
+            ).all(),
+            key=lambda email: (email.next_attempt_at, email.id),
+        )
+
+    sent = failed = 0
+    for email in emails:
+        try:
+            send(email.recipient, email.subject, email.body)
+        except Exception as e:
+            if email.attempts >= max_attempts:
+                rootlogger.error(
+                    "Giving up on outbox email %s after %s attempts: %s",
+                    email.dedup_key,
+                    email.attempts,
+                    e,
+                )
+            outcome: tuple[Update, dict[str, Any]] = (
+                _update_failed_email(),
+                {
+                    "outbox_id": email.id,
+                    "new_next_attempt_at": now + get_backoff_seconds(email.attempts),
+                    "new_last_error": str(e)[:_MAX_ERROR_LENGTH],
+                },
+            )
+            failed += 1
+        else:
+            outcome = (
+                _update_sent_email(),
+                {"outbox_id": email.id, "new_sent_at": now},
+            )
+            sent += 1
+
+        with engine_.begin() as connection:
+            connection.execute(*outcome)
+
+    return OutboxDispatchResult(sent, failed)
+
+
+def run_outbox_dispatcher(
+    stop: threading.Event | None = None,
+    poll_interval: float = OUTBOX_POLL_INTERVAL,
+) -> None:
+    """
+    Dispatches the outbox until stop is set. Batches are dispatched back to
+    back while there are due emails, otherwise the outbox is polled every
+    poll_interval seconds.
+    """
+
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            result = dispatch_outbox()
+        except Exception as e:
+            rootlogger.error("Could not dispatch the outbox: %s", e)
+            result = OutboxDispatchResult(0, 0)
+
+        if result.claimed == 0:
+            stop.wait(poll_interval)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    run_outbox_dispatcher()
@@ -0,0 +1,174 @@
+"""
+Sends a templated email to many customers at once, for instance to remind
+every trial user whose trial is about to end.
+
+Recipients are sent in chunks with the SES SendBulkTemplatedEmail API, up to
+SES_MAX_BULK_DESTINATIONS recipients per request, on a bounded pool of
+worker threads. Every recipient counts against the account's maximum send
+rate, so requests wait on a token bucket refilled at that rate. SES reports
+the outcome of each recipient of a request, which is returned per
+recipient, and a request that fails as a whole fails each of its
+recipients.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Final, Mapping, NamedTuple, Sequence
+
+from ..environ import SES_BULK_MAX_WORKERS, SES_MAX_SEND_RATE, SES_SOURCE_EMAIL
+from ..log import rootlogger
+from .send_email import get_ses_client
+
+"""
+The maximum number of destinations of a SendBulkTemplatedEmail request.
+"""
+SES_MAX_BULK_DESTINATIONS: Final[int] = 50
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket. Tokens are added at rate per second up to
+    capacity, and acquire blocks until the requested tokens are available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        assert rate > 0 and "The rate of a token bucket must be positive"
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        assert tokens <= self.capacity and "Cannot acquire more tokens than capacity"
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+
+            self._sleep(wait)
+
+
+def create_send_rate_limiter(client: Any = None) -> TokenBucket:
+    """
+    Creates a token bucket refilled at SES_MAX_SEND_RATE, or at the maximum
+    send rate of the account's SES quota when it is not set.
+    """
+
+    max_send_rate = SES_MAX_SEND_RATE
+    if max_send_rate is None:
+        client = client or get_ses_client()
+        max_send_rate = float(client.get_send_quota()["MaxSendRate"])
+
+    return TokenBucket(max_send_rate)
+
+
+class BulkEmailRecipient(NamedTuple):
+    email: str
+    template_data: Mapping[str, Any]
+
+
+class BulkEmailResult(NamedTuple):
+    """
+    The outcome of sending to a single recipient. Exactly one of message_id
+    and error is set.
+    """
+
+    email: str
+    message_id: str | None
+    error: str | None
+
+
+def _send_chunk(
+    client: Any,
+    template: str,
+    default_template_data: Mapping[str, Any],
+    recipients: Sequence[BulkEmailRecipient],
+) -> list[BulkEmailResult]:
+    # botocore is only imported once an email is sent, see get_ses_client
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    try:
+        response = client.send_bulk_templated_email(
+            Source=SES_SOURCE_EMAIL,
+            Template=template,
+            DefaultTemplateData=json.dumps(default_template_data),
+            Destinations=[
+                {
+                    "Destination": {"ToAddresses": [recipient.email]},
+                    "ReplacementTemplateData": json.dumps(recipient.template_data),
+                }
+                for recipient in recipients
+            ],
+        )
+    except (BotoCoreError, ClientError) as e:
+        rootlogger.error("Bulk send of template %s failed: %s", template, e)
+        return [
+            BulkEmailResult(recipient.email, None, str(e)) for recipient in recipients
+        ]
+
+    results: list[BulkEmailResult] = []
+    for recipient, status in zip(recipients, response["Status"]):
+        if status["Status"] == "Success":
+            results.append(BulkEmailResult(recipient.email, status["MessageId"], None))
+        else:
+            error = status.get("Error") or status["Status"]
+            results.append(BulkEmailResult(recipient.email, None, error))
+
+    return results
+
+
+def send_bulk_templated_email(
+    template: str,
+    recipients: Sequence[BulkEmailRecipient],
+    default_template_data: Mapping[str, Any] | None = None,
+    client: Any = None,
+    rate_limiter: TokenBucket | None = None,
+    max_workers: int = SES_BULK_MAX_WORKERS,
+) -> list[BulkEmailResult]:
+    """
+    Sends the SES template to every recipient, with the template data of the
+    recipient merged over default_template_data. Returns the outcome of each
+    recipient in the order of recipients.
+    """
+
+    client = client or get_ses_client()
+    rate_limiter = rate_limiter or create_send_rate_limiter(client)
+    default_template_data = default_template_data or {}
+
+    # A request is only sent once a token is available for every recipient
+    chunk_size = max(1, min(SES_MAX_BULK_DESTINATIONS, int(rate_limiter.capacity)))
+    chunks = [
+        recipients[chunk_start : chunk_start + chunk_size]
+        for chunk_start in range(0, len(recipients), chunk_size)
+    ]
+
+    def send_chunk(chunk: Sequence[BulkEmailRecipient]) -> list[BulkEmailResult]:
+        rate_limiter.acquire(len(chunk))
+        return _send_chunk(client, template, default_template_data, chunk)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [
+            result
+            for chunk_results in executor.map(send_chunk, chunks)
+            for result in chunk_results
+        ]
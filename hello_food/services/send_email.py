@@ -1,13 +1,32 @@
-from typing import Final
+import threading
+from typing import Any, Final
 
-import boto3
+from ..environ import SES_ENDPOINT_URL, SES_SOURCE_EMAIL
 
-_SES_CLIENT: Final = boto3.client("ses")
-_HELLO_FOOD_SOURCE_EMAIL: Final[str] = "TODO"
+_HELLO_FOOD_SOURCE_EMAIL: Final[str] = SES_SOURCE_EMAIL
+
+_ses_client: Any = None
+_ses_client_lock = threading.Lock()
+
+
+def get_ses_client() -> Any:
+    """
+    Gets the SES client, created on first use. boto3 is slow to import and
+    to build a client with, and most processes never send an email.
+    """
+
+    global _ses_client
+    if _ses_client is None:
+        with _ses_client_lock:
+            if _ses_client is None:
+                import boto3
+
+                _ses_client = boto3.client("ses", endpoint_url=SES_ENDPOINT_URL)
+    return _ses_client
 
 
 def send_customer_email(customer_email: str, subject: str, body: str) -> None:
-    _SES_CLIENT.send_email(
+    get_ses_client().send_email(
         Source=_HELLO_FOOD_SOURCE_EMAIL,
         Destination={
             "ToAddresses": [
@@ -1,11 +1,444 @@
-from sqlalchemy import create_engine, Engine, MetaData
-from sqlalchemy.pool import StaticPool
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Final, NamedTuple, Sequence
 
-from .environ import CI, PYTEST_VERSION, POSTGRES_HOSTNAME, PROD
+from sqlalchemy import (
+    create_engine,
+    text,
+    Column,
+    Connection,
+    Engine,
+    Integer,
+    MetaData,
+    URL,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 
-engine: Engine = create_engine(
-    f"postgresql://webapp:webapp@{POSTGRES_HOSTNAME}:5432/webapp", echo=True
+from .environ import (
+    CI,
+    PYTEST_VERSION,
+    POSTGRES_HOSTNAME,
+    POSTGRES_PORT,
+    POSTGRES_USER,
+    POSTGRES_PASSWORD,
+    POSTGRES_DB,
+    PROD,
+    SQL_POOL_MODE,
+    SQL_POOL_SIZE,
+    SQL_MAX_OVERFLOW,
+    SQL_POOL_PRE_PING,
+    SQL_POOL_RECYCLE,
+    SQL_POOL_TIMEOUT,
+    SQL_POOL_PREWARM,
+    POSTGRES_REPLICA_HOSTNAMES,
+    SQL_REPLICA_MAX_LAG_SECONDS,
+    SQL_REPLICA_LAG_CHECK_INTERVAL,
 )
+from .log import rootlogger
+
+QUEUE_POOL_MODE = "queue"
+PGBOUNCER_POOL_MODE = "pgbouncer"
+
+
+class EngineSettings(NamedTuple):
+    """
+    Everything needed to build an engine. Defaults are read from the
+    environment, see environ.py.
+    """
+
+    hostname: str = POSTGRES_HOSTNAME
+    port: int = POSTGRES_PORT
+    username: str = POSTGRES_USER
+    password: str = POSTGRES_PASSWORD
+    database: str = POSTGRES_DB
+    # SQLAlchemy's own echo, which writes to stdout on the thread issuing
+    # the statement. SQL_ECHO logs the statements through log.py instead
+    echo: bool = False
+    pool_mode: str = SQL_POOL_MODE
+    pool_size: int = SQL_POOL_SIZE
+    max_overflow: int = SQL_MAX_OVERFLOW
+    pool_pre_ping: bool = SQL_POOL_PRE_PING
+    pool_recycle: int = SQL_POOL_RECYCLE
+    pool_timeout: int = SQL_POOL_TIMEOUT
+    pool_prewarm: int = SQL_POOL_PREWARM
+    replica_hostnames: tuple[str, ...] = POSTGRES_REPLICA_HOSTNAMES
+    replica_max_lag_seconds: float = SQL_REPLICA_MAX_LAG_SECONDS
+    replica_lag_check_interval: float = SQL_REPLICA_LAG_CHECK_INTERVAL
+
+    @property
+    def url(self) -> URL:
+        return self.url_for_driver("postgresql")
+
+    @property
+    def async_url(self) -> URL:
+        return self.url_for_driver("postgresql+asyncpg")
+
+    def url_for_driver(self, drivername: str) -> URL:
+        return URL.create(
+            drivername,
+            username=self.username,
+            password=self.password,
+            host=self.hostname,
+            port=self.port,
+            database=self.database,
+        )
+
+
+class PoolStatistics(NamedTuple):
+    pool_mode: str
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+    @property
+    def capacity(self) -> int:
+        """
+        The maximum number of connections the pool will hand out at once.
+        """
+        return self.pool_size + self.max_overflow
+
+    @property
+    def saturation(self) -> float:
+        """
+        The fraction of the pool capacity currently checked out.
+        """
+        if self.capacity <= 0:
+            return 0.0
+        return self.checked_out / self.capacity
+
+
+def create_engine_from_settings(settings: EngineSettings) -> Engine:
+    """
+    Builds an engine from the provided settings.
+
+    In "pgbouncer" mode no connections are pooled in process. PgBouncer in
+    transaction pooling mode already multiplexes server connections and a
+    second pool in front of it would only hold PgBouncer slots idle.
+    """
+
+    if settings.pool_mode == PGBOUNCER_POOL_MODE:
+        return create_engine(settings.url, echo=settings.echo, poolclass=NullPool)
+
+    if settings.pool_mode != QUEUE_POOL_MODE:
+        raise ValueError(f"Unknown pool mode {settings.pool_mode}")
+
+    return create_engine(
+        settings.url,
+        echo=settings.echo,
+        poolclass=QueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_pre_ping=settings.pool_pre_ping,
+        pool_recycle=settings.pool_recycle,
+        pool_timeout=settings.pool_timeout,
+        pool_use_lifo=True,
+    )
+
+
+def create_async_engine_from_settings(settings: EngineSettings) -> AsyncEngine:
+    """
+    Builds an asyncpg backed engine from the provided settings, pooled the
+    same way as create_engine_from_settings. Requires the async extra.
+
+    asyncpg caches prepared statements per connection, which PgBouncer in
+    transaction pooling mode cannot route, so the cache is disabled there.
+    """
+
+    if settings.pool_mode == PGBOUNCER_POOL_MODE:
+        return create_async_engine(
+            settings.async_url,
+            echo=settings.echo,
+            poolclass=NullPool,
+            connect_args={"statement_cache_size": 0},
+        )
+
+    if settings.pool_mode != QUEUE_POOL_MODE:
+        raise ValueError(f"Unknown pool mode {settings.pool_mode}")
+
+    return create_async_engine(
+        settings.async_url,
+        echo=settings.echo,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_pre_ping=settings.pool_pre_ping,
+        pool_recycle=settings.pool_recycle,
+        pool_timeout=settings.pool_timeout,
+        pool_use_lifo=True,
+    )
+
+
+def prewarm_pool(engine_: Engine, count: int) -> int:
+    """
+    Opens up to count connections and returns them to the pool so later
+    checkouts reuse them. Returns the number of connections opened.
+    """
+
+    if not isinstance(engine_.pool, QueuePool):
+        return 0
+
+    count = min(count, engine_.pool.size())
+    connections: list[Connection] = []
+    try:
+        for _ in range(count):
+            connections.append(engine_.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+    return len(connections)
+
+
+def get_pool_statistics(
+    engine_: Engine | None = None, settings: EngineSettings | None = None
+) -> PoolStatistics:
+    """
+    Reports how the connection pool of the provided engine is being used.
+    """
+
+    engine_ = engine_ or get_engine()
+    settings = settings or engine_settings
+    pool = engine_.pool
+
+    if not isinstance(pool, QueuePool):
+        return PoolStatistics(PGBOUNCER_POOL_MODE, 0, 0, 0, 0, 0)
+
+    return PoolStatistics(
+        QUEUE_POOL_MODE,
+        pool.size(),
+        settings.max_overflow,
+        pool.checkedin(),
+        pool.checkedout(),
+        max(pool.overflow(), 0),
+    )
+
+
+_REPLICATION_LAG_STATEMENT = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) "
+    "END"
+)
+
+
+def get_replication_lag(engine_: Engine) -> float | None:
+    """
+    Gets how many seconds the database behind the engine lags its primary.
+    A replica that has replayed everything it received has no lag, even if
+    the primary has not written for a while. Returns None if the database
+    cannot be reached.
+    """
+
+    try:
+        with engine_.connect() as connection:
+            lag = connection.execute(_REPLICATION_LAG_STATEMENT).scalar_one()
+    except SQLAlchemyError as e:
+        rootlogger.warning("Could not check replication lag of %s: %s", engine_.url, e)
+        return None
+
+    return 0.0 if lag is None else float(lag)
+
+
+class ReplicaRouter:
+    """
+    Sends writes to the primary engine and spreads reads over the replica
+    engines round robin. Replicas lagging the primary by more than
+    max_lag_seconds, or that cannot be reached, are skipped until their lag
+    is checked again, and reads fall back to the primary when no replica is
+    usable.
+
+    The lag of the replicas is checked by refresh, every lag_check_interval
+    seconds on a daemon thread once started, so picking the engine of a
+    read never waits on a replica. Reads use the primary until the replicas
+    were first checked.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Sequence[Engine] = (),
+        max_lag_seconds: float = SQL_REPLICA_MAX_LAG_SECONDS,
+        lag_check_interval: float = SQL_REPLICA_LAG_CHECK_INTERVAL,
+        get_lag: Callable[[Engine], float | None] = get_replication_lag,
+    ) -> None:
+        self.primary: Engine = primary
+        self.replicas: tuple[Engine, ...] = tuple(replicas)
+        self._max_lag_seconds = max_lag_seconds
+        self._lag_check_interval = lag_check_interval
+        self._get_lag = get_lag
+        self._lock = threading.Lock()
+        self._next_replica = 0
+        # The replicas usable at the latest refresh, replaced at once
+        self._usable_replicas: tuple[Engine, ...] = ()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def get_write_engine(self) -> Engine:
+        return self.primary
+
+    def get_read_engine(self) -> Engine:
+        usable_replicas = self._usable_replicas
+        if not usable_replicas:
+            return self.primary
+
+        with self._lock:
+            replica = usable_replicas[self._next_replica % len(usable_replicas)]
+            self._next_replica += 1
+        return replica
+
+    def refresh(self) -> tuple[Engine, ...]:
+        """
+        Checks the lag of every replica and returns the replicas reads are
+        spread over from then on.
+        """
+
+        usable_replicas: list[Engine] = []
+        for replica in self.replicas:
+            lag = self._get_lag(replica)
+            if lag is not None and lag <= self._max_lag_seconds:
+                usable_replicas.append(replica)
+            else:
+                rootlogger.warning(
+                    "Not reading from replica %s, lag %s", replica.url, lag
+                )
+
+        self._usable_replicas = tuple(usable_replicas)
+        return self._usable_replicas
+
+    def start(self) -> None:
+        """
+        Checks the lag of the replicas once, so reads can use them straight
+        away, and checks it in the background from then on. Does nothing
+        without replicas.
+        """
+
+        if self._thread is not None or not self.replicas:
+            return
+
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="hello_food-replica-lag", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._lag_check_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Reads keep the replicas of the latest refresh
+                rootlogger.error("Replica lag check failed: %s", e)
+
+
+def create_replica_router_from_settings(
+    primary: Engine, settings: EngineSettings
+) -> ReplicaRouter:
+    return ReplicaRouter(
+        primary,
+        [
+            create_engine_from_settings(settings._replace(hostname=hostname))
+            for hostname in settings.replica_hostnames
+        ],
+        settings.replica_max_lag_seconds,
+        settings.replica_lag_check_interval,
+    )
+
+
+def get_engine_settings() -> EngineSettings:
+    return EngineSettings()
+
+
+engine_settings: EngineSettings = get_engine_settings()
+
+_engine: Engine | None = None
+_replica_router: ReplicaRouter | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Gets the engine of the primary database, created on first use so that
+    importing the package does not load the database driver.
+    """
+
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine_from_settings(engine_settings)
+    return _engine
+
+
+def get_replica_router() -> ReplicaRouter:
+    """
+    Gets the router between the primary and the replica engines, created and
+    started on first use like get_engine.
+    """
+
+    global _replica_router
+    if _replica_router is None:
+        primary = get_engine()
+        with _engine_lock:
+            if _replica_router is None:
+                replica_router = create_replica_router_from_settings(
+                    primary, engine_settings
+                )
+                replica_router.start()
+                _replica_router = replica_router
+    return _replica_router
+
+
+if TYPE_CHECKING:
+    engine: Engine
+    replica_router: ReplicaRouter
+
+
+def __getattr__(name: str) -> Any:
+    # engine and replica_router used to be created at import, keep them
+    # importable for the scripts and tests that use them
+    if name == "engine":
+        return get_engine()
+    if name == "replica_router":
+        return get_replica_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_async_engine: AsyncEngine | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Gets the engine of the asyncio application mode, created on first use so
+    the synchronous application does not need asyncpg.
+    """
+
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine_from_settings(engine_settings)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """
+    Closes the connections of the async engine. Pooled asyncpg connections
+    belong to the event loop they were opened on, so this has to be awaited
+    before that loop is closed.
+    """
+
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
 
 
 def get_sa_metadata() -> MetaData:
@@ -20,3 +453,22 @@ def get_sa_metadata() -> MetaData:
 
 
 metadata: MetaData = get_sa_metadata()
+
+
+"""
+The database side default of created columns, the insert time in seconds
+since the epoch.
+"""
+CREATED_DEFAULT: Final[str] = "(extract(epoch from now()))::integer"
+
+
+def created_column() -> Column[int]:
+    """
+    A column recording when a row was inserted, filled in by the database.
+    Listings are ordered by (created, id), the id breaking ties between rows
+    inserted in the same second.
+    """
+
+    return Column(
+        "created", Integer, nullable=False, server_default=text(CREATED_DEFAULT)
+    )
@@ -0,0 +1,50 @@
+"""
+A registry of the SQL statements repositories and factories execute.
+
+A registered statement is built once, with bind parameters in place of
+values, and the same statement object is executed on every call with the
+values passed as parameters. SQLAlchemy memoizes the cache key of a
+statement object, so besides not rebuilding the construct, each execution
+skips generating the key it looks the compiled statement up with.
+"""
+
+from functools import wraps
+from typing import Callable, Hashable, ParamSpec, TypeVar, cast
+
+from sqlalchemy import Executable
+
+_X = TypeVar("_X", bound=Executable)
+_P = ParamSpec("_P")
+
+_registered_statements: dict[str, Executable] = {}
+
+
+def registered_statement(build: Callable[_P, _X]) -> Callable[_P, _X]:
+    """
+    Decorates a function building a statement, so the statement is built on
+    first use and the same statement is returned from then on. A builder
+    may take hashable arguments choosing between variants of a statement,
+    each variant is built once.
+    """
+
+    qualified_name = f"{build.__module__}.{build.__qualname__}"
+
+    @wraps(build)
+    def get_statement(*args: _P.args, **kwargs: _P.kwargs) -> _X:
+        variant: tuple[Hashable, ...] = (*args, *sorted(kwargs.items()))
+        name = f"{qualified_name}{variant}" if variant else qualified_name
+
+        statement = _registered_statements.get(name)
+        if statement is None:
+            statement = _registered_statements.setdefault(name, build(*args, **kwargs))
+        return cast(_X, statement)
+
+    return get_statement
+
+
+def get_registered_statements() -> dict[str, Executable]:
+    """
+    Gets the statements built so far by their qualified builder names.
+    """
+
+    return dict(_registered_statements)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar, cast
+
+from sqlalchemy import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .sql import get_async_engine, get_engine, get_replica_router, ReplicaRouter
+
+_E = TypeVar("_E")
+
+_current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+    "hello_food_unit_of_work", default=None
+)
+
+_current_async_transaction: ContextVar[AsyncConnection | None] = ContextVar(
+    "hello_food_async_transaction", default=None
+)
+
+
+class UnitOfWork:
+    """
+    Shares a single connection and transaction between every repository and
+    factory used while the unit of work is active. The transaction is
+    committed once when the unit of work exits cleanly and rolled back
+    otherwise.
+
+    Entities loaded or created while the unit of work is active are kept in
+    an identity map so repeated lookups of the same entity return the same
+    object without another round trip.
+
+    Repository reads are served from a replica picked by the router until
+    the unit of work first writes. From then on they share the connection
+    to the primary, so the unit of work always reads its own writes.
+    """
+
+    def __init__(
+        self, engine_: Engine | None = None, router: ReplicaRouter | None = None
+    ) -> None:
+        if router is None:
+            router = get_replica_router() if engine_ is None else ReplicaRouter(engine_)
+        self._router: ReplicaRouter = router
+        self._engine: Engine = engine_ or router.get_write_engine()
+        self._connection: Connection | None = None
+        self._read_connection: Connection | None = None
+        self._identity_map: dict[tuple[Callable[..., Any], int], Any] = {}
+        self._token: Token[UnitOfWork | None] | None = None
+        self._commit_callbacks: list[Callable[[], None]] = []
+        self._has_written = False
+
+    @property
+    def connection(self) -> Connection:
+        """
+        The connection shared by the unit of work, which factories write
+        through. Checked out from the pool on first use.
+        """
+
+        self._has_written = True
+        return self._connect()
+
+    @property
+    def primary_read_connection(self) -> Connection:
+        """
+        The connection to the primary, for reads a lagging replica must not
+        serve. Using it for reads does not count as writing.
+        """
+
+        return self._connect()
+
+    @property
+    def has_written(self) -> bool:
+        """
+        Whether the unit of work may have written, after which what it reads
+        may not be committed yet and must not be shared, e.g. cached.
+        """
+
+        return self._has_written
+
+    def _connect(self) -> Connection:
+        if self._connection is None:
+            self._connection = self._engine.connect()
+        return self._connection
+
+    @property
+    def read_connection(self) -> Connection:
+        """
+        The connection repository reads are executed on. This is the
+        connection to the primary once the unit of work has written,
+        otherwise a connection to a replica checked out on first use.
+        """
+
+        if self._has_written:
+            return self._connect()
+
+        if self._read_connection is None:
+            read_engine = self._router.get_read_engine()
+            if read_engine is self._engine:
+                return self._connect()
+            self._read_connection = read_engine.connect()
+        return self._read_connection
+
+    def get_entity(self, cls: Callable[..., _E], id_: int) -> _E | None:
+        return cast(_E | None, self._identity_map.get((cls, id_)))
+
+    def add_entity(self, cls: type[Any], id_: int, entity: _E) -> _E:
+        """
+        Adds the entity to the identity map. If an entity with the same
+        identity is already present, that entity is kept and returned instead.
+        """
+
+        return cast(_E, self._identity_map.setdefault((cls, id_), entity))
+
+    def add_commit_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Registers a callback to run once the unit of work has committed.
+        """
+
+        self._commit_callbacks.append(callback)
+
+    def commit(self) -> None:
+        if self._connection is not None:
+            self._connection.commit()
+
+        commit_callbacks, self._commit_callbacks = self._commit_callbacks, []
+        for callback in commit_callbacks:
+            callback()
+
+    def rollback(self) -> None:
+        if self._connection is not None:
+            self._connection.rollback()
+        self._commit_callbacks.clear()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._read_connection is not None:
+            self._read_connection.close()
+            self._read_connection = None
+        self._identity_map.clear()
+        self._has_written = False
+
+    def __enter__(self) -> UnitOfWork:
+        self._token = _current_unit_of_work.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.close()
+            if self._token is not None:
+                _current_unit_of_work.reset(self._token)
+                self._token = None
+
+
+def get_unit_of_work() -> UnitOfWork | None:
+    """
+    Gets the active unit of work, if any.
+    """
+
+    return _current_unit_of_work.get()
+
+
+@contextmanager
+def sql_connection(
+    read_only: bool = False, from_primary: bool = False
+) -> Iterator[Connection]:
+    """
+    Provides the connection repositories and factories should execute
+    statements on. Inside a unit of work this is the unit of work's
+    connection and committing is left to the unit of work. Otherwise a
+    connection is checked out for the duration of the block and committed
+    when the block exits cleanly.
+
+    Repositories pass read_only so their statements may be served from a
+    replica, see ReplicaRouter. Reads that must see what the primary has
+    committed, e.g. to fill a cache shared between requests, also pass
+    from_primary.
+    """
+
+    unit_of_work = get_unit_of_work()
+    if unit_of_work is not None:
+        if not read_only:
+            yield unit_of_work.connection
+        elif from_primary:
+            yield unit_of_work.primary_read_connection
+        else:
+            yield unit_of_work.read_connection
+        return
+
+    if read_only and from_primary:
+        with get_engine().connect() as connection:
+            yield connection
+        return
+
+    if read_only:
+        with get_replica_router().get_read_engine().connect() as connection:
+            yield connection
+        return
+
+    with get_engine().connect() as connection:
+        yield connection
+        connection.commit()
+
+
+@asynccontextmanager
+async def async_transaction() -> AsyncIterator[AsyncConnection]:
+    """
+    Shares a single connection and transaction between every async
+    repository and factory used in the block. The transaction is committed
+    when the block exits cleanly and rolled back otherwise.
+
+    A connection runs one statement at a time, so the statements of the
+    block must be awaited one after the other. Run concurrent lookups before
+    entering the block.
+    """
+
+    async with get_async_engine().connect() as connection:
+        token = _current_async_transaction.set(connection)
+        try:
+            yield connection
+        finally:
+            _current_async_transaction.reset(token)
+        await connection.commit()
+
+
+@asynccontextmanager
+async def async_sql_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    The asyncio counterpart of sql_connection. Inside an async_transaction
+    this is the transaction's connection and committing is left to the
+    transaction. Otherwise a connection is checked out of the async engine
+    for the duration of the block and committed when the block exits
+    cleanly, so lookups that should run concurrently each get their own.
+    """
+
+    transaction_connection = _current_async_transaction.get()
+    if transaction_connection is not None:
+        yield transaction_connection
+        return
+
+    async with get_async_engine().connect() as connection:
+        yield connection
+        await connection.commit()
+
+
+def has_uncommitted_writes() -> bool:
+    """
+    Whether the active unit of work may have written, see
+    UnitOfWork.has_written, or an async_transaction is active.
+    """
+
+    if _current_async_transaction.get() is not None:
+        return True
+    unit_of_work = get_unit_of_work()
+    return unit_of_work is not None and unit_of_work.has_written
+
+
+def get_identity(cls: Callable[..., _E], id_: int) -> _E | None:
+    """
+    Gets an already loaded entity from the active unit of work's identity map.
+    """
+
+    unit_of_work = get_unit_of_work()
+    if unit_of_work is None:
+        return None
+    return unit_of_work.get_entity(cls, id_)
+
+
+def register_identity(cls: type[Any], id_: int, entity: _E) -> _E:
+    """
+    Registers a loaded or created entity with the active unit of work's
+    identity map and returns the entity callers should use.
+    """
+
+    unit_of_work = get_unit_of_work()
+    if unit_of_work is None:
+        return entity
+    return unit_of_work.add_entity(cls, id_, entity)
+
+
+@contextmanager
+def sql_savepoint() -> Iterator[Connection]:
+    """
+    Like sql_connection, but the statements executed within the block are
+    wrapped in a savepoint. If the block fails only its statements are rolled
+    back and the surrounding transaction stays usable.
+    """
+
+    with sql_connection() as connection:
+        with connection.begin_nested():
+            yield connection
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """
+    Runs the callback once the active unit of work commits, or straight away
+    if there is no active unit of work.
+    """
+
+    unit_of_work = get_unit_of_work()
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work.add_commit_callback(callback)
@@ -1,9 +1,9 @@
 from functools import singledispatch
-from typing import Any
+from typing import Any, Iterable
 
-from sqlalchemy import Connection, delete, update, select
+from sqlalchemy import Table, Update, bindparam, update
 
-from .sql import engine
+from .unit_of_work import sql_connection
 from .address import Address, address_table
 from .delivery import Delivery, delivery_table
 from .user import (
@@ -16,87 +16,93 @@ from .user import (
 
 _PERSISTENT_ENTITIES = User | TrialUser | StandardUser | Address | Delivery
 
+_ChangedRows = list[tuple[Table, dict[str, Any]]]
+
+_USER_COLUMNS = ("email", "name", "meals_per_week", "address_id")
+_TRIAL_USER_COLUMNS = ("trial_end_date", "discount_value")
+
 
 def update_sql_entities(*entities: _PERSISTENT_ENTITIES) -> None:
+    """
+    Writes the modified columns of the provided entities. Updates of the same
+    columns of a table are sent as a single executemany batch and every batch
+    is written in the same transaction. Entities without changes are skipped.
+    """
+
+    batches: dict[tuple[Table, tuple[str, ...]], list[dict[str, Any]]] = {}
+
+    for entity in entities:
+        for table, values in _get_changed_rows(entity):
+            columns = tuple(sorted(values))
+            batches.setdefault((table, columns), []).append(
+                {"entity_id": entity.id}
+                | {f"new_{column}": values[column] for column in columns}
+            )
+
+    if batches:
+        with sql_connection() as connection:
+            for (table, columns), parameters in batches.items():
+                connection.execute(_update_statement(table, columns), parameters)
+
+    for entity in entities:
+        entity.mark_clean()
+
+
+def _update_statement(table: Table, columns: tuple[str, ...]) -> Update:
+    return (
+        update(table)
+        .where(table.c.id == bindparam("entity_id"))
+        .values({column: bindparam(f"new_{column}") for column in columns})
+    )
+
+
+def _changed_values(entity: Any, columns: Iterable[str]) -> dict[str, Any]:
+    changed_attributes = entity.get_changed_attributes()
+    return {
+        column: getattr(entity, column)
+        for column in columns
+        if column in changed_attributes
+    }
+
 
-    with engine.connect() as connection:
-        for entity in entities:
-            _prepare_entity_for_update(entity, connection)
+def _non_empty(*rows: tuple[Table, dict[str, Any]]) -> _ChangedRows:
+    return [(table, values) for table, values in rows if values]
 
 
 @singledispatch
-def _prepare_entity_for_update(entity: Any, connection: Connection) -> None:
+def _get_changed_rows(entity: Any) -> _ChangedRows:
     raise ValueError(f"No update register for {type(entity).__name__}")
 
 
-@_prepare_entity_for_update.register
-def _(entity: Address, connection: Connection) -> None:
+@_get_changed_rows.register
+def _(entity: Address) -> _ChangedRows:
 
-    update_base_statement = (
-        update(address_table)
-        .where(address_table.c.id == entity.id)
-        .values(
-            unit=entity.unit,
-            street_name=entity.street_name,
-            suburb=entity.suburb,
-            postcode=entity.postcode,
+    return _non_empty(
+        (
+            address_table,
+            _changed_values(entity, ("unit", "street_name", "suburb", "postcode")),
         )
     )
-    connection.execute(update_base_statement)
 
 
-@_prepare_entity_for_update.register
-def _(entity: Delivery, connection: Connection) -> None:
+@_get_changed_rows.register
+def _(entity: Delivery) -> _ChangedRows:
 
-    update_statement = (
-        update(delivery_table)
-        .where(delivery_table.c.id == entity.id)
-        .values(
-            user_id=entity.user_id,
-            address_id=entity.address_id,
-            total=entity.total,
-        )
+    return _non_empty(
+        (delivery_table, _changed_values(entity, ("user_id", "address_id", "total")))
     )
-    connection.execute(update_statement)
 
 
-@_prepare_entity_for_update.register
-def _(entity: TrialUser, connection: Connection) -> None:
+@_get_changed_rows.register
+def _(entity: TrialUser) -> _ChangedRows:
 
-    update_base_statement = (
-        update(user_table)
-        .where(user_table.c.id == entity.id)
-        .values(
-            email=entity.email,
-            name=entity.name,
-            meals_per_week=entity.meals_per_week,
-            address_id=entity.address_id,
-        )
-    )
-    connection.execute(update_base_statement)
-
-    update_child_statement = (
-        update(trial_user_table)
-        .where(trial_user_table.c.id == entity.id)
-        .values(
-            trial_end_date=entity.trial_end_date,
-            discount_value=entity.discount_value,
-        )
+    return _non_empty(
+        (user_table, _changed_values(entity, _USER_COLUMNS)),
+        (trial_user_table, _changed_values(entity, _TRIAL_USER_COLUMNS)),
     )
-    connection.execute(update_child_statement)
 
 
-@_prepare_entity_for_update.register
-def _(entity: StandardUser, connection: Connection) -> None:
+@_get_changed_rows.register
+def _(entity: StandardUser) -> _ChangedRows:
 
-    update_base_statement = (
-        update(user_table)
-        .where(user_table.c.id == entity.id)
-        .values(
-            email=entity.email,
-            name=entity.name,
-            meals_per_week=entity.meals_per_week,
-            address_id=entity.address_id,
-        )
-    )
-    connection.execute(update_base_statement)
+    return _non_empty((user_table, _changed_values(entity, _USER_COLUMNS)))
@@ -5,6 +5,7 @@ from .model import User
 from .model import StandardUser
 from .model import TrialUser
 from .repository import get_user_repository
+from .repository import get_async_user_repository
 from .repository import get_trial_user_repository
 from .repository import get_standard_user_repository
 from .factory import get_trial_user_factory
@@ -1,17 +1,43 @@
 from abc import ABC, abstractmethod
-from typing import override, Any, Mapping
+from typing import override, Any, Mapping, Sequence
 
-from sqlalchemy import insert
+from sqlalchemy import insert, Insert
 
 from .model import User, TrialUser, StandardUser
 from ..address import Address, get_address_factory
-from .orm import user_table, trial_user_table, standard_user_table
+from .orm import (
+    user_table,
+    trial_user_table,
+    standard_user_table,
+    TRIAL_USER_TYPE,
+    STANDARD_USER_TYPE,
+)
 from ..log import Identified
-from ..sql import engine
-from ..mixins import JsonFactory
+from ..mixins import BulkJsonFactory
+from ..statements import registered_statement
+from ..unit_of_work import sql_connection, sql_savepoint, register_identity
+from ..validation import Field
 
+_TrialUserValues = tuple[str, str, int, int, float, int]
+_StandardUserValues = tuple[str, str, int, int]
 
-class TrialUserFactory(JsonFactory[TrialUser], ABC):
+
+@registered_statement
+def _insert_user() -> Insert:
+    return insert(user_table).returning(user_table.c.id, sort_by_parameter_order=True)
+
+
+@registered_statement
+def _insert_trial_user() -> Insert:
+    return insert(trial_user_table)
+
+
+@registered_statement
+def _insert_standard_user() -> Insert:
+    return insert(standard_user_table)
+
+
+class TrialUserFactory(BulkJsonFactory[TrialUser], ABC):
     """
     Provides an interface to create new users and commit them to the persistent
     layer.
@@ -40,6 +66,15 @@ class TrialUserSqlFactory(TrialUserFactory, Identified):
     layer.
     """
 
+    _schema = (
+        Field("email", str),
+        Field("name", str),
+        Field("meals_per_week", int),
+        Field("trial_end_date", int),
+        Field("discount_value", float),
+        Field("address_id", int),
+    )
+
     @override
     @classmethod
     def create_from_values(
@@ -72,42 +107,105 @@ class TrialUserSqlFactory(TrialUserFactory, Identified):
         is often best. pg 103
         """
 
-        User.assert_valid_base_user_values(email, name, meals_per_week)
-        TrialUser.assert_trial_end_date_is_unix_time_epoch(trial_end_date)
-        TrialUser.assert_discount_is_decimal_value(discount_value)
+        cls._assert_valid_values(
+            email, name, meals_per_week, trial_end_date, discount_value, address_id
+        )
 
-        with engine.connect() as connection:
-            user_statement = (
-                insert(user_table)
-                .values(
-                    email=email,
-                    name=name,
-                    meals_per_week=meals_per_week,
-                    address_id=address_id,
-                    type="trial_user",
-                )
-                .returning(user_table.c.id)
+        with sql_connection() as connection:
+            user_id = connection.execute(
+                _insert_user(),
+                {
+                    "email": email,
+                    "name": name,
+                    "meals_per_week": meals_per_week,
+                    "address_id": address_id,
+                    "type": TRIAL_USER_TYPE,
+                },
+            ).scalar_one()
+            connection.execute(
+                _insert_trial_user(),
+                {
+                    "id": user_id,
+                    "trial_end_date": trial_end_date,
+                    "discount_value": discount_value,
+                },
             )
-            user_id = connection.execute(user_statement).scalar_one()
-            trial_user_statement = insert(trial_user_table).values(
-                id=user_id,
-                trial_end_date=trial_end_date,
-                discount_value=discount_value,
+
+        trial_user = TrialUser(
+            user_id,
+            email,
+            name,
+            meals_per_week,
+            trial_end_date,
+            discount_value,
+            address_id,
+        )
+
+        return register_identity(User, user_id, trial_user)
+
+    @override
+    @classmethod
+    def create_many_from_values(
+        cls, values: Sequence[_TrialUserValues]
+    ) -> list[TrialUser]:
+        """
+        Creates many trial users with multi-row inserts.
+        """
+
+        for trial_user_values in values:
+            cls._assert_valid_values(*trial_user_values)
+
+        with sql_savepoint() as connection:
+            user_ids = (
+                connection.execute(
+                    _insert_user(),
+                    [
+                        {
+                            "email": email,
+                            "name": name,
+                            "meals_per_week": meals_per_week,
+                            "address_id": address_id,
+                            "type": TRIAL_USER_TYPE,
+                        }
+                        for email, name, meals_per_week, _, _, address_id in values
+                    ],
+                )
+                .scalars()
+                .all()
             )
-            connection.execute(trial_user_statement)
-            connection.commit()
-
-            trial_user = TrialUser(
-                user_id,
-                email,
-                name,
-                meals_per_week,
-                trial_end_date,
-                discount_value,
-                address_id,
+            connection.execute(
+                _insert_trial_user(),
+                [
+                    {
+                        "id": user_id,
+                        "trial_end_date": trial_end_date,
+                        "discount_value": discount_value,
+                    }
+                    for user_id, (_, _, _, trial_end_date, discount_value, _) in zip(
+                        user_ids, values
+                    )
+                ],
             )
 
-        return trial_user
+        return [
+            register_identity(User, user_id, TrialUser(user_id, *trial_user_values))
+            for user_id, trial_user_values in zip(user_ids, values)
+        ]
+
+    @override
+    @classmethod
+    def _assert_valid_values(
+        cls,
+        email: str,
+        name: str,
+        meals_per_week: int,
+        trial_end_date: int,
+        discount_value: float,
+        address_id: int,
+    ) -> None:
+        User.assert_valid_base_user_values(email, name, meals_per_week)
+        TrialUser.assert_trial_end_date_is_unix_time_epoch(trial_end_date)
+        TrialUser.assert_discount_is_decimal_value(discount_value)
 
     @override
     @classmethod
@@ -116,19 +214,10 @@ class TrialUserSqlFactory(TrialUserFactory, Identified):
         Creates a new user from a json representation of the user.
         """
 
-        address_id = cls._parse_int_from_json(json_as_dict, "address_id")
-        email = cls._parse_str_from_json(json_as_dict, "email")
-        name = cls._parse_str_from_json(json_as_dict, "name")
-        meals_per_week = cls._parse_int_from_json(json_as_dict, "meals_per_week")
-        trial_end_date = cls._parse_int_from_json(json_as_dict, "trial_end_date")
-        discount_value = cls._parse_float_from_json(json_as_dict, "discount_value")
-
-        return cls.create_from_values(
-            email, name, meals_per_week, trial_end_date, discount_value, address_id
-        )
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
 
 
-class StandardUserFactory(JsonFactory[StandardUser], ABC):
+class StandardUserFactory(BulkJsonFactory[StandardUser], ABC):
     """
     Provides an interface to create new users and commit them to the persistent
     layer.
@@ -155,6 +244,13 @@ class StandardUserSqlFactory(StandardUserFactory, Identified):
     layer.
     """
 
+    _schema = (
+        Field("email", str),
+        Field("name", str),
+        Field("meals_per_week", int),
+        Field("address_id", int),
+    )
+
     @override
     @classmethod
     def create_from_values(
@@ -165,36 +261,79 @@ class StandardUserSqlFactory(StandardUserFactory, Identified):
         address_id: int,
     ) -> StandardUser:
 
-        User.assert_valid_base_user_values(email, name, meals_per_week)
+        cls._assert_valid_values(email, name, meals_per_week, address_id)
+
+        with sql_connection() as connection:
+            user_id = connection.execute(
+                _insert_user(),
+                {
+                    "email": email,
+                    "name": name,
+                    "meals_per_week": meals_per_week,
+                    "address_id": address_id,
+                    "type": STANDARD_USER_TYPE,
+                },
+            ).scalar_one()
+            connection.execute(_insert_standard_user(), {"id": user_id})
+
+        standard_user = StandardUser(
+            user_id,
+            email,
+            name,
+            meals_per_week,
+            address_id,
+        )
 
-        with engine.connect() as connection:
-            user_statement = (
-                insert(user_table)
-                .values(
-                    email=email,
-                    name=name,
-                    meals_per_week=meals_per_week,
-                    address_id=address_id,
-                    type="standard_user",
+        return register_identity(User, user_id, standard_user)
+
+    @override
+    @classmethod
+    def create_many_from_values(
+        cls, values: Sequence[_StandardUserValues]
+    ) -> list[StandardUser]:
+        """
+        Creates many standard users with multi-row inserts.
+        """
+
+        for standard_user_values in values:
+            cls._assert_valid_values(*standard_user_values)
+
+        with sql_savepoint() as connection:
+            user_ids = (
+                connection.execute(
+                    _insert_user(),
+                    [
+                        {
+                            "email": email,
+                            "name": name,
+                            "meals_per_week": meals_per_week,
+                            "address_id": address_id,
+                            "type": STANDARD_USER_TYPE,
+                        }
+                        for email, name, meals_per_week, address_id in values
+                    ],
                 )
-                .returning(user_table.c.id)
+                .scalars()
+                .all()
             )
-            user_id = connection.execute(user_statement).scalar_one()
-            standard_user_statement = insert(standard_user_table).values(
-                id=user_id,
+            connection.execute(
+                _insert_standard_user(),
+                [{"id": user_id} for user_id in user_ids],
             )
-            connection.execute(standard_user_statement)
-            connection.commit()
-
-            standard_user = StandardUser(
-                user_id,
-                email,
-                name,
-                meals_per_week,
-                address_id,
+
+        return [
+            register_identity(
+                User, user_id, StandardUser(user_id, *standard_user_values)
             )
+            for user_id, standard_user_values in zip(user_ids, values)
+        ]
 
-        return standard_user
+    @override
+    @classmethod
+    def _assert_valid_values(
+        cls, email: str, name: str, meals_per_week: int, address_id: int
+    ) -> None:
+        User.assert_valid_base_user_values(email, name, meals_per_week)
 
     @override
     @classmethod
@@ -203,12 +342,7 @@ class StandardUserSqlFactory(StandardUserFactory, Identified):
         Creates a new standard user from a json representation of the user.
         """
 
-        address_id = cls._parse_int_from_json(json_as_dict, "address_id")
-        email = cls._parse_str_from_json(json_as_dict, "email")
-        name = cls._parse_str_from_json(json_as_dict, "name")
-        meals_per_week = cls._parse_int_from_json(json_as_dict, "meals_per_week")
-
-        return cls.create_from_values(email, name, meals_per_week, address_id)
+        return cls.create_from_values(*cls._parse_values_from_json(json_as_dict))
 
 
 def get_trial_user_factory() -> TrialUserFactory:
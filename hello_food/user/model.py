@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
 from typing import override
 
+from ..mixins import ChangeTracked
 from ..util import get_current_unix_epoch
 
 
-class User(ABC):
+class User(ChangeTracked, ABC):
+
+    __slots__ = ("id", "email", "name", "meals_per_week", "address_id")
 
     def __init__(
         self, id_: int, email: str, name: str, meals_per_week: int, address_id: int
@@ -15,6 +18,7 @@ class User(ABC):
         self.name: str = name
         self.meals_per_week: int = meals_per_week
         self.address_id: int = address_id
+        self.mark_clean()
 
     @classmethod
     def assert_email_has_valid_format(cls, email: str) -> None:
@@ -43,6 +47,8 @@ class User(ABC):
 
 class TrialUser(User):
 
+    __slots__ = ("trial_end_date", "discount_value")
+
     def __init__(
         self,
         id_: int,
@@ -56,6 +62,7 @@ class TrialUser(User):
         super().__init__(id_, email, name, meals_per_week, address_id)
         self.trial_end_date = trial_end_date
         self.discount_value = discount_value
+        self.mark_clean()
 
     @classmethod
     def assert_trial_end_date_is_unix_time_epoch(cls, trial_end_date: int) -> None:
@@ -82,6 +89,8 @@ class TrialUser(User):
 
 class StandardUser(User):
 
+    __slots__ = ()
+
     def __init__(
         self,
         id_: int,
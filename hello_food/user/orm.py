@@ -1,6 +1,12 @@
-from sqlalchemy import Table, Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, String, Float, ForeignKey
 
-from ..sql import metadata
+from ..sql import metadata, created_column
+
+"""
+Values of the User.type discriminator column.
+"""
+TRIAL_USER_TYPE = "trial_user"
+STANDARD_USER_TYPE = "standard_user"
 
 user_table = Table(
     "User",
@@ -11,8 +17,11 @@ user_table = Table(
     Column("meals_per_week", Integer, nullable=True),
     Column("address_id", Integer, ForeignKey("Address.id"), nullable=True),
     Column("type", String, nullable=True),
+    created_column(),
 )
 
+Index("ix_user_created_id", user_table.c.created, user_table.c.id)
+
 trial_user_table = Table(
     "TrialUser",
     metadata,
@@ -1,12 +1,122 @@
 from abc import ABC, abstractmethod
-from typing import override, Any
+from typing import override, Any, Mapping
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, Row, Select
 
 from .model import User, TrialUser, StandardUser
-from .orm import user_table, trial_user_table, standard_user_table
+from .orm import (
+    user_table,
+    trial_user_table,
+    standard_user_table,
+    TRIAL_USER_TYPE,
+    STANDARD_USER_TYPE,
+)
 from ..log import Identified
-from ..sql import engine
+from ..pagination import (
+    Page,
+    clamp_page_size,
+    newest_first_parameters,
+    order_newest_first,
+    split_newest_first_rows,
+)
+from ..statements import registered_statement
+from ..unit_of_work import (
+    async_sql_connection,
+    sql_connection,
+    get_identity,
+    register_identity,
+)
+
+
+def select_polymorphic_user() -> Select[tuple[Any, ...]]:
+    """
+    Selects users together with the columns of every user subtype, so the
+    right subclass of User can be built from a single round trip.
+    """
+
+    return select(
+        user_table,
+        trial_user_table.c.id.label("trial_user_id"),
+        trial_user_table.c.trial_end_date,
+        trial_user_table.c.discount_value,
+        standard_user_table.c.id.label("standard_user_id"),
+    ).select_from(
+        user_table.outerjoin(
+            trial_user_table, trial_user_table.c.id == user_table.c.id
+        ).outerjoin(standard_user_table, standard_user_table.c.id == user_table.c.id)
+    )
+
+
+def user_from_polymorphic_row(user_row: Row[Any]) -> User | None:
+    """
+    Builds the subclass of User named by the type discriminator of a row
+    selected by select_polymorphic_user. Returns None if the row of the
+    subtype table is missing.
+    """
+
+    if user_row.type == TRIAL_USER_TYPE and user_row.trial_user_id is not None:
+        return TrialUser(
+            user_row.id,
+            user_row.email,
+            user_row.name,
+            user_row.meals_per_week,
+            user_row.trial_end_date,
+            user_row.discount_value,
+            user_row.address_id,
+        )
+
+    if user_row.type == STANDARD_USER_TYPE and user_row.standard_user_id is not None:
+        return StandardUser(
+            user_row.id,
+            user_row.email,
+            user_row.name,
+            user_row.meals_per_week,
+            user_row.address_id,
+        )
+
+    return None
+
+
+@registered_statement
+def _select_user_from_id() -> Select[tuple[Any, ...]]:
+    return select_polymorphic_user().where(user_table.c.id == bindparam("id"))
+
+
+@registered_statement
+def _select_user_from_email() -> Select[tuple[Any, ...]]:
+    return select_polymorphic_user().where(user_table.c.email == bindparam("email"))
+
+
+@registered_statement
+def _select_typed_user_from_id() -> Select[tuple[Any, ...]]:
+    return _select_user_from_id().where(user_table.c.type == bindparam("type"))
+
+
+@registered_statement
+def _select_typed_user_from_email() -> Select[tuple[Any, ...]]:
+    return _select_user_from_email().where(user_table.c.type == bindparam("type"))
+
+
+@registered_statement
+def _select_user_page(has_cursor: bool) -> Select[tuple[Any, ...]]:
+    return order_newest_first(select_polymorphic_user(), user_table, has_cursor)
+
+
+def _get_user_from_sqlalchemy_statement(
+    statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
+) -> User | None:
+
+    with sql_connection(read_only=True) as conn:
+        user_row = conn.execute(statement, parameters).one_or_none()
+
+    if user_row is None:
+        return None
+
+    user = user_from_polymorphic_row(user_row)
+    if user is None:
+        return None
+
+    return register_identity(User, user.id, user)
 
 
 class TrialUserRepository(ABC):
@@ -34,39 +144,30 @@ class TrialUserSqlRepository(TrialUserRepository, Identified):
     layer. See pg 88
     """
 
+    @classmethod
+    def _get_from_sqlalchemy_statement(
+        cls, statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
+    ) -> TrialUser | None:
+
+        user = _get_user_from_sqlalchemy_statement(
+            statement, {**parameters, "type": TRIAL_USER_TYPE}
+        )
+        return user if isinstance(user, TrialUser) else None
+
     @classmethod
     @override
-    def get_from_id(self, id: int) -> TrialUser | None:
+    def get_from_id(cls, id: int) -> TrialUser | None:
         """
         Gets a user from the persistent layer from the user's id.
         """
 
-        with engine.connect() as conn:
-            user_table_statement = select(user_table).where(user_table.c.id == id)
-            user_orm = conn.execute(user_table_statement).one_or_none()
-
-            if user_orm is None:
-                return None
+        user = get_identity(User, id)
+        if user is not None:
+            return user if isinstance(user, TrialUser) else None
 
-            trial_user_table_statement = select(trial_user_table).where(
-                trial_user_table.c.id == user_orm.id
-            )
-            trial_user_orm = conn.execute(trial_user_table_statement).one_or_none()
-
-            if trial_user_orm is None:
-                return None
-
-            trial_user = TrialUser(
-                user_orm.id,
-                user_orm.email,
-                user_orm.name,
-                user_orm.meals_per_week,
-                trial_user_orm.trial_end_date,
-                trial_user_orm.discount_value,
-                user_orm.address_id,
-            )
-
-        return trial_user
+        return cls._get_from_sqlalchemy_statement(
+            _select_typed_user_from_id(), {"id": id}
+        )
 
     @override
     @classmethod
@@ -75,32 +176,9 @@ class TrialUserSqlRepository(TrialUserRepository, Identified):
         Gets a user from the persistent layer from the user's email.
         """
 
-        with engine.connect() as conn:
-            user_table_statement = select(user_table).where(user_table.c.email == email)
-            user_orm = conn.execute(user_table_statement).one_or_none()
-
-            if user_orm is None:
-                return None
-
-            trial_user_table_statement = select(trial_user_table).where(
-                trial_user_table.c.id == user_orm.id
-            )
-            trial_user_orm = conn.execute(trial_user_table_statement).one_or_none()
-
-            if trial_user_orm is None:
-                return None
-
-            trial_user = TrialUser(
-                user_orm.id,
-                user_orm.email,
-                user_orm.name,
-                user_orm.meals_per_week,
-                trial_user_orm.trial_end_date,
-                trial_user_orm.discount_value,
-                user_orm.address_id,
-            )
-
-        return trial_user
+        return cls._get_from_sqlalchemy_statement(
+            _select_typed_user_from_email(), {"email": email}
+        )
 
 
 class StandardUserRepository(ABC):
@@ -128,39 +206,30 @@ class StandardUserSqlRepository(StandardUserRepository, Identified):
     layer. See pg 88
     """
 
+    @classmethod
+    def _get_from_sqlalchemy_statement(
+        cls, statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
+    ) -> StandardUser | None:
+
+        user = _get_user_from_sqlalchemy_statement(
+            statement, {**parameters, "type": STANDARD_USER_TYPE}
+        )
+        return user if isinstance(user, StandardUser) else None
+
     @classmethod
     @override
-    def get_from_id(self, id: int) -> StandardUser | None:
+    def get_from_id(cls, id: int) -> StandardUser | None:
         """
         Gets a user from the persistent layer from the user's id.
         """
 
-        with engine.connect() as conn:
-            user_table_statement = select(user_table).where(user_table.c.id == id)
-            user_orm = conn.execute(user_table_statement).one_or_none()
+        user = get_identity(User, id)
+        if user is not None:
+            return user if isinstance(user, StandardUser) else None
 
-            if user_orm is None:
-                return None
-
-            standard_user_table_statement = select(standard_user_table).where(
-                standard_user_table.c.id == user_orm.id
-            )
-            standard_user_orm = conn.execute(
-                standard_user_table_statement
-            ).one_or_none()
-
-            if standard_user_orm is None:
-                return None
-
-            standard_user = StandardUser(
-                user_orm.id,
-                user_orm.email,
-                user_orm.name,
-                user_orm.meals_per_week,
-                user_orm.address_id,
-            )
-
-        return standard_user
+        return cls._get_from_sqlalchemy_statement(
+            _select_typed_user_from_id(), {"id": id}
+        )
 
     @override
     @classmethod
@@ -169,32 +238,9 @@ class StandardUserSqlRepository(StandardUserRepository, Identified):
         Gets a user from the persistent layer from the user's email.
         """
 
-        with engine.connect() as conn:
-            user_table_statement = select(user_table).where(user_table.c.email == email)
-            user_orm = conn.execute(user_table_statement).one_or_none()
-
-            if user_orm is None:
-                return None
-
-            standard_user_table_statement = select(standard_user_table).where(
-                standard_user_table.c.id == user_orm.id
-            )
-            standard_user_orm = conn.execute(
-                standard_user_table_statement
-            ).one_or_none()
-
-            if standard_user_orm is None:
-                return None
-
-            standard_user = StandardUser(
-                user_orm.id,
-                user_orm.email,
-                user_orm.name,
-                user_orm.meals_per_week,
-                user_orm.address_id,
-            )
-
-        return standard_user
+        return cls._get_from_sqlalchemy_statement(
+            _select_typed_user_from_email(), {"email": email}
+        )
 
 
 class UserRepository(ABC):
@@ -217,26 +263,110 @@ class UserRepository(ABC):
         """
         ...
 
+    @classmethod
+    @abstractmethod
+    def get_page(
+        cls, cursor: str | None = None, limit: int | None = None
+    ) -> Page[User]:
+        """
+        Gets a page of users of any type newest first. Pass the next_cursor
+        of a page to get the page after it.
+        """
+        ...
+
 
 class UserSqlRepository(UserRepository, Identified):
+    """
+    Reconstitutes users of any type with a single query, using the type
+    discriminator of the User table to pick the subclass.
+    """
 
     @override
     @classmethod
-    def get_from_id(self, id: int) -> User | None:
-        trial_user_repository = TrialUserSqlRepository()
-        standard_user_repository = StandardUserSqlRepository()
-        return trial_user_repository.get_from_id(
-            id
-        ) or standard_user_repository.get_from_id(id)
+    def get_from_id(cls, id: int) -> User | None:
+
+        user = get_identity(User, id)
+        if user is not None:
+            return user
+
+        return _get_user_from_sqlalchemy_statement(_select_user_from_id(), {"id": id})
 
     @override
     @classmethod
-    def get_from_email(self, email: str) -> User | None:
-        trial_user_repository = TrialUserSqlRepository()
-        standard_user_repository = StandardUserSqlRepository()
-        return trial_user_repository.get_from_email(
-            email
-        ) or standard_user_repository.get_from_email(email)
+    def get_from_email(cls, email: str) -> User | None:
+
+        return _get_user_from_sqlalchemy_statement(
+            _select_user_from_email(), {"email": email}
+        )
+
+    @override
+    @classmethod
+    def get_page(
+        cls, cursor: str | None = None, limit: int | None = None
+    ) -> Page[User]:
+
+        limit = clamp_page_size(limit)
+        with sql_connection(read_only=True) as conn:
+            user_rows, next_cursor = split_newest_first_rows(
+                conn.execute(
+                    _select_user_page(cursor is not None),
+                    newest_first_parameters(cursor, limit),
+                ).all(),
+                limit,
+            )
+
+        users: list[User] = []
+        for user_row in user_rows:
+            # Users missing the row of their subtype table are skipped, as
+            # they are by the lookups by id.
+            user = user_from_polymorphic_row(user_row)
+            if user is not None:
+                users.append(register_identity(User, user.id, user))
+
+        return Page(users, next_cursor)
+
+
+class AsyncUserRepository(ABC):
+    """
+    The asyncio counterpart of UserRepository.
+    """
+
+    @classmethod
+    @abstractmethod
+    async def get_from_id(self, id: int) -> User | None: ...
+
+    @classmethod
+    @abstractmethod
+    async def get_from_email(self, email: str) -> User | None: ...
+
+
+class AsyncUserSqlRepository(AsyncUserRepository):
+
+    @classmethod
+    async def _get_from_sqlalchemy_statement(
+        cls, statement: Select[tuple[Any, ...]], parameters: Mapping[str, Any]
+    ) -> User | None:
+
+        async with async_sql_connection() as conn:
+            user_row = (await conn.execute(statement, parameters)).one_or_none()
+
+        return None if user_row is None else user_from_polymorphic_row(user_row)
+
+    @override
+    @classmethod
+    async def get_from_id(cls, id: int) -> User | None:
+
+        return await cls._get_from_sqlalchemy_statement(
+            _select_user_from_id(), {"id": id}
+        )
+
+    @override
+    @classmethod
+    async def get_from_email(cls, email: str) -> User | None:
+
+        return await cls._get_from_sqlalchemy_statement(
+            _select_user_from_email(), {"email": email}
+        )
 
 
 def get_trial_user_repository() -> TrialUserRepository:
@@ -249,3 +379,7 @@ def get_standard_user_repository() -> StandardUserRepository:
 
 def get_user_repository() -> UserRepository:
     return UserSqlRepository()
+
+
+def get_async_user_repository() -> AsyncUserRepository:
+    return AsyncUserSqlRepository()
@@ -46,3 +46,21 @@ def parse_float_from_json(
 
 def parse_str_from_json(json_as_dict: Mapping[str, Any], attribute_name: str) -> str:
     return parse_value_from_json(json_as_dict, attribute_name, str)
+
+
+def parse_list_from_json(
+    json_as_dict: Mapping[str, Any], attribute_name: str
+) -> list[Any]:
+    value = get_attribute_from_json(json_as_dict, attribute_name)
+    if not isinstance(value, list):
+        message = "Could not convert attribute %s as list" % (attribute_name,)
+        raise ValueError(message)
+    return value
+
+
+def parse_optional_value_from_json(
+    json_as_dict: Mapping[str, Any], attribute_name: str, type_: type[_T]
+) -> _T | None:
+    if json_as_dict.get(attribute_name) is None:
+        return None
+    return parse_value_from_json(json_as_dict, attribute_name, type_)
@@ -0,0 +1,185 @@
+"""
+Compiled validation of the JSON representations of entities.
+
+A factory declares the fields of the JSON object it creates an entity from
+as a schema, which is compiled once into a Python function that parses a
+whole object, or an array of objects, in a single pass with the attribute
+lookups and conversions inlined. The errors are those of the field by field
+parsing of JsonFactory: a missing attribute raises a KeyError and a value
+that cannot be converted a ValueError naming the attribute, the type and
+the factory. Every field is parsed before raising, so an object with
+several invalid fields raises a ValidationError listing all of them.
+"""
+
+from typing import Any, Callable, Final, Mapping, NamedTuple, Sequence
+
+MISSING_ATTRIBUTE: Final[str] = "Could not find attribute %s from provided JSON dict"
+CONVERT_FAILURE: Final[str] = "Could not convert attribute %s as %s for class %s"
+
+
+class Field(NamedTuple):
+    """
+    An attribute converted with type_, one of int, float and str.
+    """
+
+    name: str
+    type_: type
+
+
+class ListField(NamedTuple):
+    """
+    An attribute holding an array of objects, each parsed into a tuple of
+    its item_fields.
+    """
+
+    name: str
+    item_fields: tuple[Field, ...]
+
+
+"""
+The fields of a JSON object in the order of the values they are parsed into.
+"""
+Schema = tuple[Field | ListField, ...]
+
+ValidationResult = tuple[tuple[Any, ...] | None, Exception | None]
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, KeyError) and error.args:
+        # str() of a KeyError is the repr of its key
+        return str(error.args[0])
+    return str(getattr(error, "orig", None) or error) or type(error).__name__
+
+
+class ValidationError(ValueError):
+    """
+    Raised for a JSON object with more than one invalid field. A single
+    invalid field raises its own error.
+    """
+
+    def __init__(self, errors: Sequence[Exception]) -> None:
+        super().__init__("; ".join(describe_error(error) for error in errors))
+        self.errors: tuple[Exception, ...] = tuple(errors)
+
+
+def _to_error(errors: list[Exception]) -> Exception:
+    return errors[0] if len(errors) == 1 else ValidationError(errors)
+
+
+class Validator(NamedTuple):
+    """
+    validate parses the values of a JSON object, raising for an invalid
+    one. validate_many parses an array of objects and returns, for each of
+    them, either its values or its error.
+    """
+
+    validate: Callable[[Mapping[str, Any]], tuple[Any, ...]]
+    validate_many: Callable[[Sequence[Any]], list[ValidationResult]]
+
+
+def _indent(lines: list[str], depth: int) -> list[str]:
+    return ["    " * depth + line for line in lines]
+
+
+def _compile_field(
+    field: Field, source: str, target: str, owner: str, namespace: dict[str, Any]
+) -> list[str]:
+    type_name = f"_type_{target}"
+    namespace[type_name] = field.type_
+    namespace[f"_missing_{target}"] = MISSING_ATTRIBUTE % (field.name,)
+    namespace[f"_convert_{target}"] = CONVERT_FAILURE % (
+        field.name,
+        field.type_.__name__,
+        owner,
+    )
+
+    return [
+        "try:",
+        f"    {target} = {source}[{field.name!r}]",
+        "except KeyError:",
+        f"    errors.append(KeyError(_missing_{target}))",
+        f"    {target} = None",
+        "else:",
+        "    try:",
+        f"        {target} = {type_name}({target})",
+        "    except ValueError:",
+        f"        errors.append(ValueError(_convert_{target}))",
+        "    except TypeError as e:",
+        "        errors.append(e)",
+    ]
+
+
+def _compile_list_field(
+    field: ListField, source: str, target: str, owner: str, namespace: dict[str, Any]
+) -> list[str]:
+    namespace[f"_not_list_{target}"] = f"{field.name} must be a list of objects"
+
+    item_targets = [f"{target}_{index}" for index in range(len(field.item_fields))]
+    item_lines: list[str] = []
+    for item_field, item_target in zip(field.item_fields, item_targets):
+        item_lines += _compile_field(
+            item_field, f"{target}_item", item_target, owner, namespace
+        )
+
+    return [
+        f"{target} = {source}.get({field.name!r})",
+        f"if not isinstance({target}, list):",
+        f"    errors.append(AssertionError(_not_list_{target}))",
+        "else:",
+        f"    {target}_items = {target}",
+        f"    {target} = []",
+        f"    for {target}_item in {target}_items:",
+        f"        if not isinstance({target}_item, dict):",
+        f"            errors.append(AssertionError(_not_list_{target}))",
+        "            continue",
+        *_indent(item_lines, 2),
+        f"        {target}.append(({', '.join(item_targets)},))",
+    ]
+
+
+def compile_schema(schema: Schema, owner: str) -> Validator:
+    """
+    Compiles the validator of a schema. owner names the class the values
+    are parsed for in conversion errors.
+    """
+
+    namespace: dict[str, Any] = {"Mapping": Mapping, "_to_error": _to_error}
+    targets = [f"value_{index}" for index in range(len(schema))]
+
+    field_lines: list[str] = []
+    for field, target in zip(schema, targets):
+        if isinstance(field, ListField):
+            field_lines += _compile_list_field(field, "item", target, owner, namespace)
+        else:
+            field_lines += _compile_field(field, "item", target, owner, namespace)
+    values = f"({', '.join(targets)},)"
+
+    source = "\n".join(
+        [
+            "def validate(item):",
+            "    errors = []",
+            *_indent(field_lines, 1),
+            "    if errors:",
+            "        raise _to_error(errors)",
+            f"    return {values}",
+            "",
+            "def validate_many(items):",
+            "    results = []",
+            "    append = results.append",
+            "    for index, item in enumerate(items):",
+            "        if not isinstance(item, Mapping):",
+            "            append((None, ValueError(_not_object % (index,))))",
+            "            continue",
+            "        errors = []",
+            *_indent(field_lines, 2),
+            "        if errors:",
+            "            append((None, _to_error(errors)))",
+            "        else:",
+            f"            append(({values}, None))",
+            "    return results",
+        ]
+    )
+    namespace["_not_object"] = "Item %d is not a JSON object"
+
+    exec(compile(source, f"<validator of {owner}>", "exec"), namespace)
+    return Validator(namespace["validate"], namespace["validate_many"])
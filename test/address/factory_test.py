@@ -99,3 +99,53 @@ class TestAddressFactory:
         assert address_orm.street_name == assigned_street_name
         assert address_orm.suburb == assigned_suburb
         assert address_orm.postcode == assigned_postcode
+
+    def test_create_many_from_json_reports_each_item(self, db_engine):
+        address_factory = get_address_factory()
+
+        results = address_factory.create_many_from_json(
+            [
+                {
+                    "unit": "Unit 18",
+                    "street_name": "Wattle",
+                    "suburb": "Cannon Hill",
+                    "postcode": 4170,
+                },
+                {
+                    "unit": "Unit 19",
+                    "street_name": "Wattle",
+                    "suburb": "Cannon Hill",
+                    "postcode": 100_000,
+                },
+                {"unit": "Unit 20", "street_name": "Wattle", "postcode": 4170},
+                {
+                    "unit": "Unit 21",
+                    "street_name": "Green",
+                    "suburb": "Morningside",
+                    "postcode": "4171",
+                },
+            ],
+            chunk_size=1,
+        )
+
+        assert [result.item_index for result in results] == [0, 1, 2, 3]
+        assert results[0].entity is not None and results[0].error is None
+        assert results[1].entity is None and results[1].error is not None
+        assert results[2].entity is None
+        assert results[2].error is not None and "suburb" in results[2].error
+        assert results[3].entity is not None
+        assert results[3].entity.postcode == 4171
+
+        with db_engine.connect() as connection:
+            address_orms = connection.execute(
+                select(address_table).order_by(address_table.c.id)
+            ).all()
+
+        assert [address_orm.id for address_orm in address_orms] == [
+            results[0].entity.id,
+            results[3].entity.id,
+        ]
+        assert [address_orm.unit for address_orm in address_orms] == [
+            "Unit 18",
+            "Unit 21",
+        ]
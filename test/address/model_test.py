@@ -16,3 +16,27 @@ class TestAddress:
     ) -> None:
         with pytest.raises(AssertionError):
             Address.assert_is_valid_postcode(postcode)
+
+    def test_new_address_is_clean(self) -> None:
+        address = Address(1, "Unit 1", "Street", "Suburb", 4170)
+
+        assert not address.is_dirty()
+        assert address.get_changed_attributes() == frozenset()
+
+    def test_assigning_attribute_marks_it_changed(self) -> None:
+        address = Address(1, "Unit 1", "Street", "Suburb", 4170)
+        address.suburb = "Cannon Hill"
+        address.postcode = 4170
+
+        assert address.is_dirty()
+        assert address.get_changed_attributes() == {"suburb"}
+
+        address.mark_clean()
+        assert not address.is_dirty()
+
+    def test_address_is_slotted(self) -> None:
+        address = Address(1, "Unit 1", "Street", "Suburb", 4170)
+
+        assert not hasattr(address, "__dict__")
+        with pytest.raises(AttributeError):
+            address.country = "Australia"
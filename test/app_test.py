@@ -0,0 +1,106 @@
+from typing import Generator
+
+import pytest
+
+from flask.testing import FlaskClient
+from sqlalchemy import Engine
+
+from hello_food import engine, metadata
+from hello_food.app import create_app
+
+
+class TestApp:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    @pytest.fixture(scope="function")
+    def client(self) -> Generator[FlaskClient, None, None]:
+        app = create_app()
+        yield app.test_client()
+        app.extensions["health_monitor"].stop()
+
+    def test_create_returns_entity_that_can_be_got_by_id(
+        self, client: FlaskClient
+    ) -> None:
+        address = client.post(
+            "/address/create",
+            json={
+                "unit": "U 19",
+                "street_name": "Green",
+                "suburb": "Morningside",
+                "postcode": "4171",
+            },
+        ).json
+        assert address is not None
+        assert address["postcode"] == 4171
+
+        user = client.post(
+            "/standard_user/create",
+            json={
+                "email": "john@example.com",
+                "name": "John Doe",
+                "meals_per_week": 2,
+                "address_id": address["id"],
+            },
+        ).json
+        meal = client.post(
+            "/meal/create",
+            json={"cuisine": "Italian", "recipe": "Pasta", "price": 9.5},
+        ).json
+        assert user is not None and meal is not None
+        assert user["type"] == "standard_user"
+
+        delivery = client.post(
+            "/delivery/create",
+            json={
+                "user_id": user["id"],
+                "address_id": address["id"],
+                "meal_orders": [{"meal_id": meal["id"], "quantity": 2}],
+            },
+        ).json
+        assert delivery is not None
+        handling_event = client.post(
+            "/handling_event/create",
+            json={
+                "delivery_id": delivery["id"],
+                "to_address_id": address["id"],
+                "from_address_id": address["id"],
+                "completion_time": 1,
+            },
+        ).json
+        assert handling_event is not None
+
+        for resource, entity in (
+            ("address", address),
+            ("user", user),
+            ("meal", meal),
+            ("delivery", delivery),
+            ("handling_event", handling_event),
+        ):
+            response = client.get(f"/{resource}/get", query_string={"id": entity["id"]})
+            assert response.status_code == 200
+            assert response.json == entity
+
+    def test_get_unknown_id_is_not_found(self, client: FlaskClient) -> None:
+        response = client.get("/address/get", query_string={"id": 1})
+
+        assert response.status_code == 404
+        assert response.json is not None
+        assert "id=1" in response.json["error"]
+
+    def test_request_id_is_returned(self, client: FlaskClient) -> None:
+        response = client.get("/livez", headers={"X-Request-ID": "request-1"})
+        assert response.headers["X-Request-ID"] == "request-1"
+
+        generated_request_id = client.get("/livez").headers["X-Request-ID"]
+        assert len(generated_request_id) == 32
@@ -0,0 +1,226 @@
+import asyncio
+import json
+from typing import Any, Coroutine, Generator, TypeVar
+
+import pytest
+
+from sqlalchemy import Engine, select
+
+pytest.importorskip("asyncpg")
+
+from hello_food import (
+    engine,
+    metadata,
+    address_table,
+    get_address_factory,
+    get_meal_factory,
+    get_standard_user_factory,
+    get_delivery_factory,
+    handling_event_table,
+)
+from hello_food.asgi import create_asgi_app, Message
+from hello_food.controllers import handling_event as handling_event_controller
+from hello_food.services.outbox import email_outbox_table
+from hello_food.sql import dispose_async_engine
+
+_R = TypeVar("_R")
+
+
+def _run(coroutine: Coroutine[Any, Any, _R]) -> _R:
+    async def run_and_dispose() -> _R:
+        try:
+            return await coroutine
+        finally:
+            await dispose_async_engine()
+
+    return asyncio.run(run_and_dispose())
+
+
+async def _request(
+    method: str, path: str, body: Any = None, query_string: str = ""
+) -> tuple[int, Any]:
+    messages: list[Message] = []
+    request_body = b"" if body is None else json.dumps(body).encode()
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": request_body, "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string.encode(),
+    }
+    await create_asgi_app()(scope, receive, send)
+
+    response_body = messages[1]["body"]
+    return messages[0]["status"], json.loads(response_body) if response_body else None
+
+
+class TestAsgiApp:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def test_create_address(self, db_engine: Engine) -> None:
+        status, response = _run(
+            _request(
+                "POST",
+                "/address/create",
+                {
+                    "unit": "U 19",
+                    "street_name": "Green",
+                    "suburb": "Morningside",
+                    "postcode": "4171",
+                },
+            )
+        )
+
+        assert status == 200
+        with db_engine.connect() as connection:
+            address_id, suburb = connection.execute(
+                select(address_table.c.id, address_table.c.suburb)
+            ).one()
+        assert suburb == "Morningside"
+        assert response == {
+            "id": address_id,
+            "unit": "U 19",
+            "street_name": "Green",
+            "suburb": "Morningside",
+            "postcode": 4171,
+        }
+
+    def test_probes_without_health_snapshot(self) -> None:
+        # The lifespan, which takes the first health snapshot, has not run
+        assert _run(_request("GET", "/livez")) == (200, {"status": "OK"})
+        assert _run(_request("GET", "/readyz")) == (503, {"ready": False})
+
+    def test_invalid_address_is_rejected(self) -> None:
+        status, response = _run(_request("POST", "/address/create", {"unit": "U 19"}))
+
+        assert status == 500
+        assert "street_name" in response["error"]
+
+    def test_get_meals_from_cuisine(self) -> None:
+        for price in (5.0, 7.5, 10.0):
+            get_meal_factory().create_from_values("Italian", "Pasta", price)
+
+        status, response = _run(
+            _request("GET", "/meal/cuisine", query_string="cuisine=Italian&limit=2")
+        )
+
+        assert status == 200
+        assert [meal["price"] for meal in response["meals"]] == [5.0, 7.5]
+        assert response["next_cursor"] is not None
+
+    def test_create_delivery(self) -> None:
+        address = get_address_factory().create_from_values(
+            "U 19", "Green", "Morningside", 4171
+        )
+        user = get_standard_user_factory().create_from_values(
+            "john@example.com", "John Doe", 2, address.id
+        )
+        meal = get_meal_factory().create_from_values("Italian", "Pasta", 9.5)
+
+        status, response = _run(
+            _request(
+                "POST",
+                "/delivery/create",
+                {
+                    "user_id": user.id,
+                    "address_id": address.id,
+                    "meal_orders": [{"meal_id": meal["id"], "quantity": 2}],
+                },
+            )
+        )
+
+        assert status == 200
+        assert response["total"] == 19.0
+        assert response["meal_orders"] == [{"meal_id": meal["id"], "quantity": 2}]
+
+    def test_create_handling_event_emails_customer(self, db_engine: Engine) -> None:
+        address = get_address_factory().create_from_values(
+            "U 19", "Green", "Morningside", 4171
+        )
+        user = get_standard_user_factory().create_from_values(
+            "john@example.com", "John Doe", 1, address.id
+        )
+        meal = get_meal_factory().create_from_values("Italian", "Pasta", 9.5)
+        delivery = get_delivery_factory().create_from_values(
+            user.id, address.id, [(meal["id"], 1)]
+        )
+
+        status, response = _run(
+            _request(
+                "POST",
+                "/handling_event/create",
+                {
+                    "delivery_id": delivery.id,
+                    "to_address_id": address.id,
+                    "from_address_id": address.id,
+                    "completion_time": 1,
+                },
+            )
+        )
+
+        assert status == 200
+        assert response["delivery_id"] == delivery.id
+        with db_engine.connect() as connection:
+            recipients = connection.execute(
+                select(email_outbox_table.c.recipient)
+            ).scalars()
+            assert list(recipients) == ["john@example.com"] * 2
+
+    def test_create_handling_event_is_rolled_back_with_its_emails(
+        self, db_engine: Engine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "U 19", "Green", "Morningside", 4171
+        )
+        user = get_standard_user_factory().create_from_values(
+            "john@example.com", "John Doe", 1, address.id
+        )
+        meal = get_meal_factory().create_from_values("Italian", "Pasta", 9.5)
+        delivery = get_delivery_factory().create_from_values(
+            user.id, address.id, [(meal["id"], 1)]
+        )
+
+        async def fail_to_enqueue(*args: Any) -> bool:
+            raise RuntimeError("Outbox unavailable")
+
+        monkeypatch.setattr(
+            handling_event_controller, "enqueue_customer_email_async", fail_to_enqueue
+        )
+
+        status, _ = _run(
+            _request(
+                "POST",
+                "/handling_event/create",
+                {
+                    "delivery_id": delivery.id,
+                    "to_address_id": address.id,
+                    "from_address_id": address.id,
+                    "completion_time": 1,
+                },
+            )
+        )
+
+        assert status == 500
+        with db_engine.connect() as connection:
+            assert connection.execute(select(handling_event_table)).all() == []
+
+    def test_unknown_routes(self) -> None:
+        assert _run(_request("GET", "/unknown"))[0] == 404
+        assert _run(_request("GET", "/address/create"))[0] == 405
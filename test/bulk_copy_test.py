@@ -0,0 +1,156 @@
+import io
+from typing import Generator
+
+import pytest
+
+from sqlalchemy import Engine, select
+
+from hello_food import (
+    engine,
+    metadata,
+    address_table,
+    meal_table,
+    get_address_factory,
+    get_meal_factory,
+)
+from hello_food.bulk_copy import MAX_REPORTED_REJECTED_ROWS, _CopyReader
+
+
+class TestCsvImport:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def test_import_meals_reports_rejected_rows(self, db_engine: Engine) -> None:
+        csv_file = io.StringIO(
+            "price,cuisine,recipe\n"
+            "8.90,Italian,Pasta\n"
+            "not a price,Italian,Pizza\n"
+            "10.5,Chinese\n"
+            '12,Chinese,"Pork, with rice"\n'
+        )
+
+        result = get_meal_factory().create_many_from_csv(csv_file)
+
+        assert result.imported == 2
+        assert result.duplicates == 0
+        assert result.rejected == 2
+        assert [line_number for line_number, _ in result.rejected_rows] == [3, 4]
+        assert "price" in result.rejected_rows[0].error
+
+        with db_engine.connect() as connection:
+            meals = connection.execute(
+                select(meal_table.c.recipe, meal_table.c.price).order_by(
+                    meal_table.c.price
+                )
+            ).all()
+        assert [tuple(meal) for meal in meals] == [
+            ("Pasta", 8.90),
+            ("Pork, with rice", 12.0),
+        ]
+
+    def test_import_addresses_validates_postcodes_and_skips_duplicates(
+        self, db_engine: Engine
+    ) -> None:
+        address_factory = get_address_factory()
+        csv_text = (
+            "unit,street_name,suburb,postcode\n"
+            "U 19,Green,Morningside,4171\n"
+            ",Wattle,Cannon Hill,40000\n"
+            ",Wattle,Cannon Hill,4170\n"
+        )
+
+        first_result = address_factory.create_many_from_csv(io.StringIO(csv_text))
+        second_result = address_factory.create_many_from_csv(io.StringIO(csv_text))
+
+        assert (first_result.imported, first_result.duplicates) == (2, 0)
+        assert (second_result.imported, second_result.duplicates) == (0, 2)
+        assert [line_number for line_number, _ in first_result.rejected_rows] == [3]
+
+        with db_engine.connect() as connection:
+            postcodes = connection.execute(
+                select(address_table.c.postcode).order_by(address_table.c.postcode)
+            ).scalars()
+            assert list(postcodes) == [4170, 4171]
+
+    def test_import_keeps_empty_strings(self, db_engine: Engine) -> None:
+        meal_result = get_meal_factory().create_many_from_csv(
+            io.StringIO("cuisine,recipe,price\nItalian,,8.9\n")
+        )
+        address_result = get_address_factory().create_many_from_csv(
+            io.StringIO("unit,street_name,suburb,postcode\n,,Morningside,4171\n")
+        )
+
+        assert (meal_result.imported, address_result.imported) == (1, 1)
+        with db_engine.connect() as connection:
+            assert connection.execute(select(meal_table.c.recipe)).scalar_one() == ""
+            address = connection.execute(
+                select(address_table.c.unit, address_table.c.street_name)
+            ).one()
+        assert tuple(address) == ("", "")
+
+    def test_import_rejects_rows_the_columns_would_refuse(
+        self, db_engine: Engine
+    ) -> None:
+        result = get_meal_factory().create_many_from_csv(
+            io.StringIO(
+                "cuisine,recipe,price\n"
+                "Italian,Pasta,8.9\n"
+                "Italian,Pasta\x00,8.9\n"
+                "Thai,Curry,12\n"
+            )
+        )
+
+        assert (result.imported, result.rejected) == (2, 1)
+        assert [line_number for line_number, _ in result.rejected_rows] == [3]
+        assert "recipe" in result.rejected_rows[0].error
+
+    def test_import_throws_value_error_for_missing_columns(self) -> None:
+        with pytest.raises(ValueError):
+            get_meal_factory().create_many_from_csv(
+                io.StringIO("cuisine,recipe\nItalian,Pasta\n")
+            )
+
+    def test_import_streams_many_rows(self, db_engine: Engine) -> None:
+        csv_lines = (f"Italian,Recipe {index},{index}.5\n" for index in range(20_000))
+
+        result = get_meal_factory().create_many_from_csv(
+            ["cuisine,recipe,price\n", *csv_lines]
+        )
+
+        assert result.imported == 20_000
+
+    def test_import_reports_the_first_rejected_rows_and_counts_the_rest(
+        self,
+    ) -> None:
+        rejected_count = MAX_REPORTED_REJECTED_ROWS + 5
+        csv_lines = ["Italian,Pasta,free\n"] * rejected_count
+
+        result = get_meal_factory().create_many_from_csv(
+            ["cuisine,recipe,price\n", *csv_lines, "Italian,Pasta,8.90\n"]
+        )
+
+        assert result.imported == 1
+        assert result.rejected == rejected_count
+        assert len(result.rejected_rows) == MAX_REPORTED_REJECTED_ROWS
+        assert result.rejected_rows[-1].line_number == MAX_REPORTED_REJECTED_ROWS + 1
+
+    def test_copy_reader_reads_rows_in_chunks_of_size(self) -> None:
+        copy_reader = _CopyReader(iter([("a", 1), ("b, c", 2), ("d", 3)]))
+
+        chunks = []
+        while chunk := copy_reader.read(4):
+            assert len(chunk) <= 4
+            chunks.append(chunk)
+
+        assert "".join(chunks) == '"a",1\r\n"b, c",2\r\n"d",3\r\n'
+        assert copy_reader.row_count == 3
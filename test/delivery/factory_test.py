@@ -1,5 +1,5 @@
 from typing import Any, Mapping
-from sqlalchemy import select, Engine
+from sqlalchemy import event, func, select, Connection, Engine
 
 import pytest
 
@@ -196,3 +196,80 @@ class TestDeliveryFactory:
             (created_meal_1["id"], assigned_meal_order_1_quantity),
             (created_meal_2["id"], assigned_meal_order_2_quantity),
         }
+
+    def test_create_from_values_writes_in_one_statement(
+        self, db_engine: Engine
+    ) -> None:
+        created_address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        created_standard_user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 6, created_address.id
+        )
+        created_meals = [
+            get_meal_factory().create_from_values("Italian", f"Recipe {i}", 8.90)
+            for i in range(3)
+        ]
+        assigned_meal_order_tuples = [(meal["id"], 2) for meal in created_meals]
+
+        statements: list[str] = []
+
+        def record_statement(
+            conn: Connection, cursor: Any, statement: str, *args: Any
+        ) -> None:
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", record_statement)
+        try:
+            created_delivery = get_delivery_factory().create_from_values(
+                created_standard_user.id,
+                created_address.id,
+                assigned_meal_order_tuples,
+            )
+        finally:
+            event.remove(db_engine, "before_cursor_execute", record_statement)
+
+        insert_statements = [
+            statement for statement in statements if "INSERT" in statement
+        ]
+        assert len(insert_statements) == 1
+        assert created_delivery.total == pytest.approx(8.90 * 6)
+
+        with db_engine.connect() as connection:
+            meal_orders_orm = connection.execute(
+                select(meal_order_table).where(
+                    meal_order_table.c.delivery_id == created_delivery.id
+                )
+            ).all()
+
+        assert set(
+            (meal_order_orm.meal_id, meal_order_orm.quantity)
+            for meal_order_orm in meal_orders_orm
+        ) == set(assigned_meal_order_tuples)
+
+    def test_create_from_values_fails_on_duplicate_meals(
+        self, db_engine: Engine
+    ) -> None:
+        created_address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        created_standard_user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 2, created_address.id
+        )
+        created_meal = get_meal_factory().create_from_values(
+            "Italian", "A lot of flour", 8.90
+        )
+
+        with pytest.raises(AssertionError):
+            get_delivery_factory().create_from_values(
+                created_standard_user.id,
+                created_address.id,
+                [(created_meal["id"], 1), (created_meal["id"], 1)],
+            )
+
+        with db_engine.connect() as connection:
+            delivery_count = connection.execute(
+                select(func.count()).select_from(delivery_table)
+            ).scalar_one()
+
+        assert delivery_count == 0
@@ -1,6 +1,6 @@
 import pytest
 
-from hello_food import Delivery, Meal, MealOrder
+from hello_food import Delivery, DeliveryBatch, Meal, MealOrder
 
 
 class TestDelivery:
@@ -16,3 +16,40 @@ class TestDelivery:
     ) -> None:
         with pytest.raises(AssertionError):
             MealOrder.assert_quantity_is_positive_integer(quantity)
+
+    def test_assert_meal_ids_are_unique_passes(self) -> None:
+        MealOrder.assert_meal_ids_are_unique([1, 2, 3])
+
+    def test_assert_meal_ids_are_unique_throws_assertion_error(self) -> None:
+        with pytest.raises(AssertionError):
+            MealOrder.assert_meal_ids_are_unique([1, 2, 1])
+
+    def test_delivery_is_slotted(self) -> None:
+        delivery = Delivery(1, 2, 3, 8.9, [MealOrder(4, 1)])
+
+        assert not hasattr(delivery, "__dict__")
+
+    def test_delivery_batch_builds_deliveries_from_columns(self) -> None:
+        batch = DeliveryBatch()
+        batch.append_delivery(1, 2, 3, 26.7)
+        batch.append_meal_order(4, 1)
+        batch.append_meal_order(5, 2)
+        batch.append_delivery(6, 2, 3, 0.0)
+        batch.append_delivery(7, 8, 9, 8.9)
+        batch.append_meal_order(4, 1)
+
+        assert len(batch) == 3
+        assert list(batch.ids) == [1, 6, 7]
+        assert batch.get_meal_orders(0) == [MealOrder(4, 1), MealOrder(5, 2)]
+        assert batch.get_meal_orders(1) == []
+        assert batch.get_meal_orders(-1) == [MealOrder(4, 1)]
+
+        delivery = batch[2]
+        assert (delivery.id, delivery.user_id, delivery.address_id) == (7, 8, 9)
+        assert delivery.total == 8.9
+        assert not delivery.is_dirty()
+        assert [delivery.id for delivery in batch] == [1, 6, 7]
+
+    def test_delivery_batch_needs_delivery_before_meal_orders(self) -> None:
+        with pytest.raises(AssertionError):
+            DeliveryBatch().append_meal_order(4, 1)
@@ -1,8 +1,8 @@
-from typing import Generator
+from typing import Any, Generator
 
 import pytest
 
-from sqlalchemy import Engine, insert
+from sqlalchemy import Connection, Engine, event, insert
 
 from hello_food import (
     engine,
@@ -10,6 +10,7 @@ from hello_food import (
     MealOrder,
     Delivery,
     get_address_factory,
+    get_delivery_factory,
     get_delivery_repository,
     get_meal_factory,
     get_standard_user_factory,
@@ -117,3 +118,143 @@ class TestAddressFactory:
         assert retrieved_delivery.user_id == created_standard_user.id
         assert retrieved_delivery.address_id == created_address.id
         assert set(retrieved_delivery.meal_orders) == set(meal_orders)
+
+    def test_get_page_lists_deliveries_newest_first(self, db_engine: Engine) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 1, address.id
+        )
+        other_user = get_standard_user_factory().create_from_values(
+            "other@example.com", "Jane Doe", 1, address.id
+        )
+        meals = [
+            get_meal_factory().create_from_values("Italian", recipe, 8.90)
+            for recipe in ("Pasta", "Pizza", "Risotto", "Gnocchi")
+        ]
+
+        delivery_factory = get_delivery_factory()
+        delivery_ids = [
+            delivery_factory.create_from_values(
+                user_id, address.id, [(meal["id"], 1)]
+            ).id
+            for user_id, meal in zip((user.id, other_user.id, user.id, user.id), meals)
+        ]
+
+        statements: list[str] = []
+
+        def count_statement(
+            conn: Connection, cursor: Any, statement: str, *args: Any
+        ) -> None:
+            statements.append(statement)
+
+        delivery_repository = get_delivery_repository()
+        event.listen(db_engine, "before_cursor_execute", count_statement)
+        try:
+            first_page = delivery_repository.get_page(limit=3)
+        finally:
+            event.remove(db_engine, "before_cursor_execute", count_statement)
+        second_page = delivery_repository.get_page(first_page.next_cursor, limit=3)
+
+        # One query for the deliveries and one for all of their meal orders
+        assert len(statements) == 2
+        assert [delivery.id for delivery in first_page.items] == delivery_ids[:0:-1]
+        assert [delivery.meal_orders for delivery in first_page.items] == [
+            [MealOrder(meal["id"], 1)] for meal in meals[:0:-1]
+        ]
+        assert [delivery.id for delivery in second_page.items] == delivery_ids[:1]
+        assert second_page.next_cursor is None
+
+        user_page = delivery_repository.get_page(limit=10, user_id=user.id)
+        assert [delivery.id for delivery in user_page.items] == [
+            delivery_ids[3],
+            delivery_ids[2],
+            delivery_ids[0],
+        ]
+        assert user_page.next_cursor is None
+
+    def test_stream_all_groups_meal_orders_of_each_delivery(
+        self, db_engine: Engine
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 3, address.id
+        )
+        meals = [
+            get_meal_factory().create_from_values("Italian", recipe, 8.90)
+            for recipe in ("Pasta", "Pizza")
+        ]
+
+        delivery_factory = get_delivery_factory()
+        created_deliveries = [
+            delivery_factory.create_from_values(
+                user.id, address.id, [(meals[0]["id"], 1), (meals[1]["id"], 2)]
+            ),
+            delivery_factory.create_from_values(
+                user.id, address.id, [(meals[1]["id"], 3)]
+            ),
+        ]
+        with db_engine.connect() as connection:
+            empty_delivery_id = connection.execute(
+                insert(delivery_table)
+                .values(user_id=user.id, address_id=address.id, total=0)
+                .returning(delivery_table.c.id)
+            ).scalar_one()
+            connection.commit()
+
+        streamed_deliveries = list(get_delivery_repository().stream_all())
+
+        assert [delivery.id for delivery in streamed_deliveries] == [
+            *(delivery.id for delivery in created_deliveries),
+            empty_delivery_id,
+        ]
+        for streamed_delivery, created_delivery in zip(
+            streamed_deliveries, created_deliveries
+        ):
+            assert set(streamed_delivery.meal_orders) == set(
+                created_delivery.meal_orders
+            )
+        assert streamed_deliveries[2].meal_orders == []
+
+    def test_stream_batches_fills_batches_from_rows(self, db_engine: Engine) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 3, address.id
+        )
+        meals = [
+            get_meal_factory().create_from_values("Italian", recipe, 8.90)
+            for recipe in ("Pasta", "Pizza")
+        ]
+
+        delivery_factory = get_delivery_factory()
+        created_deliveries = [
+            delivery_factory.create_from_values(
+                user.id, address.id, [(meals[0]["id"], 1), (meals[1]["id"], 2)]
+            ),
+            delivery_factory.create_from_values(
+                user.id, address.id, [(meals[1]["id"], 3)]
+            ),
+            delivery_factory.create_from_values(
+                user.id, address.id, [(meals[0]["id"], 3)]
+            ),
+        ]
+
+        batches = list(get_delivery_repository().stream_batches(batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        streamed_deliveries = [delivery for batch in batches for delivery in batch]
+        assert [delivery.id for delivery in streamed_deliveries] == [
+            delivery.id for delivery in created_deliveries
+        ]
+        for streamed_delivery, created_delivery in zip(
+            streamed_deliveries, created_deliveries
+        ):
+            assert streamed_delivery.total == created_delivery.total
+            assert set(streamed_delivery.meal_orders) == set(
+                created_delivery.meal_orders
+            )
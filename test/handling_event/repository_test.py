@@ -11,6 +11,7 @@ from hello_food import (
     Delivery,
     get_address_factory,
     get_delivery_factory,
+    get_handling_event_factory,
     get_handling_event_repository,
     get_meal_factory,
     get_standard_user_factory,
@@ -129,3 +130,43 @@ class TestAddressFactory:
         assert reconstituted_handling_event.to_address_id == assigned_to_address_id
         assert reconstituted_handling_event.from_address_id == assigned_from_address_id
         assert reconstituted_handling_event.completion_time == assigned_completion_time
+
+    def test_get_page_lists_handling_events_newest_first(
+        self, db_engine: Engine
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+        user = get_standard_user_factory().create_from_values(
+            "test@example.com", "John Doe", 1, address.id
+        )
+        meal = get_meal_factory().create_from_values("Italian", "Pasta", 8.90)
+        deliveries = [
+            get_delivery_factory().create_from_values(
+                user.id, address.id, [(meal["id"], 1)]
+            )
+            for _ in range(2)
+        ]
+
+        handling_event_factory = get_handling_event_factory()
+        handling_event_ids = [
+            handling_event_factory.create_from_values(
+                delivery.id, address.id, address.id, completion_time
+            ).id
+            for completion_time, delivery in enumerate(deliveries * 2, start=1)
+        ]
+
+        handling_event_repository = get_handling_event_repository()
+        first_page = handling_event_repository.get_page(limit=3)
+        second_page = handling_event_repository.get_page(
+            first_page.next_cursor, limit=3
+        )
+        delivery_page = handling_event_repository.get_page(delivery_id=deliveries[0].id)
+
+        assert [event.id for event in first_page.items] == handling_event_ids[:0:-1]
+        assert [event.id for event in second_page.items] == handling_event_ids[:1]
+        assert second_page.next_cursor is None
+        assert [event.id for event in delivery_page.items] == [
+            handling_event_ids[2],
+            handling_event_ids[0],
+        ]
@@ -0,0 +1,157 @@
+import threading
+from typing import Generator
+
+import pytest
+
+from sqlalchemy import Engine
+
+from hello_food import engine, metadata
+from hello_food.app import create_app
+from hello_food.health import (
+    HealthMonitor,
+    HealthSnapshot,
+    check_health,
+    health_to_json_dict,
+)
+from hello_food.services.outbox import enqueue_customer_email
+from hello_food.sql import (
+    PoolStatistics,
+    EngineSettings,
+    create_engine_from_settings,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+_POOL = PoolStatistics("queue", 10, 20, 0, 3, 0)
+
+
+class TestHealthMonitor:
+    __test__ = True
+
+    def test_monitor_is_not_ready_before_first_snapshot(self) -> None:
+        monitor = HealthMonitor(lambda: HealthSnapshot(True, _POOL, 0))
+
+        assert monitor.is_ready() is False
+        assert health_to_json_dict(monitor) == {"ready": False}
+
+    def test_monitor_reports_latest_snapshot(self) -> None:
+        clock = _FakeClock()
+        monitor = HealthMonitor(
+            lambda: HealthSnapshot(True, _POOL, 7), max_age=30, clock=clock
+        )
+        monitor.refresh()
+        clock.now += 2
+
+        assert monitor.is_ready() is True
+        assert health_to_json_dict(monitor) == {
+            "ready": True,
+            "age_seconds": 2.0,
+            "database_reachable": True,
+            "pool_saturation": 0.1,
+            "pool_checked_out": 3,
+            "outbox_backlog": 7,
+            "error": None,
+        }
+
+    def test_monitor_is_not_ready_when_database_is_unreachable(self) -> None:
+        monitor = HealthMonitor(
+            lambda: HealthSnapshot(False, _POOL, None, "connection refused")
+        )
+        monitor.refresh()
+
+        assert monitor.is_ready() is False
+        assert health_to_json_dict(monitor)["error"] == "connection refused"
+
+    def test_monitor_is_not_ready_when_snapshot_is_stale(self) -> None:
+        clock = _FakeClock()
+        monitor = HealthMonitor(
+            lambda: HealthSnapshot(True, _POOL, 0), max_age=30, clock=clock
+        )
+        monitor.refresh()
+        clock.now += 31
+
+        assert monitor.is_ready() is False
+
+    def test_monitor_refreshes_in_background(self) -> None:
+        checks: list[int] = []
+        checked_three_times = threading.Event()
+
+        def check() -> HealthSnapshot:
+            checks.append(len(checks))
+            if len(checks) >= 3:
+                checked_three_times.set()
+            return HealthSnapshot(True, _POOL, len(checks))
+
+        monitor = HealthMonitor(check, interval=0.01)
+        monitor.start()
+        try:
+            assert len(checks) >= 1
+            assert checked_three_times.wait(timeout=5)
+        finally:
+            monitor.stop()
+
+        assert monitor.snapshot is not None
+        assert monitor.snapshot.outbox_backlog is not None
+        assert monitor.snapshot.outbox_backlog >= 3
+
+
+class TestCheckHealth:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def test_check_health_counts_outbox_backlog(self, db_engine: Engine) -> None:
+        enqueue_customer_email("a@example.com", "Subject", "Body", "a")
+        enqueue_customer_email("b@example.com", "Subject", "Body", "b")
+
+        snapshot = check_health(db_engine)
+
+        assert snapshot.database_reachable is True
+        assert snapshot.outbox_backlog == 2
+        assert snapshot.error is None
+
+    def test_check_health_reports_unreachable_database(self) -> None:
+        unreachable_engine = create_engine_from_settings(
+            EngineSettings(hostname="localhost", port=1, pool_pre_ping=False)
+        )
+
+        snapshot = check_health(unreachable_engine)
+
+        assert snapshot.database_reachable is False
+        assert snapshot.outbox_backlog is None
+        assert snapshot.error is not None
+
+        unreachable_engine.dispose()
+
+    def test_probes(self) -> None:
+        app = create_app()
+        client = app.test_client()
+
+        try:
+            assert client.get("/livez").status_code == 200
+
+            response = client.get("/readyz")
+            assert response.status_code == 200
+            assert response.json is not None
+            assert response.json["ready"] is True
+            assert response.json["outbox_backlog"] == 0
+
+            assert client.get("/healthcheck").status_code == 200
+        finally:
+            app.extensions["health_monitor"].stop()
@@ -0,0 +1,154 @@
+import logging
+import queue
+import sys
+from typing import Generator
+
+import pytest
+
+from sqlalchemy import Engine, text
+
+from hello_food.log import (
+    SQL_LOGGER_NAME,
+    Identified,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    instance_logger,
+    logger_level_property,
+    reset_request_id,
+    rootlogger,
+    set_request_id,
+    stop_logging,
+)
+from hello_food.serialization import loads
+from hello_food.sql import EngineSettings, create_engine_from_settings
+
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+class _Logged(Identified):
+    logging_level = logger_level_property()
+
+
+def _record(name: str, level: int) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+
+class TestLog:
+    __test__ = True
+
+    @pytest.fixture(scope="function", autouse=True)
+    def pipeline(self) -> Generator[None, None, None]:
+        # Start from no pipeline, whatever the tests before installed
+        stop_logging()
+        yield
+        stop_logging()
+        logging.getLogger(SQL_LOGGER_NAME).setLevel(logging.NOTSET)
+
+    def test_records_are_written_with_request_id(self) -> None:
+        collecting_handler = _CollectingHandler()
+        configure_logging(handlers=[collecting_handler])
+
+        request_id_token = set_request_id("request-1")
+        try:
+            rootlogger.warning("Delivery %d failed", 7)
+        finally:
+            reset_request_id(request_id_token)
+        rootlogger.warning("Outside of a request")
+        # Stopping writes out the queued records
+        stop_logging()
+
+        assert [record.getMessage() for record in collecting_handler.records] == [
+            "Delivery 7 failed",
+            "Outside of a request",
+        ]
+        assert [
+            getattr(record, "request_id") for record in collecting_handler.records
+        ] == ["request-1", None]
+
+    def test_configure_logging_installs_one_handler(self) -> None:
+        handler = configure_logging(handlers=[_CollectingHandler()])
+
+        assert configure_logging() is handler
+        assert rootlogger.handlers.count(handler) == 1
+
+    def test_instance_logger_adds_no_handler(self) -> None:
+        logged = _Logged()
+        for _ in range(3):
+            logged.logging_level = logging.DEBUG
+            instance_logger(logged, logging.INFO)
+
+        assert logged.logger.handlers == []
+        assert (
+            sum(
+                isinstance(handler, NonBlockingQueueHandler)
+                for handler in rootlogger.handlers
+            )
+            == 1
+        )
+
+    def test_json_formatter(self) -> None:
+        try:
+            raise ValueError("Invalid postcode")
+        except ValueError:
+            record = logging.LogRecord(
+                "hello_food", logging.ERROR, __file__, 1, "Failed %s", ("a",), None
+            )
+            record.exc_info = sys.exc_info()
+        setattr(record, "request_id", "request-1")
+
+        log = loads(JsonFormatter().format(record))
+
+        assert log["level"] == "ERROR"
+        assert log["logger"] == "hello_food"
+        assert log["message"] == "Failed a"
+        assert log["request_id"] == "request-1"
+        assert "ValueError: Invalid postcode" in log["exception"]
+
+    def test_sampling_filter_samples_debug_and_sql_records(self) -> None:
+        sampling_filter = SamplingFilter(0.25, random_=lambda: 0.5)
+
+        assert sampling_filter.filter(_record("hello_food", logging.INFO))
+        assert sampling_filter.filter(_record("hello_food", logging.ERROR))
+        assert not sampling_filter.filter(_record("hello_food", logging.DEBUG))
+        assert not sampling_filter.filter(
+            _record("sqlalchemy.engine.Engine", logging.INFO)
+        )
+
+        sampling_filter.sample_rate = 0.75
+        assert sampling_filter.filter(_record("hello_food", logging.DEBUG))
+
+    def test_full_queue_drops_records(self) -> None:
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        handler.handle(_record("hello_food", logging.WARNING))
+        handler.handle(_record("hello_food", logging.WARNING))
+
+        assert handler.dropped == 1
+
+    def test_sql_statements_are_logged_when_echoed(self) -> None:
+        collecting_handler = _CollectingHandler()
+        configure_logging(handlers=[collecting_handler], sql_echo=True)
+
+        sql_engine: Engine = create_engine_from_settings(
+            EngineSettings(pool_mode="pgbouncer")
+        )
+        try:
+            with sql_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        finally:
+            sql_engine.dispose()
+        stop_logging()
+
+        assert any(
+            record.name.startswith(SQL_LOGGER_NAME)
+            and record.getMessage() == "SELECT 1"
+            for record in collecting_handler.records
+        )
@@ -0,0 +1,63 @@
+from hello_food import Meal
+from hello_food.meal.cache import MealCatalogueCache
+
+
+def _meal(id_: int, cuisine: str = "Italian") -> Meal:
+    return Meal(id=id_, cuisine=cuisine, recipe="A lot of flour", price=8.90)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestMealCatalogueCache:
+    __test__ = True
+
+    def test_get_many_returns_cached_and_missing_meals(self) -> None:
+        cache = MealCatalogueCache(max_size=10, ttl_seconds=60)
+        cache.put_many([_meal(1), _meal(2)])
+
+        meals, missing_ids = cache.get_many([1, 2, 3])
+
+        assert [meal["id"] for meal in meals] == [1, 2]
+        assert missing_ids == [3]
+        assert cache.get_statistics().hits == 2
+        assert cache.get_statistics().misses == 1
+
+    def test_entries_expire_after_ttl(self) -> None:
+        clock = FakeClock()
+        cache = MealCatalogueCache(max_size=10, ttl_seconds=60, clock=clock)
+        cache.put_many([_meal(1)])
+        cache.put_cuisine("Italian", [_meal(1)])
+
+        clock.now = 59
+        assert cache.get(1) is not None
+        assert cache.get_cuisine("Italian") is not None
+
+        clock.now = 60
+        assert cache.get(1) is None
+        assert cache.get_cuisine("Italian") is None
+
+    def test_least_recently_used_meals_are_evicted(self) -> None:
+        cache = MealCatalogueCache(max_size=2, ttl_seconds=60)
+        cache.put_many([_meal(1), _meal(2)])
+        cache.get(1)
+        cache.put_many([_meal(3)])
+
+        assert cache.get(1) is not None
+        assert cache.get(2) is None
+        assert cache.get(3) is not None
+        assert cache.get_statistics().meals == 2
+
+    def test_invalidate_drops_every_entry(self) -> None:
+        cache = MealCatalogueCache(max_size=10, ttl_seconds=60)
+        cache.put_cuisine("Italian", [_meal(1)])
+
+        cache.invalidate()
+
+        assert cache.get(1) is None
+        assert cache.get_cuisine("Italian") is None
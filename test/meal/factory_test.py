@@ -46,3 +46,10 @@ class TestTrialUserFactory:
         assert meal_orm.cuisine == assigned_cuisine
         assert meal_orm.recipe == assigned_recipe
         assert meal_orm.price == assigned_price
+
+    def test_create_from_json_keeps_fractional_price(self) -> None:
+        created_meal = get_meal_factory().create_from_json(
+            {"cuisine": "Italian", "recipe": "Pasta", "price": "8.90"}
+        )
+
+        assert created_meal["price"] == 8.90
@@ -1,10 +1,20 @@
-from typing import Generator
+from typing import Any, Generator
 
 import pytest
 
-from sqlalchemy import Engine, insert
+from sqlalchemy import Connection, Engine, event, insert
 
-from hello_food import engine, metadata, meal_table, get_meal_repository
+from hello_food.meal import meal_catalogue_cache
+from hello_food import (
+    engine,
+    metadata,
+    meal_table,
+    get_meal_repository,
+    invalidate_meal_catalogue,
+    get_meal_factory,
+    UnitOfWork,
+)
+from hello_food.sql import ReplicaRouter, create_engine_from_settings, engine_settings
 
 
 class TestTrialUserFactory:
@@ -18,6 +28,7 @@ class TestTrialUserFactory:
     def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
         metadata.drop_all(db_engine)
         metadata.create_all(db_engine)
+        invalidate_meal_catalogue()
         yield
         metadata.drop_all(db_engine)
 
@@ -48,3 +59,132 @@ class TestTrialUserFactory:
         assert retrieved_meal["cuisine"] == assigned_cuisine
         assert retrieved_meal["recipe"] == assigned_recipe
         assert retrieved_meal["price"] == assigned_price
+
+    def test_get_from_ids_is_served_from_cache(self, db_engine: Engine) -> None:
+        meal_factory = get_meal_factory()
+        meal_repository = get_meal_repository()
+
+        meal_ids = [
+            meal_factory.create_from_values("Italian", f"Recipe {i}", 8.90)["id"]
+            for i in range(3)
+        ]
+        assert len(meal_repository.get_from_ids(meal_ids)) == 3
+
+        statements: list[str] = []
+
+        def record_statement(
+            conn: Connection, cursor: Any, statement: str, *args: Any
+        ) -> None:
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", record_statement)
+        try:
+            meals = meal_repository.get_from_ids(meal_ids)
+        finally:
+            event.remove(db_engine, "before_cursor_execute", record_statement)
+
+        assert statements == []
+        assert sorted(meal["id"] for meal in meals) == sorted(meal_ids)
+
+    def test_meals_read_after_writing_are_not_cached(self) -> None:
+        meal_repository = get_meal_repository()
+
+        with pytest.raises(RuntimeError):
+            with UnitOfWork():
+                meal_id = get_meal_factory().create_from_values(
+                    "Italian", "Pasta", 8.90
+                )["id"]
+                assert meal_repository.get_from_ids([meal_id])
+                assert meal_repository.get_from_cuisine("Italian")
+                raise RuntimeError()
+
+        assert meal_repository.get_from_id(meal_id) is None
+        assert meal_repository.get_from_cuisine("Italian") == []
+
+    def test_meals_are_cached_from_the_primary(self, db_engine: Engine) -> None:
+        # A second engine on the same database stands in for a replica
+        replica = create_engine_from_settings(engine_settings)
+        replica_statements: list[str] = []
+
+        def record_statement(*args: Any) -> None:
+            replica_statements.append(str(args[2]))
+
+        event.listen(replica, "before_cursor_execute", record_statement)
+        router = ReplicaRouter(db_engine, [replica], get_lag=lambda _: 0.0)
+        router.refresh()
+        meal_id = get_meal_factory().create_from_values("Italian", "Pasta", 8.90)["id"]
+        meal_repository = get_meal_repository()
+
+        try:
+            with UnitOfWork(router=router) as unit_of_work:
+                assert meal_repository.get_from_ids([meal_id])
+                assert meal_repository.get_from_cuisine("Italian")
+                assert not unit_of_work.has_written
+                assert replica_statements == []
+
+                # Reads which do not fill the cache are still spread
+                meal_repository.get_page_from_cuisine("Thai")
+                assert len(replica_statements) == 1
+        finally:
+            replica.dispose()
+
+        assert meal_catalogue_cache.get(meal_id) is not None
+
+    def test_create_from_values_invalidates_cache(self, db_engine: Engine) -> None:
+        meal_factory = get_meal_factory()
+        meal_repository = get_meal_repository()
+
+        meal_id = meal_factory.create_from_values("Italian", "Pasta", 8.90)["id"]
+        assert meal_repository.get_from_id(meal_id) is not None
+
+        meal_factory.create_from_values("Italian", "Pizza", 10.90)
+
+        meals, missing_ids = meal_catalogue_cache.get_many([meal_id])
+        assert meals == []
+        assert missing_ids == [meal_id]
+
+    def test_get_from_cuisine_matches_whole_cuisine(self, db_engine: Engine) -> None:
+        meal_factory = get_meal_factory()
+        meal_factory.create_from_values("Italian", "Pasta", 8.90)
+        meal_factory.create_from_values("I", "Not Italian", 8.90)
+
+        meals = get_meal_repository().get_from_cuisine("Italian")
+
+        assert [meal["recipe"] for meal in meals] == ["Pasta"]
+
+    def test_get_page_from_cuisine_pages_through_cuisine(
+        self, db_engine: Engine
+    ) -> None:
+        meal_factory = get_meal_factory()
+        italian_meal_ids = [
+            meal_factory.create_from_values("Italian", f"Recipe {i}", 5.0 + i)["id"]
+            for i in range(5)
+        ]
+        meal_factory.create_from_values("Chinese", "Pork", 10.90)
+
+        meal_repository = get_meal_repository()
+        paged_meal_ids: list[int] = []
+        cursor = None
+        pages = 0
+        while True:
+            page = meal_repository.get_page_from_cuisine("Italian", cursor, limit=2)
+            paged_meal_ids.extend(meal["id"] for meal in page.items)
+            pages += 1
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert paged_meal_ids == italian_meal_ids
+        assert pages == 3
+
+    def test_get_page_from_cuisine_filters_on_price(self, db_engine: Engine) -> None:
+        meal_factory = get_meal_factory()
+        for i in range(5):
+            meal_factory.create_from_values("Italian", f"Recipe {i}", 5.0 + i)
+
+        page = get_meal_repository().get_page_from_cuisine(
+            "Italian", min_price=6.0, max_price=8.0
+        )
+
+        assert [meal["price"] for meal in page.items] == [6.0, 7.0, 8.0]
+        assert page.next_cursor is None
@@ -0,0 +1,201 @@
+from typing import Any, Generator
+
+import pytest
+
+from sqlalchemy import Engine, Table, insert, inspect, select, text
+
+from hello_food import (
+    engine,
+    metadata,
+    address_table,
+    delivery_table,
+    meal_order_table,
+    user_table,
+)
+from hello_food.migrations import (
+    LATEST_SCHEMA_VERSION,
+    MIGRATIONS,
+    SchemaVersionError,
+    create_schema,
+    get_schema_version,
+    prepare_schema,
+    run_migrations,
+    verify_schema,
+)
+
+
+class TestMigrations:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def _get_index_names(self, db_engine: Engine, table_name: str) -> set[str]:
+        return {
+            str(index["name"])
+            for index in inspect(db_engine).get_indexes(
+                table_name, schema=metadata.schema
+            )
+        }
+
+    def test_run_migrations_applies_every_migration(self, db_engine: Engine) -> None:
+        applied = run_migrations(db_engine)
+
+        assert applied == [migration.version for migration in MIGRATIONS]
+        with db_engine.connect() as connection:
+            assert get_schema_version(connection) == LATEST_SCHEMA_VERSION
+
+        assert "ix_handling_event_delivery_id" in self._get_index_names(
+            db_engine, "HandlingTable"
+        )
+        assert "ix_meal_order_delivery_id" in self._get_index_names(
+            db_engine, "MealOrder"
+        )
+        assert "ix_meal_cuisine_id" in self._get_index_names(db_engine, "Meal")
+        assert {
+            "ix_delivery_created_id",
+            "ix_delivery_user_id_created_id",
+        } <= self._get_index_names(db_engine, "Delivery")
+        assert "ix_delivery_user_id" not in self._get_index_names(db_engine, "Delivery")
+
+    def _describe_schema(self, db_engine: Engine) -> dict[str, Any]:
+        inspector = inspect(db_engine)
+        return {
+            table.name: (
+                sorted(
+                    (column["name"], str(column["type"]), column["nullable"])
+                    for column in inspector.get_columns(
+                        table.name, schema=metadata.schema
+                    )
+                ),
+                self._get_index_names(db_engine, table.name),
+            )
+            for table in metadata.sorted_tables
+        }
+
+    def test_run_migrations_creates_the_schema_of_create_schema(
+        self, db_engine: Engine
+    ) -> None:
+        run_migrations(db_engine)
+        migrated_schema = self._describe_schema(db_engine)
+        metadata.drop_all(db_engine)
+
+        create_schema(db_engine)
+
+        assert migrated_schema == self._describe_schema(db_engine)
+
+    def test_run_migrations_is_idempotent(self, db_engine: Engine) -> None:
+        run_migrations(db_engine)
+
+        assert run_migrations(db_engine) == []
+
+    def test_run_migrations_builds_missing_indexes_of_live_schema(
+        self, db_engine: Engine
+    ) -> None:
+        # A database created before the indexes were declared
+        metadata.create_all(db_engine)
+        with db_engine.begin() as connection:
+            for table in (delivery_table, meal_order_table):
+                for index in table.indexes:
+                    connection.execute(
+                        text(
+                            f'DROP INDEX "{metadata.schema}"."{index.name}"'
+                            if metadata.schema
+                            else f'DROP INDEX "{index.name}"'
+                        )
+                    )
+
+        assert run_migrations(db_engine, target_version=1) == [1]
+        assert "ix_delivery_user_id" not in self._get_index_names(db_engine, "Delivery")
+
+        assert run_migrations(db_engine, target_version=2) == [2]
+        assert "ix_delivery_user_id" in self._get_index_names(db_engine, "Delivery")
+        assert "ix_meal_order_delivery_id" in self._get_index_names(
+            db_engine, "MealOrder"
+        )
+
+    def test_run_migrations_adds_created_columns_to_existing_rows(
+        self, db_engine: Engine
+    ) -> None:
+        # A database created before rows recorded their creation time
+        run_migrations(db_engine, target_version=2)
+        with db_engine.begin() as connection:
+            address_id = connection.execute(
+                insert(address_table)
+                .values(unit="", street_name="Green", suburb="Morningside", postcode=1)
+                .returning(address_table.c.id)
+            ).scalar_one()
+            user_id = connection.execute(
+                insert(user_table)
+                .values(email="john@example.com", address_id=address_id)
+                .returning(user_table.c.id)
+            ).scalar_one()
+            connection.execute(
+                text(
+                    f"INSERT INTO {self._format_table(delivery_table)} "
+                    f"(user_id, address_id, total) VALUES (:user_id, :address_id, 1)"
+                ),
+                {"user_id": user_id, "address_id": address_id},
+            )
+
+        assert run_migrations(db_engine) == [3, 4, 5, 6]
+
+        with db_engine.connect() as connection:
+            created = connection.execute(select(delivery_table.c.created)).scalar_one()
+        assert created > 0
+        assert "ix_delivery_user_id_created_id" in self._get_index_names(
+            db_engine, "Delivery"
+        )
+        assert "ix_delivery_user_id" not in self._get_index_names(db_engine, "Delivery")
+
+    def test_create_schema_records_every_migration(self, db_engine: Engine) -> None:
+        assert create_schema(db_engine) == LATEST_SCHEMA_VERSION
+
+        assert run_migrations(db_engine) == []
+        assert "ix_delivery_user_id_created_id" in self._get_index_names(
+            db_engine, "Delivery"
+        )
+        assert "ix_delivery_user_id" not in self._get_index_names(db_engine, "Delivery")
+
+    def test_create_schema_refuses_a_database_with_tables(
+        self, db_engine: Engine
+    ) -> None:
+        run_migrations(db_engine, target_version=1)
+
+        with pytest.raises(SchemaVersionError):
+            create_schema(db_engine)
+
+        with db_engine.connect() as connection:
+            assert get_schema_version(connection) == 1
+
+    def test_verify_schema(self, db_engine: Engine) -> None:
+        with pytest.raises(SchemaVersionError):
+            verify_schema(db_engine)
+
+        run_migrations(db_engine, target_version=LATEST_SCHEMA_VERSION - 1)
+        with pytest.raises(SchemaVersionError):
+            verify_schema(db_engine)
+
+        run_migrations(db_engine)
+        assert verify_schema(db_engine) == LATEST_SCHEMA_VERSION
+        assert verify_schema(db_engine, expected_version=1) == LATEST_SCHEMA_VERSION
+
+    def test_prepare_schema_in_verify_mode_does_not_migrate(
+        self, db_engine: Engine
+    ) -> None:
+        with pytest.raises(SchemaVersionError):
+            prepare_schema(db_engine, mode="verify")
+        assert not inspect(db_engine).has_table("Delivery", schema=metadata.schema)
+
+        prepare_schema(db_engine, mode="migrate")
+        prepare_schema(db_engine, mode="verify")
+
+    def _format_table(self, table: Table) -> str:
+        return str(engine.dialect.identifier_preparer.format_table(table))
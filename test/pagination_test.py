@@ -0,0 +1,38 @@
+import pytest
+
+from hello_food.pagination import (
+    MAX_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    newest_first_parameters,
+)
+
+
+class TestPagination:
+    __test__ = True
+
+    @pytest.mark.parametrize("key", ((1,), (1_700_000_000, 42), ("Italian", 7)))
+    def test_decode_cursor_reverses_encode_cursor(
+        self, key: tuple[int | str, ...]
+    ) -> None:
+        assert decode_cursor(encode_cursor(*key), len(key)) == key
+
+    @pytest.mark.parametrize("cursor", ("not a cursor", encode_cursor(1, 2)))
+    def test_decode_cursor_throws_value_error(self, cursor: str) -> None:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, 1)
+
+    @pytest.mark.parametrize(
+        "limit, page_size", ((None, 50), (0, 1), (20, 20), (10_000, MAX_PAGE_SIZE))
+    )
+    def test_clamp_page_size(self, limit: int | None, page_size: int) -> None:
+        assert clamp_page_size(limit) == page_size
+
+    def test_newest_first_parameters_select_one_more_row_than_limit(self) -> None:
+        assert newest_first_parameters(None, 20) == {"limit": 21}
+        assert newest_first_parameters(encode_cursor(1_700_000_000, 42), 20) == {
+            "limit": 21,
+            "after_created": 1_700_000_000,
+            "after_id": 42,
+        }
@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from hello_food import (  # noqa: E402
+    Delivery,
+    DeliveryBatch,
+    Meal,
+    MealOrder,
+    StandardUser,
+    TrialUser,
+)
+from hello_food.pricing import (  # noqa: E402
+    MISSING_PRICE,
+    build_discount_vector,
+    build_price_vector,
+    cents_to_prices,
+    price_batch,
+)
+
+_MEALS = [
+    Meal(id=1, cuisine="Italian", recipe="Pasta", price=8.9),
+    Meal(id=3, cuisine="Italian", recipe="Pizza", price=0.1),
+    Meal(id=4, cuisine="Thai", recipe="Curry", price=12.35),
+]
+
+
+class TestPricing:
+    __test__ = True
+
+    def test_build_price_vector_indexes_cents_by_meal_id(self) -> None:
+        assert build_price_vector(_MEALS).tolist() == [
+            MISSING_PRICE,
+            890,
+            MISSING_PRICE,
+            10,
+            1235,
+        ]
+        assert build_price_vector([]).size == 0
+
+    def test_price_batch_matches_compute_total(self) -> None:
+        deliveries = [
+            Delivery(1, 1, 1, 0.0, [MealOrder(1, 2), MealOrder(4, 1)]),
+            Delivery(2, 1, 1, 0.0, []),
+            Delivery(3, 2, 1, 0.0, [MealOrder(3, 3)]),
+            Delivery(4, 2, 1, 0.0, [MealOrder(1, 1), MealOrder(3, 1), MealOrder(4, 5)]),
+        ]
+
+        totals = price_batch(
+            DeliveryBatch.from_deliveries(deliveries), build_price_vector(_MEALS)
+        )
+
+        assert totals.tolist() == [3015, 0, 30, 7075]
+        assert cents_to_prices(totals).tolist() == [
+            round(Delivery.compute_total(delivery.meal_orders, _MEALS), 2)
+            for delivery in deliveries
+        ]
+
+    def test_price_batch_is_exact_in_cents(self) -> None:
+        meal_orders = [MealOrder(3, 1)] * 1000
+        delivery = Delivery(1, 1, 1, 0.0, meal_orders)
+
+        totals = price_batch(
+            DeliveryBatch.from_deliveries([delivery]), build_price_vector(_MEALS)
+        )
+
+        assert totals.tolist() == [10_000]
+        assert Delivery.compute_total(meal_orders, _MEALS) != 100.0
+
+    def test_price_batch_applies_trial_discounts(self) -> None:
+        users = [
+            StandardUser(1, "john@example.com", "John Doe", 3, 1),
+            TrialUser(2, "jane@example.com", "Jane Doe", 3, 1700000000, 0.15, 1),
+        ]
+        batch = DeliveryBatch.from_deliveries(
+            [
+                Delivery(1, 1, 1, 0.0, [MealOrder(1, 3)]),
+                Delivery(2, 2, 1, 0.0, [MealOrder(1, 3)]),
+                Delivery(3, 5, 1, 0.0, [MealOrder(1, 3)]),
+            ]
+        )
+
+        totals = price_batch(
+            batch, build_price_vector(_MEALS), build_discount_vector(users)
+        )
+
+        # 15% of 2670 is 400.5 cents, rounded half up
+        assert totals.tolist() == [2670, 2269, 2670]
+
+    def test_price_batch_of_no_deliveries(self) -> None:
+        totals = price_batch(DeliveryBatch(), build_price_vector(_MEALS))
+
+        assert totals.size == 0
+
+    @pytest.mark.parametrize("meal_id", (2, 5))
+    def test_price_batch_throws_assertion_error_for_unknown_meal(
+        self, meal_id: int
+    ) -> None:
+        batch = DeliveryBatch.from_deliveries(
+            [Delivery(1, 1, 1, 0.0, [MealOrder(meal_id, 1)])]
+        )
+
+        with pytest.raises(AssertionError):
+            price_batch(batch, build_price_vector(_MEALS))
@@ -0,0 +1,88 @@
+import pytest
+
+from hello_food import (
+    Address,
+    Delivery,
+    HandlingEvent,
+    Meal,
+    MealOrder,
+    StandardUser,
+    TrialUser,
+)
+from hello_food.serialization import dumps, loads
+
+
+class TestSerialization:
+    __test__ = True
+
+    def test_address(self) -> None:
+        address = Address(1, "U 19", "Green", "Morningside", 4171)
+
+        assert loads(dumps(address)) == {
+            "id": 1,
+            "unit": "U 19",
+            "street_name": "Green",
+            "suburb": "Morningside",
+            "postcode": 4171,
+        }
+
+    def test_delivery_with_meal_orders(self) -> None:
+        delivery = Delivery(3, 2, 1, 19.0, [MealOrder(5, 2), MealOrder(6, 1)])
+
+        assert loads(dumps(delivery)) == {
+            "id": 3,
+            "user_id": 2,
+            "address_id": 1,
+            "total": 19.0,
+            "meal_orders": [
+                {"meal_id": 5, "quantity": 2},
+                {"meal_id": 6, "quantity": 1},
+            ],
+        }
+
+    def test_handling_event(self) -> None:
+        handling_event = HandlingEvent(4, 3, 1, 2, 1700000000)
+
+        assert loads(dumps(handling_event)) == {
+            "id": 4,
+            "delivery_id": 3,
+            "to_address_id": 1,
+            "from_address_id": 2,
+            "completion_time": 1700000000,
+        }
+
+    def test_users_are_serialized_with_their_type(self) -> None:
+        standard_user = StandardUser(1, "john@example.com", "John Doe", 2, 1)
+        trial_user = TrialUser(2, "jane@example.com", "Jane Doe", 3, 1700000000, 0.2, 1)
+
+        assert loads(dumps(standard_user)) == {
+            "id": 1,
+            "type": "standard_user",
+            "email": "john@example.com",
+            "name": "John Doe",
+            "meals_per_week": 2,
+            "address_id": 1,
+        }
+        assert loads(dumps(trial_user)) == {
+            "id": 2,
+            "type": "trial_user",
+            "email": "jane@example.com",
+            "name": "Jane Doe",
+            "meals_per_week": 3,
+            "address_id": 1,
+            "trial_end_date": 1700000000,
+            "discount_value": 0.2,
+        }
+
+    def test_entities_nested_in_response(self) -> None:
+        meal = Meal(id=1, cuisine="Italian", recipe="Pasta", price=9.5)
+        address = Address(1, "U 19", "Green", "Morningside", 4171)
+
+        assert loads(dumps({"meals": [meal], "addresses": [address]})) == {
+            "meals": [{"id": 1, "cuisine": "Italian", "recipe": "Pasta", "price": 9.5}],
+            "addresses": [loads(dumps(address))],
+        }
+
+    def test_unknown_type_is_not_serializable(self) -> None:
+        with pytest.raises(TypeError):
+            dumps({"value": object()})
@@ -0,0 +1,220 @@
+from typing import Any, Generator, Iterable, Sequence
+
+import pytest
+
+from sqlalchemy import Engine, Row, select
+
+from hello_food import (
+    engine,
+    metadata,
+    UnitOfWork,
+    get_address_factory,
+    get_delivery_factory,
+    get_meal_factory,
+    get_standard_user_factory,
+)
+from hello_food.controllers.handling_event import create_new_handling_event
+from hello_food.services.outbox import (
+    email_outbox_table,
+    dispatch_outbox,
+    enqueue_customer_email,
+    get_backoff_seconds,
+)
+
+
+class _FakeSes:
+    def __init__(self, failing_recipients: Iterable[str] = ()) -> None:
+        self.failing_recipients = set(failing_recipients)
+        self.sent: list[tuple[str, str, str]] = []
+
+    def send(self, customer_email: str, subject: str, body: str) -> None:
+        if customer_email in self.failing_recipients:
+            raise RuntimeError("Throttling")
+        self.sent.append((customer_email, subject, body))
+
+
+class TestOutbox:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def _get_outbox_rows(self, db_engine: Engine) -> Sequence[Row[Any]]:
+        with db_engine.connect() as connection:
+            return connection.execute(
+                select(email_outbox_table).order_by(email_outbox_table.c.id)
+            ).all()
+
+    def test_create_handling_event_enqueues_emails_to_delivery_user(
+        self, db_engine: Engine
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "U 19", "Green", "Morningside", 4171
+        )
+        # Created first, so the id of the user differs from the delivery's
+        get_standard_user_factory().create_from_values(
+            "other@example.com", "Jane Doe", 1, address.id
+        )
+        user = get_standard_user_factory().create_from_values(
+            "john@example.com", "John Doe", 1, address.id
+        )
+        meal = get_meal_factory().create_from_values("Italian", "Pasta", 9.5)
+        delivery = get_delivery_factory().create_from_values(
+            user.id, address.id, [(meal["id"], 1)]
+        )
+
+        for _ in range(2):
+            with UnitOfWork():
+                create_new_handling_event(
+                    {
+                        "delivery_id": delivery.id,
+                        "to_address_id": address.id,
+                        "from_address_id": address.id,
+                        "completion_time": 1,
+                    }
+                )
+
+        outbox_rows = self._get_outbox_rows(db_engine)
+        assert [row.recipient for row in outbox_rows] == ["john@example.com"] * 2
+        assert [row.subject for row in outbox_rows] == [
+            "Your order is on it's way!",
+            "Your order is almost here!",
+        ]
+
+    def test_enqueue_is_rolled_back_with_unit_of_work(self, db_engine: Engine) -> None:
+        with pytest.raises(RuntimeError):
+            with UnitOfWork():
+                enqueue_customer_email("john@example.com", "Subject", "", "key")
+                raise RuntimeError()
+
+        assert not self._get_outbox_rows(db_engine)
+
+    def test_enqueue_ignores_duplicate_dedup_keys(self, db_engine: Engine) -> None:
+        assert enqueue_customer_email("john@example.com", "Subject", "", "key")
+        assert not enqueue_customer_email("john@example.com", "Subject", "", "key")
+
+        assert len(self._get_outbox_rows(db_engine)) == 1
+
+    def test_dispatch_outbox_sends_each_email_once(self, db_engine: Engine) -> None:
+        for index in range(3):
+            enqueue_customer_email(
+                f"{index}@example.com", "Subject", "Body", str(index)
+            )
+        fake_ses = _FakeSes()
+
+        first_result = dispatch_outbox(db_engine, fake_ses.send, batch_size=2)
+        second_result = dispatch_outbox(db_engine, fake_ses.send, batch_size=2)
+        third_result = dispatch_outbox(db_engine, fake_ses.send, batch_size=2)
+
+        assert (first_result.sent, second_result.sent, third_result.sent) == (2, 1, 0)
+        assert sorted(recipient for recipient, _, _ in fake_ses.sent) == [
+            "0@example.com",
+            "1@example.com",
+            "2@example.com",
+        ]
+        assert all(row.sent_at is not None for row in self._get_outbox_rows(db_engine))
+
+    def test_dispatch_outbox_retries_with_backoff(self, db_engine: Engine) -> None:
+        enqueue_customer_email("john@example.com", "Subject", "", "key")
+        fake_ses = _FakeSes({"john@example.com"})
+        now = 2_000_000_000.0
+
+        def dispatch_at(time: float) -> tuple[int, int]:
+            result = dispatch_outbox(
+                db_engine, fake_ses.send, max_attempts=3, clock=lambda: time
+            )
+            return result.sent, result.failed
+
+        assert dispatch_at(now) == (0, 1)
+        (row,) = self._get_outbox_rows(db_engine)
+        assert row.attempts == 1
+        assert row.next_attempt_at == now + get_backoff_seconds(1)
+        assert row.last_error == "Throttling"
+
+        # Not due before the backoff has passed
+        assert dispatch_at(now + 1) == (0, 0)
+        assert dispatch_at(now + get_backoff_seconds(1)) == (0, 1)
+
+        fake_ses.failing_recipients = set()
+        assert dispatch_at(now + 10 * get_backoff_seconds(3)) == (1, 0)
+        (row,) = self._get_outbox_rows(db_engine)
+        assert row.attempts == 3
+        assert len(fake_ses.sent) == 1
+
+    def test_dispatch_outbox_gives_up_after_max_attempts(
+        self, db_engine: Engine
+    ) -> None:
+        enqueue_customer_email("john@example.com", "Subject", "", "key")
+        fake_ses = _FakeSes({"john@example.com"})
+
+        for hour in range(4):
+            dispatch_outbox(
+                db_engine,
+                fake_ses.send,
+                max_attempts=2,
+                clock=lambda: 2_000_000_000.0 + hour * 3600,
+            )
+
+        (row,) = self._get_outbox_rows(db_engine)
+        assert row.attempts == 2
+        assert row.sent_at is None
+
+    def test_dispatch_outbox_skips_emails_claimed_by_another_dispatcher(
+        self, db_engine: Engine
+    ) -> None:
+        enqueue_customer_email("john@example.com", "Subject", "", "key")
+        fake_ses = _FakeSes()
+
+        with db_engine.begin() as connection:
+            connection.execute(select(email_outbox_table).with_for_update())
+            result = dispatch_outbox(db_engine, fake_ses.send)
+
+        assert result.claimed == 0
+        assert fake_ses.sent == []
+
+    def test_dispatch_outbox_records_each_send_before_the_next(
+        self, db_engine: Engine
+    ) -> None:
+        for index in range(3):
+            enqueue_customer_email(f"{index}@example.com", "Subject", "", str(index))
+        fake_ses = _FakeSes()
+        now = 2_000_000_000.0
+
+        def die_on_second_email(customer_email: str, subject: str, body: str) -> None:
+            if customer_email == "1@example.com":
+                raise SystemExit()
+            fake_ses.send(customer_email, subject, body)
+
+        with pytest.raises(SystemExit):
+            dispatch_outbox(
+                db_engine, die_on_second_email, clock=lambda: now, claim_seconds=60
+            )
+
+        rows = self._get_outbox_rows(db_engine)
+        assert [row.sent_at is not None for row in rows] == [True, False, False]
+
+        # The emails left claimed by the dead dispatcher wait for their lease
+        assert dispatch_outbox(db_engine, fake_ses.send, clock=lambda: now + 1) == (
+            0,
+            0,
+        )
+        assert dispatch_outbox(db_engine, fake_ses.send, clock=lambda: now + 60) == (
+            2,
+            0,
+        )
+        assert [recipient for recipient, _, _ in fake_ses.sent] == [
+            "0@example.com",
+            "1@example.com",
+            "2@example.com",
+        ]
+        assert [row.claimed_until for row in self._get_outbox_rows(db_engine)] == [
+            None
+        ] * 3
@@ -0,0 +1,129 @@
+import json
+from typing import Any
+
+import boto3
+import pytest
+
+from botocore.stub import Stubber
+
+from hello_food.environ import SES_SOURCE_EMAIL
+from hello_food.services.send_bulk_email import (
+    BulkEmailRecipient,
+    BulkEmailResult,
+    TokenBucket,
+    create_send_rate_limiter,
+    send_bulk_templated_email,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _destination(email: str) -> dict[str, Any]:
+    return {
+        "Destination": {"ToAddresses": [email]},
+        "ReplacementTemplateData": json.dumps({"name": email}),
+    }
+
+
+class TestSendBulkEmail:
+    __test__ = True
+
+    @pytest.fixture
+    def ses_client(self) -> Any:
+        return boto3.client(
+            "ses",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+
+    def test_token_bucket_waits_for_tokens(self) -> None:
+        clock = _FakeClock()
+        token_bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+
+        token_bucket.acquire(2)
+        assert clock.now == 0
+        token_bucket.acquire(1)
+        assert clock.now == pytest.approx(0.5)
+        token_bucket.acquire(2)
+        assert clock.now == pytest.approx(1.5)
+
+    def test_create_send_rate_limiter_reads_send_quota(self, ses_client: Any) -> None:
+        with Stubber(ses_client) as stubber:
+            stubber.add_response(
+                "get_send_quota",
+                {"Max24HourSend": 50_000.0, "MaxSendRate": 14.0, "SentLast24Hours": 0},
+            )
+            rate_limiter = create_send_rate_limiter(ses_client)
+
+        assert rate_limiter.rate == 14.0
+
+    def test_send_bulk_templated_email_reports_each_recipient(
+        self, ses_client: Any
+    ) -> None:
+        emails = [f"{index}@example.com" for index in range(5)]
+        recipients = [BulkEmailRecipient(email, {"name": email}) for email in emails]
+        clock = _FakeClock()
+
+        with Stubber(ses_client) as stubber:
+            for chunk, statuses in (
+                (
+                    emails[:2],
+                    [
+                        {"Status": "Success", "MessageId": "message-0"},
+                        {"Status": "MessageRejected", "Error": "Email rejected"},
+                    ],
+                ),
+                (
+                    emails[2:4],
+                    [
+                        {"Status": "Success", "MessageId": "message-2"},
+                        {"Status": "Success", "MessageId": "message-3"},
+                    ],
+                ),
+            ):
+                stubber.add_response(
+                    "send_bulk_templated_email",
+                    {"Status": statuses},
+                    {
+                        "Source": SES_SOURCE_EMAIL,
+                        "Template": "TrialEnding",
+                        "DefaultTemplateData": json.dumps({"days": 3}),
+                        "Destinations": [_destination(email) for email in chunk],
+                    },
+                )
+            stubber.add_client_error(
+                "send_bulk_templated_email", "Throttling", "Maximum sending rate"
+            )
+
+            results = send_bulk_templated_email(
+                "TrialEnding",
+                recipients,
+                {"days": 3},
+                client=ses_client,
+                rate_limiter=TokenBucket(2, clock=clock, sleep=clock.sleep),
+                max_workers=1,
+            )
+
+            stubber.assert_no_pending_responses()
+
+        assert [result.email for result in results] == emails
+        assert results[:4] == [
+            BulkEmailResult(emails[0], "message-0", None),
+            BulkEmailResult(emails[1], None, "Email rejected"),
+            BulkEmailResult(emails[2], "message-2", None),
+            BulkEmailResult(emails[3], "message-3", None),
+        ]
+        assert results[4].message_id is None
+        assert "Throttling" in str(results[4].error)
+        # 5 recipients at 2 per second, after the initial burst of 2
+        assert clock.now == pytest.approx(1.5)
@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+
+from sqlalchemy import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from hello_food.sql import (
+    engine,
+    EngineSettings,
+    ReplicaRouter,
+    create_engine_from_settings,
+    get_replication_lag,
+    get_pool_statistics,
+    prewarm_pool,
+)
+
+
+class TestEngineSettings:
+    __test__ = True
+
+    def test_create_engine_from_settings_uses_queue_pool(self) -> None:
+        settings = EngineSettings(pool_size=3, max_overflow=2, pool_timeout=5)
+        created_engine = create_engine_from_settings(settings)
+
+        assert isinstance(created_engine.pool, QueuePool)
+        assert created_engine.pool.size() == 3
+        assert created_engine.echo is False
+
+        created_engine.dispose()
+
+    def test_create_engine_from_settings_pgbouncer_does_not_pool(self) -> None:
+        settings = EngineSettings(pool_mode="pgbouncer")
+        created_engine = create_engine_from_settings(settings)
+
+        assert isinstance(created_engine.pool, NullPool)
+        assert prewarm_pool(created_engine, 5) == 0
+
+        created_engine.dispose()
+
+    def test_create_engine_from_settings_fails_on_unknown_pool_mode(self) -> None:
+        with pytest.raises(ValueError):
+            create_engine_from_settings(EngineSettings(pool_mode="unknown"))
+
+    def test_prewarm_pool_fills_pool(self) -> None:
+        settings = EngineSettings(pool_size=3, max_overflow=2)
+        created_engine = create_engine_from_settings(settings)
+
+        assert prewarm_pool(created_engine, 10) == 3
+
+        statistics = get_pool_statistics(created_engine, settings)
+        assert statistics.checked_in == 3
+        assert statistics.checked_out == 0
+        assert statistics.capacity == 5
+
+        with created_engine.connect():
+            statistics = get_pool_statistics(created_engine, settings)
+            assert statistics.checked_out == 1
+            assert statistics.saturation == pytest.approx(1 / 5)
+
+        created_engine.dispose()
+
+
+class TestReplicaRouter:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def replicas(self) -> list[Engine]:
+        return [
+            create_engine_from_settings(EngineSettings(hostname=hostname))
+            for hostname in ("replica-1", "replica-2")
+        ]
+
+    def test_reads_use_primary_without_replicas(self) -> None:
+        router = ReplicaRouter(engine)
+
+        assert router.get_read_engine() is engine
+        assert router.get_write_engine() is engine
+
+    def test_reads_are_spread_over_replicas(self, replicas: list[Engine]) -> None:
+        router = ReplicaRouter(engine, replicas, get_lag=lambda _: 0.0)
+
+        # Replicas are only read from once their lag was checked
+        assert router.get_read_engine() is engine
+        router.refresh()
+        read_engines = [router.get_read_engine() for _ in range(4)]
+
+        assert read_engines == replicas * 2
+        assert router.get_write_engine() is engine
+
+    def test_lagging_replicas_are_skipped(self, replicas: list[Engine]) -> None:
+        lags = {replicas[0]: 60.0, replicas[1]: None}
+        router = ReplicaRouter(
+            engine, replicas, max_lag_seconds=5, get_lag=lags.__getitem__
+        )
+
+        assert router.refresh() == ()
+        assert router.get_read_engine() is engine
+
+        lags[replicas[1]] = 1.0
+        # Reads only see the lag of the latest refresh
+        assert router.get_read_engine() is engine
+        assert router.refresh() == (replicas[1],)
+        assert router.get_read_engine() is replicas[1]
+
+    def test_replica_lag_is_checked_in_background(self, replicas: list[Engine]) -> None:
+        lag_checks: list[Engine] = []
+        checked_again = threading.Event()
+
+        def get_lag(replica: Engine) -> float:
+            lag_checks.append(replica)
+            if len(lag_checks) == 1:
+                return 60.0
+            checked_again.set()
+            return 0.0
+
+        router = ReplicaRouter(
+            engine,
+            replicas[:1],
+            max_lag_seconds=5,
+            lag_check_interval=0.01,
+            get_lag=get_lag,
+        )
+
+        router.start()
+        try:
+            assert router.get_read_engine() is engine
+            assert checked_again.wait(5)
+        finally:
+            router.stop()
+
+        assert router.get_read_engine() is replicas[0]
+        assert lag_checks[0] is replicas[0]
+
+    def test_reads_do_not_check_replica_lag(self, replicas: list[Engine]) -> None:
+        lag_checks: list[Engine] = []
+
+        def get_lag(replica: Engine) -> float:
+            lag_checks.append(replica)
+            return 0.0
+
+        router = ReplicaRouter(engine, replicas, get_lag=get_lag)
+        router.refresh()
+
+        for _ in range(10):
+            router.get_read_engine()
+
+        assert len(lag_checks) == len(replicas)
+
+    def test_get_replication_lag_of_primary_is_zero(self) -> None:
+        assert get_replication_lag(engine) == 0.0
+
+    def test_get_replication_lag_of_unreachable_database(self) -> None:
+        unreachable = create_engine_from_settings(
+            EngineSettings(hostname="localhost", port=1, pool_timeout=1)
+        )
+
+        assert get_replication_lag(unreachable) is None
@@ -0,0 +1,38 @@
+from sqlalchemy import Select, bindparam, select
+
+from hello_food import meal_table
+from hello_food.statements import registered_statement, get_registered_statements
+
+
+@registered_statement
+def _select_meal_from_id() -> Select[tuple[int]]:
+    return select(meal_table.c.id).where(meal_table.c.id == bindparam("id"))
+
+
+@registered_statement
+def _select_meals(from_cuisine: bool) -> Select[tuple[int]]:
+    statement = select(meal_table.c.id)
+    if from_cuisine:
+        statement = statement.where(meal_table.c.cuisine == bindparam("cuisine"))
+    return statement
+
+
+class TestRegisteredStatement:
+    __test__ = True
+
+    def test_statement_is_built_once(self) -> None:
+        assert _select_meal_from_id() is _select_meal_from_id()
+
+    def test_each_variant_is_built_once(self) -> None:
+        assert _select_meals(True) is _select_meals(True)
+        assert _select_meals(False) is _select_meals(False)
+        assert _select_meals(True) is not _select_meals(False)
+
+    def test_get_registered_statements(self) -> None:
+        statement = _select_meal_from_id()
+        _select_meals(True)
+
+        registered_statements = get_registered_statements()
+
+        assert registered_statements[f"{__name__}._select_meal_from_id"] is statement
+        assert f"{__name__}._select_meals(True,)" in registered_statements
@@ -0,0 +1,129 @@
+from typing import Generator
+
+import pytest
+
+from sqlalchemy import Engine, event, func, select
+
+from hello_food import (
+    engine,
+    metadata,
+    address_table,
+    get_address_factory,
+    get_address_repository,
+    get_standard_user_factory,
+    get_user_repository,
+    UnitOfWork,
+    get_unit_of_work,
+)
+from hello_food.sql import ReplicaRouter, create_engine_from_settings, engine_settings
+
+
+class TestUnitOfWork:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    def test_unit_of_work_is_active_only_within_block(self) -> None:
+        assert get_unit_of_work() is None
+
+        with UnitOfWork() as unit_of_work:
+            assert get_unit_of_work() is unit_of_work
+
+        assert get_unit_of_work() is None
+
+    def test_unit_of_work_uses_one_connection(self, db_engine: Engine) -> None:
+        checked_out_before = db_engine.pool.checkedout()  # type: ignore[attr-defined]
+
+        with UnitOfWork():
+            address = get_address_factory().create_from_values(
+                "Unit 18", "Wattle", "Cannon Hill", 4170
+            )
+            get_standard_user_factory().create_from_values(
+                "test@example.com", "John Doe", 4, address.id
+            )
+            get_address_repository().get_from_id(address.id)
+
+            checked_out = db_engine.pool.checkedout()  # type: ignore[attr-defined]
+            assert checked_out == checked_out_before + 1
+
+    def test_unit_of_work_returns_entities_from_identity_map(self) -> None:
+        with UnitOfWork():
+            created_address = get_address_factory().create_from_values(
+                "Unit 18", "Wattle", "Cannon Hill", 4170
+            )
+            created_user = get_standard_user_factory().create_from_values(
+                "test@example.com", "John Doe", 4, created_address.id
+            )
+
+            assert (
+                get_address_repository().get_from_id(created_address.id)
+                is created_address
+            )
+            assert get_user_repository().get_from_id(created_user.id) is created_user
+
+    def test_unit_of_work_commits_on_exit(self, db_engine: Engine) -> None:
+        with UnitOfWork():
+            created_address = get_address_factory().create_from_values(
+                "Unit 18", "Wattle", "Cannon Hill", 4170
+            )
+
+        retrieved_address = get_address_repository().get_from_id(created_address.id)
+
+        assert retrieved_address is not None
+        assert retrieved_address is not created_address
+        assert retrieved_address.street_name == "Wattle"
+
+    def test_unit_of_work_rolls_back_on_error(self, db_engine: Engine) -> None:
+        with pytest.raises(RuntimeError):
+            with UnitOfWork():
+                get_address_factory().create_from_values(
+                    "Unit 18", "Wattle", "Cannon Hill", 4170
+                )
+                raise RuntimeError()
+
+        with db_engine.connect() as connection:
+            count = connection.execute(
+                select(func.count()).select_from(address_table)
+            ).scalar_one()
+
+        assert count == 0
+
+    def test_unit_of_work_reads_from_replica_until_it_writes(
+        self, db_engine: Engine
+    ) -> None:
+        # A second engine on the same database stands in for a replica
+        replica = create_engine_from_settings(engine_settings)
+        replica_statements: list[str] = []
+
+        def before_cursor_execute(*args: object) -> None:
+            replica_statements.append(str(args[2]))
+
+        event.listen(replica, "before_cursor_execute", before_cursor_execute)
+        router = ReplicaRouter(db_engine, [replica], get_lag=lambda _: 0.0)
+        router.refresh()
+
+        address = get_address_factory().create_from_values(
+            "Unit 18", "Wattle", "Cannon Hill", 4170
+        )
+
+        with UnitOfWork(router=router):
+            assert get_address_repository().get_from_id(address.id) is not None
+            assert len(replica_statements) == 1
+
+            get_address_factory().create_from_values(
+                "Unit 19", "Wattle", "Cannon Hill", 4170
+            )
+            # Read your own writes from the primary
+            assert get_user_repository().get_from_email("test@example.com") is None
+            assert len(replica_statements) == 1
+
+        replica.dispose()
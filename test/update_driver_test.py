@@ -0,0 +1,96 @@
+from typing import Any, Generator
+
+import pytest
+
+from sqlalchemy import Engine, event
+
+from hello_food import (
+    engine,
+    metadata,
+    get_address_factory,
+    get_address_repository,
+    get_trial_user_factory,
+    get_trial_user_repository,
+    UnitOfWork,
+)
+from hello_food.update_driver import update_sql_entities
+
+
+class TestUpdateDriver:
+    __test__ = True
+
+    @pytest.fixture(scope="class")
+    def db_engine(self) -> Engine:
+        return engine
+
+    @pytest.fixture(scope="function", autouse=True)
+    def db_connection(self, db_engine: Engine) -> Generator[None, None, None]:
+        metadata.drop_all(db_engine)
+        metadata.create_all(db_engine)
+        yield
+        metadata.drop_all(db_engine)
+
+    @pytest.fixture(scope="function")
+    def statements(self, db_engine: Engine) -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def before_cursor_execute(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+        yield statements
+        event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+    def test_update_sql_entities_skips_clean_entities(
+        self, statements: list[str]
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 1", "Street", "Suburb", 4170
+        )
+        statements.clear()
+
+        update_sql_entities(address)
+
+        assert statements == []
+
+    def test_update_sql_entities_writes_only_changed_columns(
+        self, statements: list[str]
+    ) -> None:
+        address = get_address_factory().create_from_values(
+            "Unit 1", "Street", "Suburb", 4170
+        )
+        user = get_trial_user_factory().create_from_values(
+            "john@example.com", "John Doe", 3, 1_000, 0.5, address.id
+        )
+        statements.clear()
+
+        user.name = "Jane Doe"
+        update_sql_entities(user)
+
+        assert len(statements) == 1
+        assert "trial_end_date" not in statements[0]
+        assert "email" not in statements[0]
+        assert not user.is_dirty()
+
+        updated_user = get_trial_user_repository().get_from_id(user.id)
+        assert updated_user is not None and updated_user.name == "Jane Doe"
+
+    def test_update_sql_entities_batches_updates_per_table(
+        self, statements: list[str]
+    ) -> None:
+        addresses = get_address_factory().create_many_from_values(
+            [("Unit 1", "Street", "Suburb", 4170)] * 50
+        )
+        statements.clear()
+
+        for address in addresses:
+            address.suburb = f"Suburb {address.id}"
+        update_sql_entities(*addresses)
+
+        assert len(statements) == 1
+
+        with UnitOfWork():
+            for address in addresses:
+                updated_address = get_address_repository().get_from_id(address.id)
+                assert updated_address is not None
+                assert updated_address.suburb == f"Suburb {address.id}"
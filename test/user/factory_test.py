@@ -1,4 +1,5 @@
-from typing import Generator
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Generator
 
 from sqlalchemy import select, insert, Engine
 
@@ -12,6 +13,7 @@ from hello_food import (
     user_table,
     get_trial_user_factory,
     get_standard_user_factory,
+    UnitOfWork,
 )
 
 
@@ -137,3 +139,62 @@ class TestStandardUserFactory:
         assert user_orm.email == assigned_email
         assert user_orm.name == assigned_name
         assert user_orm.meals_per_week == assigned_meals_per_week
+
+    @pytest.mark.parametrize("in_unit_of_work", (False, True))
+    def test_create_many_from_json_reports_items_failing_in_database(
+        self, db_engine: Engine, in_unit_of_work: bool
+    ) -> None:
+        with db_engine.connect() as connection:
+            address_id = connection.execute(
+                insert(address_table)
+                .values(
+                    unit="test_unit",
+                    street_name="test_street",
+                    suburb="test_suburb",
+                    postcode=1,
+                )
+                .returning(address_table.c.id)
+            ).scalar_one()
+            connection.commit()
+
+        standard_user_factory = get_standard_user_factory()
+
+        def standard_user_json(email: str) -> dict[str, Any]:
+            return {
+                "email": email,
+                "name": "John Doe",
+                "meals_per_week": 2,
+                "address_id": address_id,
+            }
+
+        unit_of_work: AbstractContextManager[Any] = (
+            UnitOfWork() if in_unit_of_work else nullcontext()
+        )
+        with unit_of_work:
+            results = standard_user_factory.create_many_from_json(
+                [
+                    standard_user_json("first@example.com"),
+                    standard_user_json("second@example.com"),
+                    standard_user_json("third@example.com"),
+                    standard_user_json("third@example.com"),
+                ],
+                chunk_size=2,
+            )
+
+        # The failed chunk is retried item by item
+        assert [result.error is None for result in results] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+        with db_engine.connect() as connection:
+            emails = connection.execute(
+                select(user_table.c.email).order_by(user_table.c.id)
+            ).scalars()
+            assert list(emails) == [
+                "first@example.com",
+                "second@example.com",
+                "third@example.com",
+            ]
@@ -1,8 +1,8 @@
-from typing import Generator
+from typing import Any, Generator
 
 import pytest
 
-from sqlalchemy import Engine, insert
+from sqlalchemy import Connection, Engine, event, insert
 
 from hello_food import (
     engine,
@@ -14,9 +14,47 @@ from hello_food import (
     get_user_repository,
     get_standard_user_repository,
     get_trial_user_repository,
+    TrialUser,
+    StandardUser,
 )
 
 
+def _insert_user(
+    db_engine: Engine, email: str, user_type: str, **trial_user_values: float
+) -> int:
+    with db_engine.connect() as connection:
+        address_id = connection.execute(
+            insert(address_table)
+            .values(
+                unit="test_unit",
+                street_name="test_street",
+                suburb="test_suburb",
+                postcode=1,
+            )
+            .returning(address_table.c.id)
+        ).scalar_one()
+        user_id = connection.execute(
+            insert(user_table)
+            .values(
+                email=email,
+                name="John Doe",
+                meals_per_week=1,
+                address_id=address_id,
+                type=user_type,
+            )
+            .returning(user_table.c.id)
+        ).scalar_one()
+        if user_type == "trial_user":
+            connection.execute(
+                insert(trial_user_table).values(id=user_id, **trial_user_values)
+            )
+        else:
+            connection.execute(insert(standard_user_table).values(id=user_id))
+        connection.commit()
+
+    return user_id
+
+
 class TestStandardUserRepository:
     __test__ = True
 
@@ -225,3 +263,75 @@ class TestUserRepository:
         assert retrieved_user.name == assigned_name
         assert retrieved_user.meals_per_week == assigned_meals_per_week
         assert retrieved_user.address_id == address_id
+
+    def test_get_from_id_returns_subclass_in_one_query(self, db_engine: Engine) -> None:
+        user_repository = get_user_repository()
+
+        trial_user_id = _insert_user(
+            db_engine,
+            "trial@example.com",
+            "trial_user",
+            trial_end_date=16_000,
+            discount_value=0.2,
+        )
+        standard_user_id = _insert_user(
+            db_engine, "standard@example.com", "standard_user"
+        )
+
+        statements: list[str] = []
+
+        def count_statement(
+            conn: Connection, cursor: Any, statement: str, *args: Any
+        ) -> None:
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", count_statement)
+        try:
+            retrieved_trial_user = user_repository.get_from_id(trial_user_id)
+            retrieved_standard_user = user_repository.get_from_id(standard_user_id)
+        finally:
+            event.remove(db_engine, "before_cursor_execute", count_statement)
+
+        assert len(statements) == 2
+        assert isinstance(retrieved_trial_user, TrialUser)
+        assert retrieved_trial_user.discount_value == 0.2
+        assert isinstance(retrieved_standard_user, StandardUser)
+
+    def test_typed_repositories_ignore_other_user_types(
+        self, db_engine: Engine
+    ) -> None:
+        standard_user_id = _insert_user(
+            db_engine, "standard@example.com", "standard_user"
+        )
+
+        assert get_trial_user_repository().get_from_id(standard_user_id) is None
+        assert (
+            get_trial_user_repository().get_from_email("standard@example.com") is None
+        )
+        assert isinstance(
+            get_standard_user_repository().get_from_id(standard_user_id), StandardUser
+        )
+
+    def test_get_page_lists_users_newest_first(self, db_engine: Engine) -> None:
+        user_repository = get_user_repository()
+
+        user_ids = [
+            _insert_user(
+                db_engine,
+                "trial@example.com",
+                "trial_user",
+                trial_end_date=16_000,
+                discount_value=0.2,
+            ),
+            _insert_user(db_engine, "standard@example.com", "standard_user"),
+            _insert_user(db_engine, "other@example.com", "standard_user"),
+        ]
+
+        first_page = user_repository.get_page(limit=2)
+        second_page = user_repository.get_page(first_page.next_cursor, limit=2)
+
+        assert [user.id for user in first_page.items] == user_ids[:0:-1]
+        assert first_page.next_cursor is not None
+        assert [user.id for user in second_page.items] == user_ids[:1]
+        assert isinstance(second_page.items[0], TrialUser)
+        assert second_page.next_cursor is None
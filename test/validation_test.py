@@ -0,0 +1,120 @@
+import pytest
+
+from hello_food.address.factory import AddressSqlFactory
+from hello_food.delivery.factory import DeliverySqlFactory
+from hello_food.validation import (
+    Field,
+    ListField,
+    ValidationError,
+    compile_schema,
+)
+
+_ADDRESS_JSON = {
+    "unit": "U 19",
+    "street_name": "Green",
+    "suburb": "Morningside",
+    "postcode": "4171",
+}
+
+
+class TestValidation:
+    __test__ = True
+
+    def test_validate_converts_fields_in_schema_order(self) -> None:
+        assert AddressSqlFactory._validator.validate(_ADDRESS_JSON) == (
+            "U 19",
+            "Green",
+            "Morningside",
+            4171,
+        )
+
+    def test_missing_attribute_raises_key_error(self) -> None:
+        with pytest.raises(KeyError) as e:
+            AddressSqlFactory._validator.validate(
+                {key: value for key, value in _ADDRESS_JSON.items() if key != "suburb"}
+            )
+
+        assert e.value.args == (
+            "Could not find attribute suburb from provided JSON dict",
+        )
+
+    def test_conversion_failure_names_the_factory(self) -> None:
+        with pytest.raises(ValueError) as e:
+            AddressSqlFactory._validator.validate({**_ADDRESS_JSON, "postcode": "x"})
+
+        assert str(e.value) == (
+            "Could not convert attribute postcode as int for class AddressSqlFactory"
+        )
+
+    def test_type_error_is_raised_as_it_is(self) -> None:
+        with pytest.raises(TypeError):
+            AddressSqlFactory._validator.validate({**_ADDRESS_JSON, "postcode": None})
+
+    def test_every_invalid_field_is_reported(self) -> None:
+        with pytest.raises(ValidationError) as e:
+            AddressSqlFactory._validator.validate({"unit": "U 19", "postcode": "x"})
+
+        assert [type(error) for error in e.value.errors] == [
+            KeyError,
+            KeyError,
+            ValueError,
+        ]
+        assert str(e.value).startswith(
+            "Could not find attribute street_name from provided JSON dict; "
+        )
+
+    def test_list_field_parses_each_item(self) -> None:
+        values = DeliverySqlFactory._validator.validate(
+            {
+                "user_id": 1,
+                "address_id": "2",
+                "meal_orders": [
+                    {"meal_id": 3, "quantity": "4"},
+                    {"meal_id": "5", "quantity": 6},
+                ],
+            }
+        )
+
+        assert values == (1, 2, [(3, 4), (5, 6)])
+
+    def test_list_field_must_hold_objects(self) -> None:
+        validate = DeliverySqlFactory._validator.validate
+
+        with pytest.raises(AssertionError):
+            validate({"user_id": 1, "address_id": 2})
+        with pytest.raises(AssertionError):
+            validate({"user_id": 1, "address_id": 2, "meal_orders": [1]})
+
+    def test_list_field_item_errors_are_reported(self) -> None:
+        with pytest.raises(ValidationError) as e:
+            DeliverySqlFactory._validator.validate(
+                {
+                    "user_id": "x",
+                    "address_id": 2,
+                    "meal_orders": [{"meal_id": 3}],
+                }
+            )
+
+        assert [type(error) for error in e.value.errors] == [ValueError, KeyError]
+
+    def test_validate_many_reports_each_item(self) -> None:
+        validator = compile_schema(
+            (Field("name", str), ListField("tags", (Field("weight", float),))),
+            "Owner",
+        )
+
+        results = validator.validate_many(
+            [
+                {"name": "a", "tags": [{"weight": "1.5"}]},
+                "not an object",
+                {"name": "b", "tags": [{"weight": "heavy"}]},
+            ]
+        )
+
+        assert results[0] == (("a", [(1.5,)]), None)
+        assert results[1][0] is None
+        assert str(results[1][1]) == "Item 1 is not a JSON object"
+        assert results[2][0] is None
+        assert str(results[2][1]) == (
+            "Could not convert attribute weight as float for class Owner"
+        )